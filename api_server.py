@@ -0,0 +1,316 @@
+# api_server.py
+#
+# 独立的异步 JSON 接口服务：对外提供站点列表、逐月/逐日聚合、各模块统计结果、
+# 被动策略占比与风况统计，计算路径与 Streamlit 页面（run_app）相同。
+#
+# 用法（在仓库根目录执行）：
+#     python -m api_server            # 端口、计算线程数与缓存有效期见 config 中的 API_*
+#
+# 接口（均为 GET，站点标识为 get_station_key 生成的地理编码，例如
+# WMO_Region_2_Asia/CHN_China/SN_Shaanxi/CHN_SN_Xian.570360_CSWD）：
+#     /api/stations?root=/
+#     /api/stations/{station}/aggregates?field=dry_bulb_temperature&period=monthly
+#     /api/stations/{station}/summaries/{module}?start_month=1&end_month=12&variant=Global
+#     /api/stations/{station}/passive-strategies
+#     /api/stations/{station}/wind
+
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from cachetools import LRUCache, TTLCache
+from config import get_api_server_settings
+from utils.metrics import instrument, record_cache, start_metrics_server
+
+# 统计结果接口支持的模块：(模块路径, 计算函数名, 结果是否与月份区间有关, 允许的变体（第一个为默认值）)
+SUMMARY_MODULES = {
+    "temperature": ("charts.temperature_chart", "generate_temperature_charts", True, ("",)),
+    "humidity": ("charts.humidity_chart", "generate_humidity_charts", True, ("",)),
+    "wind": ("charts.wind_chart", "generate_wind_charts", True, ("",)),
+    "sky_cover": ("charts.sky_cover_chart", "generate_sky_cover_charts", True, ("",)),
+    "radiation": ("charts.radiation_chart", "generate_radiation_charts", True, ("Global", "Direct", "Diffuse")),
+    "illuminance": ("charts.illuminance_chart", "generate_illuminance_charts", True, ("Global", "Direct", "Diffuse")),
+    "degree_days": ("charts.degree_days_chart", "generate_degree_days_charts", True, ("",)),
+    "passive_strategies": ("charts.passive_strategies_chart", "generate_passive_strategies_chart", False, ("",)),
+    "design_conditions": ("charts.design_conditions_chart", "generate_design_conditions_charts", False, ("",)),
+}
+
+AGGREGATE_PERIODS = ("monthly", "daily")
+
+# 同一站点的下载与解压串行执行，避免并发请求同时写同一个临时文件
+_station_locks = LRUCache(maxsize=1024)
+_station_locks_guard = threading.Lock()
+
+_port, _workers, _cache_ttl = get_api_server_settings()
+_responses = TTLCache(maxsize=4096, ttl=_cache_ttl)
+_responses_lock = threading.Lock()
+
+def _json_error(error_class, message):
+    """构造 JSON 格式的 HTTP 错误。"""
+    return error_class(text=json.dumps({"error": message}, ensure_ascii=False), content_type="application/json")
+
+def _station_path(station):
+    """站点标识转换为仓库中的 ZIP 路径。"""
+    if not station or ".." in station.split("/"):
+        raise _json_error(web.HTTPBadRequest, f"无效的站点标识/Invalid station: {station}")
+    return f"/{station}.zip"
+
+def _station_epw_path(station):
+    """下载并解压站点数据（按站点加锁，结果由 load_station_epw_path 缓存）。"""
+    import requests
+    from charts.comparison_chart import load_station_epw_path
+
+    station_path = _station_path(station)
+    with _station_locks_guard:
+        lock = _station_locks.get(station_path)
+        if lock is None:
+            lock = _station_locks[station_path] = threading.Lock()
+    try:
+        with lock:
+            return load_station_epw_path(station_path)
+    except requests.HTTPError as e:
+        raise _json_error(web.HTTPNotFound, f"站点不存在或无法下载/Station not found: {station} ({e})")
+
+def _month_range(query):
+    """读取查询参数中的月份区间。"""
+    try:
+        start_month = int(query.get("start_month", 1))
+        end_month = int(query.get("end_month", 12))
+    except ValueError:
+        raise _json_error(web.HTTPBadRequest, "月份必须为整数/Months must be integers")
+    if not (1 <= start_month <= 12 and 1 <= end_month <= 12):
+        raise _json_error(web.HTTPBadRequest, "月份必须在 1 到 12 之间/Months must be between 1 and 12")
+    return start_month, end_month
+
+def list_stations(root):
+    """
+    列出站点（按响应缓存的有效期复用，不在每次请求时遍历仓库）。
+
+    Args:
+        root (str): 遍历的 Alist 起始目录。
+
+    Returns:
+        dict: 站点列表，每项包含 key、name、path。
+    """
+    from utils.file_manager import list_station_files, get_station_key
+    from charts.comparison_chart import get_station_name
+
+    return {"stations": [
+        {"key": get_station_key(path), "name": get_station_name(path), "path": path}
+        for path in list_station_files(root)
+    ]}
+
+def station_aggregates(station, field, period):
+    """
+    读取（或计算并写回预计算存储）站点的逐月/逐日聚合序列。
+
+    Args:
+        station (str): 站点标识。
+        field (str): EPW 字段名。
+        period (str): "monthly" 或 "daily"。
+
+    Returns:
+        dict: 包含 station、field、period、values 的结果。
+    """
+    from utils import summary_store
+    from utils.data_processor import aggregate_by_day, aggregate_by_month
+    from utils.epw_arrays import EPW_FIELD_COLUMNS, load_epw_arrays
+
+    if field not in EPW_FIELD_COLUMNS:
+        raise _json_error(web.HTTPBadRequest, f"未知字段/Unknown field: {field}")
+    if period not in AGGREGATE_PERIODS:
+        raise _json_error(web.HTTPBadRequest, f"period 必须为 monthly 或 daily/period must be one of {AGGREGATE_PERIODS}")
+
+    values = summary_store.get_aggregates(station, field, period)
+    if values is None:
+        arrays = load_epw_arrays(_station_epw_path(station))
+        if not arrays.is_available(field):
+            raise _json_error(web.HTTPNotFound, f"该站点缺少该字段数据/No valid data for field: {field}")
+        if period == "monthly":
+            series = aggregate_by_month(arrays.values(field), arrays.month)
+        else:
+            series = aggregate_by_day(arrays.values(field), arrays.day_of_year)
+        summary_store.put_aggregates(station, field, period, series)
+        values = [float(v) for v in series]
+    return {"station": station, "field": field, "period": period, "values": values}
+
+def station_summary(station, module, start_month, end_month, variant):
+    """
+    读取（或计算并写回预计算存储）站点某个模块的统计结果。
+
+    Args:
+        station (str): 站点标识。
+        module (str): 模块名称（SUMMARY_MODULES 的键）。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        variant (str): 模块内的变体（辐射/照度类型），为 None 时使用默认值。
+
+    Returns:
+        dict: 包含统计结果的紧凑结构（record）与渲染后的文字（text）。
+    """
+    import importlib
+    from utils import summary_store
+    from utils.summaries import summary_to_payload
+
+    if module not in SUMMARY_MODULES:
+        raise _json_error(web.HTTPNotFound, f"未知模块/Unknown module: {module}")
+    module_path, function_name, by_month, variants = SUMMARY_MODULES[module]
+    variant = variants[0] if variant is None else variant
+    if variant not in variants:
+        raise _json_error(web.HTTPBadRequest, f"variant 必须为 {variants} 之一/variant must be one of {variants}")
+    if not by_month:
+        start_month, end_month = 1, 12
+
+    def compute():
+        generate = getattr(importlib.import_module(module_path), function_name)
+        epw_path = _station_epw_path(station)
+        if not by_month:
+            return generate(epw_path, show_charts=False)
+        if variant:
+            return generate(epw_path, start_month, end_month, 1, variant, show_charts=False)
+        return generate(epw_path, start_month, end_month, 1, show_charts=False)
+
+    summary = summary_store.get_or_compute_summary(station, module, start_month, end_month, compute, variant)
+    return {
+        "station": station,
+        "module": module,
+        "variant": variant,
+        "start_month": start_month,
+        "end_month": end_month,
+        "record": summary_to_payload(summary),
+        "text": str(summary),
+    }
+
+def station_passive_strategies(station):
+    """
+    计算站点各被动策略的小时占比（与多站点对比使用相同的堆叠数组统计）。
+
+    Args:
+        station (str): 站点标识。
+
+    Returns:
+        dict: 被动策略名称到占比（%）的映射。
+    """
+    from utils.station_stack import build_station_stack, passive_strategy_percentages
+
+    stack = build_station_stack([_station_epw_path(station)], [station])
+    row = passive_strategy_percentages(stack).loc[station]
+    return {"station": station, "percentages": {state: float(value) for state, value in row.items()}}
+
+def station_wind(station):
+    """
+    计算站点的风况统计（年均风速、最大月均风速、静风占比与盛行风向）。
+
+    Args:
+        station (str): 站点标识。
+
+    Returns:
+        dict: 风况统计。
+    """
+    from utils.station_stack import build_station_stack, wind_statistics
+
+    stack = build_station_stack([_station_epw_path(station)], [station])
+    row = wind_statistics(stack).loc[station]
+    return {"station": station, **{name: float(value) for name, value in row.items()}}
+
+def _etag_matches(header, etag):
+    """判断 If-None-Match 请求头是否包含当前 ETag（忽略弱校验前缀 W/）。"""
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def cached_json(handler):
+    """
+    装饰器：处理函数在线程池中计算结果，序列化后的响应按路径与查询参数缓存，并附带 ETag。
+
+    请求头 If-None-Match 与 ETag 一致时返回 304，不再传输响应体。
+    """
+    @functools.wraps(handler)
+    async def wrapper(request):
+        key = (request.path, tuple(sorted(request.query.items())))
+        with _responses_lock:
+            entry = _responses.get(key)
+        record_cache("api_response", entry is not None)
+        if entry is None:
+            payload = await asyncio.get_running_loop().run_in_executor(None, handler, request)
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            entry = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+            with _responses_lock:
+                _responses[key] = entry
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={_cache_ttl}"}
+        if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="application/json", charset="utf-8", headers=headers)
+    return instrument(f"api:{handler.__name__}")(wrapper)
+
+@cached_json
+def handle_stations(request):
+    return list_stations(request.query.get("root", "/"))
+
+@cached_json
+def handle_aggregates(request):
+    return station_aggregates(
+        request.match_info["station"],
+        request.query.get("field", "dry_bulb_temperature"),
+        request.query.get("period", "monthly"),
+    )
+
+@cached_json
+def handle_summary(request):
+    start_month, end_month = _month_range(request.query)
+    return station_summary(
+        request.match_info["station"],
+        request.match_info["module"],
+        start_month,
+        end_month,
+        request.query.get("variant"),
+    )
+
+@cached_json
+def handle_passive_strategies(request):
+    return station_passive_strategies(request.match_info["station"])
+
+@cached_json
+def handle_wind(request):
+    return station_wind(request.match_info["station"])
+
+@web.middleware
+async def error_middleware(request, handler):
+    """未预期的异常以 JSON 返回 500，HTTP 错误原样返回。"""
+    try:
+        return await handler(request)
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return web.json_response({"error": f"{type(e).__name__}: {e}"}, status=500)
+
+async def _on_startup(app):
+    # 计算（下载、解析、numpy 统计）都在线程池中执行，事件循环只负责并发收发请求
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="api"))
+
+def create_app():
+    """
+    创建接口服务应用。
+
+    Returns:
+        aiohttp.web.Application: 应用对象。
+    """
+    app = web.Application(middlewares=[error_middleware])
+    app.on_startup.append(_on_startup)
+    app.router.add_get("/api/stations", handle_stations)
+    app.router.add_get("/api/stations/{station:.+}/aggregates", handle_aggregates)
+    app.router.add_get("/api/stations/{station:.+}/summaries/{module}", handle_summary)
+    app.router.add_get("/api/stations/{station:.+}/passive-strategies", handle_passive_strategies)
+    app.router.add_get("/api/stations/{station:.+}/wind", handle_wind)
+    return app
+
+def main():
+    start_metrics_server()
+    web.run_app(create_app(), port=_port)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 # charts/artificial_intelligence_zone.py
 
-from utils.openai_integration import generate_summary
+from utils import report_jobs, summary_store
 import streamlit as st
+import time
+from utils.metrics import instrument
 
 # 汇总各个模块的总结文字
 def collect_summary_texts(passive_text, temperature_texts, wind_texts, humidity_texts, sky_cover_texts):
@@ -14,22 +16,70 @@ def collect_summary_texts(passive_text, temperature_texts, wind_texts, humidity_
     }
     return summaries
 
+# 读取（或计算）人工智能专区所需的全部模块总结
+def collect_ai_summaries(epw, start_month, end_month, color_scheme, station_key=None):
+    """
+    收集人工智能报告所需的各模块统计结果，优先读取预计算结果，未命中时再计算。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        station_key (str): 站点标识，为 None 时（例如上传的文件）不读写预计算存储。
+
+    Returns:
+        dict: 以 generate_ai_report 参数名为键的统计结果记录（文字尚未生成）。
+    """
+    from charts.temperature_chart import generate_temperature_charts
+    from charts.humidity_chart import generate_humidity_charts
+    from charts.wind_chart import generate_wind_charts
+    from charts.sky_cover_chart import generate_sky_cover_charts
+    from charts.radiation_chart import generate_radiation_charts
+    from charts.illuminance_chart import generate_illuminance_charts
+    from charts.passive_strategies_chart import generate_passive_strategies_chart
+
+    def cached(module, compute, variant="", months=(start_month, end_month)):
+        return summary_store.get_or_compute_summary(station_key, module, months[0], months[1], compute, variant)
+
+    return {
+        # 被动策略与月份无关，统一按全年存储
+        "passive_strategies_summary": cached(summary_store.PASSIVE_STRATEGIES, lambda: generate_passive_strategies_chart(epw, show_charts=False), months=(1, 12)),
+        "temperature_summary": cached(summary_store.TEMPERATURE, lambda: generate_temperature_charts(epw, start_month, end_month, color_scheme, show_charts=False)),
+        "humidity_summary": cached(summary_store.HUMIDITY, lambda: generate_humidity_charts(epw, start_month, end_month, color_scheme, show_charts=False)),
+        "wind_summary": cached(summary_store.WIND, lambda: generate_wind_charts(epw, start_month, end_month, color_scheme, show_charts=False)),
+        "sky_cover_summary": cached(summary_store.SKY_COVER, lambda: generate_sky_cover_charts(epw, start_month, end_month, color_scheme, show_charts=False)),
+        "radiation_summary": cached(summary_store.RADIATION, lambda: generate_radiation_charts(epw, start_month, end_month, color_scheme, "Global", show_charts=False), "Global"),
+        "illuminance_summary": cached(summary_store.ILLUMINANCE, lambda: generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Global", show_charts=False), "Global"),
+    }
+
+# 页面轮询后台报告任务状态的间隔（秒）
+REPORT_POLL_INTERVAL = 0.5
+
 # 生成全面绿建报告
-def generate_ai_report(passive_strategies_summary, temperature_summary, humidity_summary, wind_summary, sky_cover_summary, radiation_summary, illuminance_summary):
+@instrument()
+def generate_ai_report(passive_strategies_summary, temperature_summary, humidity_summary, wind_summary, sky_cover_summary, radiation_summary, illuminance_summary,
+                       report_key=None, geoinfo=None):
     """
-    生成人工智能绿建报告
+    生成人工智能绿建报告（提交到后台任务队列，页面轮询任务状态，重跑不会丢弃结果）
 
     Args:
-        passive_strategies_summary (str): 被动策略总结
-        temperature_summary (str): 温度总结
-        humidity_summary (str): 相对湿度总结
-        wind_summary (str): 风速和风玫瑰总结
-        sky_cover_summary (str): 天空覆盖总结
+        passive_strategies_summary (PassiveStrategiesSummary): 被动策略总结
+        temperature_summary (ClimateSummary): 温度总结
+        humidity_summary (ClimateSummary): 相对湿度总结
+        wind_summary (WindSummary): 风速和风玫瑰总结
+        sky_cover_summary (ClimateSummary): 天空覆盖总结
+        radiation_summary (ClimateSummary): 日照辐射总结
+        illuminance_summary (ClimateSummary): 照度总结
+        report_key (tuple): 报告任务标识 (站点标识, 起始月份, 终止月份)，见 utils/report_jobs.report_key
+        geoinfo (str): 地理编码，为 None 时使用“未知区域”
     """
     st.subheader("一键生成报告/One click report generation")
 
-    if st.button("生成绿建气候报告/Generate Report"):
-        # 汇总所有总结文字
+    job = report_jobs.get_job(report_key)
+    label = "重新生成报告/Regenerate Report" if job is not None and job.status == report_jobs.DONE else "生成绿建气候报告/Generate Report"
+    if st.button(label, disabled=job is not None and not job.finished):
+        # 点击后才把各模块的统计结果渲染为文字并汇总
         full_summary = (
             f"被动策略总结:\n{passive_strategies_summary}\n\n"
             f"温度总结:\n{temperature_summary}\n\n"
@@ -40,7 +90,20 @@ def generate_ai_report(passive_strategies_summary, temperature_summary, humidity
             f"照度总结:\n{illuminance_summary}\n"
         )
 
-        # 调用 OpenAI 接口生成报告
-        report = generate_summary(full_summary)
-        st.markdown(report)
+        # 在后台线程中调用 OpenAI 接口生成报告；同一站点与时段已在生成时不会重复提交
+        job = report_jobs.submit_report(report_key, full_summary, geoinfo or "未知区域", regenerate=job is not None)
+
+    if job is None:
+        return
+
+    # 轮询任务状态；期间操作其他控件会中断轮询并重跑，任务在后台继续，重跑后接着显示进度
+    status = st.empty()
+    while not job.finished:
+        status.progress(job.progress, text=f"{job.stage}（{job.elapsed:.0f} s）")
+        time.sleep(REPORT_POLL_INTERVAL)
+    status.empty()
 
+    if job.status == report_jobs.FAILED:
+        st.error(f"报告生成失败/Report generation failed: {job.error}")
+    else:
+        st.markdown(job.report)
@@ -0,0 +1,125 @@
+# comfort_chart.py
+
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+from utils.comfort import UTCI, PMV, ADAPTIVE, COLD, COMFORT, HOT, MISSING, DEFAULT_MET, DEFAULT_CLO, calculate_comfort
+from utils.data_processor import day_hour_matrix
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import months_between
+from utils.template_base import color_scale
+from utils.metrics import instrument
+
+# 可选模型：显示名称 -> (模型, 指标名称, 单位)
+COMFORT_MODELS = {
+    "UTCI 室外热应力/Outdoor UTCI": (UTCI, "UTCI", "°C"),
+    "PMV/PPD 静态舒适/Fanger PMV": (PMV, "PMV", ""),
+    "适应性舒适/Adaptive (ASHRAE-55)": (ADAPTIVE, "Δ Neutral Temperature", "°C"),
+}
+
+# 舒适状态的名称与颜色，与 monthly_comfort_percentages 的列顺序一致
+COMFORT_STATES = [
+    ("偏冷/Too Cold", "#4575b4"),
+    ("舒适/Comfortable", "#66bd63"),
+    ("偏热/Too Hot", "#d73027"),
+]
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+def generate_comfort_bar_chart(monthly, months, title):
+    """
+    生成逐月舒适时间占比的堆积柱状图。
+
+    Args:
+        monthly (numpy.ndarray): (12, 3) 的逐月占比（偏冷、舒适、偏热）。
+        months (list): 显示的月份（1–12）。
+        title (str): 图表标题。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的柱状图。
+    """
+    rows = np.asarray(months) - 1
+    x = [MONTH_NAMES[m - 1] for m in months]
+    fig = go.Figure()
+    for column, (name, color) in enumerate(COMFORT_STATES):
+        fig.add_trace(go.Bar(x=x, y=np.round(monthly[rows, column], 1), name=name, marker_color=color,
+                             hovertemplate="%{x} %{y}%<extra>" + name + "</extra>"))
+    fig.update_layout(title=title, barmode="stack", xaxis_title="Month", yaxis_title="Time (%)", yaxis_range=[0, 100])
+    return fig
+
+def generate_comfort_heatmap(values, arrays, title, unit, color_scheme):
+    """
+    生成舒适指标的“日 × 时”热力图。
+
+    Args:
+        values (numpy.ndarray): 逐行舒适指标。
+        arrays (EPWArrays): 数组数据（提供年积日与时刻）。
+        title (str): 图表标题。
+        unit (str): 指标单位。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的热力图。
+    """
+    days, matrix = day_hour_matrix(values, arrays.day_of_year, arrays.hour)
+    fig = go.Figure(data=go.Heatmap(
+        z=np.round(matrix.T, 2),
+        x=days,
+        y=list(range(24)),
+        colorscale=color_scale(color_scheme),
+        colorbar=dict(title=unit),
+        hovertemplate="Day %{x} %{y}:00<br>%{z} " + unit + "<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title="Day", yaxis_title="Hour")
+    return fig
+
+@instrument()
+def generate_comfort_charts(epw, start_month, end_month, color_scheme, show_charts=True):
+    """
+    生成热舒适（UTCI、PMV/PPD、适应性模型）图表。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表。
+
+    Returns:
+        dict: 所选模型的 calculate_comfort 结果，所需字段整列缺测时返回 None。
+    """
+    arrays = load_epw_arrays(epw)
+    model_label = st.radio("舒适模型/Comfort Model", list(COMFORT_MODELS), horizontal=True) if show_charts else next(iter(COMFORT_MODELS))
+    model, metric, unit = COMFORT_MODELS[model_label]
+
+    met, clo = DEFAULT_MET, DEFAULT_CLO
+    if show_charts and model == PMV:
+        col1, col2 = st.columns(2)
+        met = col1.slider("代谢率/Metabolic Rate (met)", 0.8, 2.0, DEFAULT_MET, 0.1)
+        clo = col2.slider("服装热阻/Clothing (clo)", 0.0, 1.5, DEFAULT_CLO, 0.1)
+
+    # 全年逐行指标按站点与参数缓存，时段只决定显示哪些月份
+    result = calculate_comfort(arrays, model, met, clo)
+    if result is None:
+        if show_charts:
+            st.warning(f"{model_label} 所需的气象数据缺测/No valid data for this comfort model.")
+        return None
+    months = months_between(start_month, end_month)
+
+    if show_charts:
+        name = model_label.split("/")[-1]
+        low, high = result["range"]
+        st.plotly_chart(generate_comfort_bar_chart(result["monthly"], months, f"Monthly Comfort Hours ({name})"), use_container_width=True)
+
+        # 所选时段的总体占比（按有效数据行数计算，子小时数据同样适用）
+        states = result["states"][np.isin(arrays.month, months)]
+        valid = max(np.count_nonzero(states != MISSING), 1)
+        shares = [np.count_nonzero(states == state) / valid * 100 for state in (COLD, COMFORT, HOT)]
+        st.caption(
+            f"舒适区间/Comfort range: {low:g} ≤ {metric} ≤ {high:g}{unit and ' ' + unit}；"
+            + "，".join(f"{label} {share:.1f}%" for (label, _), share in zip(COMFORT_STATES, shares))
+        )
+
+        st.plotly_chart(generate_comfort_heatmap(result["values"], arrays, f"{metric} by Day and Hour ({name})", unit, color_scheme), use_container_width=True)
+
+    return result
@@ -0,0 +1,131 @@
+# comparison_chart.py
+
+import os
+import threading
+import streamlit as st
+from cachetools import LRUCache
+from utils.chart_generator import generate_line_chart, generate_grouped_bar_chart
+from utils.data_loader import unzip_and_load_epw
+from utils.file_manager import download_file, get_station_url
+from utils.period_filter import months_between
+from utils.station_stack import build_station_stack, monthly_means, daily_means, passive_strategy_percentages, wind_statistics
+from utils.summaries import ComparisonSummary
+from utils.openai_integration import generate_comparison_advice
+from utils.metrics import instrument
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# 站点路径到本地解压 EPW 路径的缓存，避免每次重跑都重新下载对比站点
+_station_epw_paths = LRUCache(maxsize=64)
+_station_lock = threading.Lock()
+
+def get_station_name(station_path):
+    """
+    根据站点 ZIP 文件路径获取站点显示名称。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+
+    Returns:
+        str: 站点名称，例如 "CHN_SN_Xian.570360_CSWD"。
+    """
+    return os.path.basename(station_path).replace(".zip", "")
+
+def load_station_epw_path(station_path):
+    """
+    下载并解压站点数据，返回本地 EPW 文件路径（按站点缓存，本地文件被清理时重新下载）。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+
+    Returns:
+        str: 本地 EPW 文件路径。
+    """
+    with _station_lock:
+        epw_path = _station_epw_paths.get(station_path)
+    if epw_path is None or not os.path.exists(epw_path):
+        local_zip_path = download_file(get_station_url(station_path))
+        epw_path = unzip_and_load_epw(local_zip_path, os.path.basename(station_path)).file_path
+        with _station_lock:
+            _station_epw_paths[station_path] = epw_path
+    return epw_path
+
+@instrument()
+def generate_comparison_charts(station_paths, start_month, end_month, show_charts=True):
+    """
+    生成多站点对比图表。
+
+    Args:
+        station_paths (list): 待对比的站点 ZIP 文件路径列表。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        show_charts (bool): 是否显示图表。
+    """
+    if show_charts:
+        station_paths = st.multiselect(
+            "对比站点/Stations to compare",
+            station_paths,
+            default=station_paths,
+            format_func=get_station_name,
+        )
+    if len(station_paths) < 2:
+        if show_charts:
+            st.info("请先选择站点并点击“加入多站点对比”，至少需要两个站点/Add at least two stations to compare.")
+        return ComparisonSummary()
+
+    # 所有站点读入同一个（站点 × 小时 × 字段）堆叠数组，后续统计对全部站点一次完成
+    names = [get_station_name(path) for path in station_paths]
+    stack = build_station_stack([load_station_epw_path(path) for path in station_paths], names)
+
+    monthly_temperature = monthly_means(stack, "dry_bulb_temperature")
+    monthly_humidity = monthly_means(stack, "relative_humidity")
+    monthly_speed = monthly_means(stack, "wind_speed")
+    monthly_radiation = monthly_means(stack, "global_horizontal_radiation")
+    daily_temperature = daily_means(stack, "dry_bulb_temperature", months_between(start_month, end_month))
+    strategies = passive_strategy_percentages(stack)
+    wind = wind_statistics(stack)
+
+    # 对比结果按列保存数值，文字在显示或发送给 AI 时才生成
+    summary = ComparisonSummary(
+        names=tuple(names),
+        annual_mean=tuple(monthly_temperature.mean(axis=1).tolist()),
+        hottest_month=tuple(int(month) for month in monthly_temperature.idxmax(axis=1)),
+        hottest_value=tuple(monthly_temperature.max(axis=1).tolist()),
+        coldest_month=tuple(int(month) for month in monthly_temperature.idxmin(axis=1)),
+        coldest_value=tuple(monthly_temperature.min(axis=1).tolist()),
+        period_mean=tuple(daily_temperature.mean(axis=1).tolist()),
+        humidity_mean=tuple(monthly_humidity.mean(axis=1).tolist()),
+        wind_mean=tuple(wind["mean_speed"].tolist()),
+        prevailing_direction=tuple(wind["prevailing_direction"].tolist()),
+        calm_percentage=tuple(wind["calm_percentage"].tolist()),
+        top_strategy=tuple(strategies.idxmax(axis=1).tolist()),
+        top_strategy_percentage=tuple(strategies.max(axis=1).tolist()),
+    )
+
+    if show_charts:
+        charts = {
+            'Monthly Dry Bulb Temperature': lambda: generate_line_chart(
+                monthly_temperature.T.to_dict("list"), "Monthly Average Dry Bulb Temperature", "Month", "Average Dry Bulb Temperature (°C)", MONTH_NAMES),
+            'Daily Dry Bulb Temperature': lambda: generate_line_chart(
+                daily_temperature.T.to_dict("list"), f"Daily Dry Bulb Temperature ({start_month} to {end_month} Month)", "Day", "Daily Average Dry Bulb Temperature (°C)", daily_temperature.columns.tolist()),
+            'Monthly Relative Humidity': lambda: generate_line_chart(
+                monthly_humidity.T.to_dict("list"), "Monthly Average Relative Humidity", "Month", "Average Relative Humidity (%)", MONTH_NAMES),
+            'Monthly Wind Speed': lambda: generate_line_chart(
+                monthly_speed.T.to_dict("list"), "Monthly Average Wind Speed", "Month", "Average Wind Speed (m/s)", MONTH_NAMES),
+            'Monthly Global Horizontal Radiation': lambda: generate_line_chart(
+                monthly_radiation.T.to_dict("list"), "Monthly Average Global Horizontal Radiation", "Month", "Global Horizontal Radiation (W/m²)", MONTH_NAMES),
+            'Passive Strategies': lambda: generate_grouped_bar_chart(
+                strategies.columns.tolist(), strategies.T.to_dict("list"), "Passive Strategies/被动策略", "Percentage of Hours/小时占比 (%)", "States/策略", orientation="h"),
+        }
+
+        # 显示图表（只生成选中的图）
+        chart_selection = st.radio('Select Chart to Display', list(charts))
+        st.plotly_chart(charts[chart_selection](), use_container_width=True)
+        st.dataframe(wind.round(2))
+
+        # 新增AI分析按钮
+        if st.button('Station Comparison Evaluation'):
+            advice = generate_comparison_advice(summary.render())
+            st.markdown(f"**AI分析结果:**\n{advice}")
+
+    return summary
@@ -0,0 +1,171 @@
+# dashboard_chart.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import streamlit as st
+from utils.chart_generator import generate_bar_chart
+from utils.data_processor import aggregate_by_day, aggregate_by_month
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import select_period
+from utils.summaries import (TEMPERATURE, HUMIDITY, WIND, SKY_COVER, RADIATION, ILLUMINANCE,
+                             UnavailableSummary, get_wind_direction_name, summarize_series)
+from utils.metrics import instrument
+from config import get_dashboard_workers
+
+# 总览面板：(模块, 变体, 字段, 面板标题, 纵轴标签, 单位)，按显示顺序排列
+DASHBOARD_PANELS = [
+    (TEMPERATURE, "", "dry_bulb_temperature", "温度/Temperature", "Dry Bulb Temperature (°C)", "°C"),
+    (HUMIDITY, "", "relative_humidity", "相对湿度/Relative Humidity", "Relative Humidity (%)", "%"),
+    (WIND, "", "wind_speed", "风速/Wind Speed", "Wind Speed (m/s)", "m/s"),
+    (SKY_COVER, "", "total_sky_cover", "天空覆盖量/Total Sky Cover", "Total Sky Cover (tenths)", "tenths"),
+    (RADIATION, "Global", "global_horizontal_radiation", "全球水平辐射/Global Horizontal Rad", "Global Horizontal Radiation (W/m²)", "W/m²"),
+    (ILLUMINANCE, "Global", "global_horizontal_illuminance", "全球水平照度/Global Horizontal Ill", "Global Horizontal Illuminance (lux)", "lux"),
+]
+
+# 面板图表高度（像素），两列排布时保持紧凑
+PANEL_HEIGHT = 280
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_dashboard_executor():
+    """
+    返回进程内共用的面板计算线程池（首次调用时创建，线程数由 config 中的 DASHBOARD_WORKERS 决定）。
+
+    Returns:
+        ThreadPoolExecutor: 线程池。
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=get_dashboard_workers(), thread_name_prefix="dashboard")
+        return _executor
+
+def compute_panel(arrays, selection, panel, color_scheme, start_month, end_month, show_charts=True):
+    """
+    计算单个总览面板的统计结果与逐日柱状图（在工作线程中执行，不调用 Streamlit）。
+
+    Args:
+        arrays (EPWArrays): 全年数据数组（各面板共用）。
+        selection (PeriodSelection): 所选时段（各面板共用）。
+        panel (tuple): DASHBOARD_PANELS 中的一项。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        show_charts (bool): 是否生成图表，为 False 时只计算统计结果。
+
+    Returns:
+        tuple: (统计结果, 图表)，字段整列缺测或不生成图表时图表为 None。
+    """
+    module, variant, field, _, y_label, _ = panel
+    if not arrays.is_available(field) or (module == WIND and not arrays.is_available("wind_direction")):
+        return UnavailableSummary(module, variant), None
+
+    # 逐日均值（所选时段）与逐月均值（全年）
+    daily_averages = aggregate_by_day(selection.values(field), selection.day_of_year)
+    monthly_averages = aggregate_by_month(arrays.values(field), arrays.month)
+
+    extra = {}
+    if module == WIND:
+        from charts.wind_chart import calculate_prevailing_direction
+        extra["prevailing_month"] = float(calculate_prevailing_direction(
+            selection.values("wind_direction"), selection.values("wind_speed"))[0])
+        extra["prevailing_year"] = float(calculate_prevailing_direction(
+            arrays.values("wind_direction"), arrays.values("wind_speed"))[0])
+    summary = summarize_series(module, monthly_averages, daily_averages, variant=variant, **extra)
+    if not show_charts:
+        return summary, None
+
+    fig = generate_bar_chart(
+        daily_averages,
+        f"Daily {y_label} ({start_month} to {end_month} Month)",
+        "Day",
+        y_label,
+        color_scheme
+    )
+    fig.update_layout(height=PANEL_HEIGHT, margin=dict(l=10, r=10, t=40, b=10))
+    return summary, fig
+
+def format_panel_caption(summary, unit):
+    """
+    生成面板下方的简要统计说明。
+
+    Args:
+        summary (ClimateSummary): 面板的统计结果。
+        unit (str): 数值单位。
+
+    Returns:
+        str: 说明文字。
+    """
+    caption = (
+        f"所选时段日均/Period mean {summary.period_mean:.1f} {unit}，"
+        f"最高/Max {summary.period_max:.1f}，最低/Min {summary.period_min:.1f}；"
+        f"全年月均/Annual mean {summary.annual_mean:.1f} {unit}"
+    )
+    if summary.module == WIND:
+        caption += f"；盛行风向/Prevailing {get_wind_direction_name([summary.prevailing_month])}"
+    return caption
+
+def render_panel(placeholder, panel, summary, fig):
+    """
+    将计算完成的面板写入其占位符（在主线程中执行）。
+
+    Args:
+        placeholder (DeltaGenerator): 面板的占位符。
+        panel (tuple): DASHBOARD_PANELS 中的一项。
+        summary: 面板的统计结果。
+        fig (plotly.graph_objects.Figure): 逐日柱状图，为 None 时显示缺测提示。
+    """
+    _, _, _, title, _, unit = panel
+    with placeholder.container():
+        st.markdown(f"**{title}**")
+        if fig is None:
+            st.warning(summary.render() + "/No valid data for this field.")
+            return
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(format_panel_caption(summary, unit))
+
+@instrument()
+def generate_dashboard_charts(epw, start_month, end_month, color_scheme, show_charts=True):
+    """
+    生成全部变量总览：各面板共用一份所选时段的数据，在线程池中并行计算，按完成顺序写入各自的占位符。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表。
+
+    Returns:
+        dict: 模块名到统计结果的映射（按 DASHBOARD_PANELS 的顺序）。
+    """
+    # 在主线程中加载并切片一次，各面板只读共用
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
+
+    # 先按固定顺序放好占位符，面板完成后原地填充，页面布局不随完成顺序跳动
+    placeholders = []
+    if show_charts:
+        columns = st.columns(2)
+        for i, panel in enumerate(DASHBOARD_PANELS):
+            placeholder = columns[i % 2].empty()
+            placeholder.info(f"{panel[3]} 计算中…/Computing…")
+            placeholders.append(placeholder)
+
+    executor = get_dashboard_executor()
+    futures = {
+        executor.submit(compute_panel, arrays, selection, panel, color_scheme, start_month, end_month, show_charts): i
+        for i, panel in enumerate(DASHBOARD_PANELS)
+    }
+
+    # 工作线程没有 Streamlit 的脚本运行上下文，渲染统一在主线程中按完成顺序进行
+    results = [None] * len(DASHBOARD_PANELS)
+    for future in as_completed(futures):
+        i = futures[future]
+        summary, fig = future.result()
+        results[i] = summary
+        if show_charts:
+            render_panel(placeholders[i], DASHBOARD_PANELS[i], summary, fig)
+
+    return {panel[0]: summary for panel, summary in zip(DASHBOARD_PANELS, results)}
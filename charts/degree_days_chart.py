@@ -0,0 +1,269 @@
+# degree_days_chart.py
+
+import threading
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+from cachetools import LRUCache
+from utils.chart_generator import generate_bar_chart
+from utils.data_processor import aggregate_by_day
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import months_between, select_period
+from utils.summaries import DEGREE_DAYS, DegreeDaysSummary, UnavailableSummary
+from utils.openai_integration import generate_degree_days_analysis_advice
+from utils.metrics import instrument
+
+# 默认基准温度（°C），与《民用建筑热工设计规范》中 HDD18 / CDD26 的取法一致
+DEFAULT_HEATING_BASE = 18.0
+DEFAULT_COOLING_BASE = 26.0
+
+# 平衡点曲线扫描的基准温度范围（°C）
+SWEEP_BASES = np.arange(-10.0, 35.5, 0.5)
+
+_prefix_cache = LRUCache(maxsize=32)
+_degree_days_cache = LRUCache(maxsize=4096)
+_cache_lock = threading.Lock()
+
+def sweep_degree_sums(values, bases, weight=1.0):
+    """
+    一次性计算多个基准温度下的供暖/制冷度数之和（排序 + 前缀和，复杂度 O((n + m) log n)）。
+
+    Args:
+        values (numpy.ndarray): 温度数组（逐日均温或逐时温度）。
+        bases (numpy.ndarray): 基准温度数组。
+        weight (float): 每个值的权重（例如子小时数据每行为 1/timestep 小时）。
+
+    Returns:
+        tuple: (供暖度数数组, 制冷度数数组)，与 bases 一一对应。
+    """
+    ordered = np.sort(np.asarray(values, dtype=np.float64))
+    prefix = np.concatenate(([0.0], np.cumsum(ordered)))
+    return _sweep_sorted(ordered, prefix, bases, weight)
+
+def _sweep_sorted(ordered, prefix, bases, weight):
+    """在已排序数组及其前缀和上计算各基准温度的度数之和。"""
+    bases = np.asarray(bases, dtype=np.float64)
+    below = np.searchsorted(ordered, bases, side="left")
+    heating = bases * below - prefix[below]
+    cooling = (prefix[-1] - prefix[below]) - bases * (len(ordered) - below)
+    # 前缀和相减可能产生极小的负数舍入误差
+    return np.maximum(heating, 0.0) * weight, np.maximum(cooling, 0.0) * weight
+
+def _daily_means(arrays):
+    """全年逐日均温及每一天所属的月份。"""
+    daily = aggregate_by_day(arrays.values("dry_bulb_temperature"), arrays.day_of_year)
+    _, first_rows = np.unique(arrays.day_of_year, return_index=True)
+    return daily.to_numpy(), arrays.month[first_rows]
+
+def _sorted_prefix(arrays):
+    """
+    获取站点逐日均温与逐时温度的排序数组和前缀和（按站点缓存）。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+
+    Returns:
+        tuple: (逐日排序值, 逐日前缀和, 逐时排序值, 逐时前缀和)
+    """
+    key = arrays.cache_key
+    with _cache_lock:
+        cached = _prefix_cache.get(key) if key is not None else None
+    if cached is not None:
+        return cached
+
+    daily, _ = _daily_means(arrays)
+    daily_sorted = np.sort(daily)
+    hourly_sorted = np.sort(arrays.values("dry_bulb_temperature"))
+    cached = (
+        daily_sorted,
+        np.concatenate(([0.0], np.cumsum(daily_sorted))),
+        hourly_sorted,
+        np.concatenate(([0.0], np.cumsum(hourly_sorted))),
+    )
+    if key is not None:
+        with _cache_lock:
+            _prefix_cache[key] = cached
+    return cached
+
+def calculate_degree_days(arrays, bases):
+    """
+    计算一组基准温度下的全年度日数与度时数，结果按（站点, 基准温度）缓存。
+
+    度日数采用日均温法：HDD = Σ max(基准 - 日均温, 0)，CDD = Σ max(日均温 - 基准, 0)；
+    度时数按逐时（子小时数据按时间步加权）温度计算。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+        bases (array-like): 基准温度（°C），可以是单个数值或数组。
+
+    Returns:
+        dict: 键为 "hdd"、"cdd"、"hdh"、"cdh"，值为与 bases 对应的 numpy 数组；干球温度整列缺测时返回 None。
+    """
+    if not arrays.is_available("dry_bulb_temperature"):
+        return None
+
+    bases = np.atleast_1d(np.asarray(bases, dtype=np.float64))
+    key = arrays.cache_key
+    results = np.full((len(bases), 4), np.nan)
+    # 单独记录命中情况，结果本身为 NaN 时也不会被当作未命中反复计算
+    computed = np.zeros(len(bases), dtype=bool)
+
+    if key is not None:
+        with _cache_lock:
+            for i, base in enumerate(bases):
+                cached = _degree_days_cache.get((key, float(base)))
+                if cached is not None:
+                    results[i] = cached
+                    computed[i] = True
+
+    missing = np.flatnonzero(~computed)
+    if len(missing):
+        daily_sorted, daily_prefix, hourly_sorted, hourly_prefix = _sorted_prefix(arrays)
+        hdd, cdd = _sweep_sorted(daily_sorted, daily_prefix, bases[missing], 1.0)
+        hdh, cdh = _sweep_sorted(hourly_sorted, hourly_prefix, bases[missing], 1.0 / arrays.timestep)
+        results[missing] = np.column_stack((hdd, cdd, hdh, cdh))
+        if key is not None:
+            with _cache_lock:
+                for i in missing:
+                    _degree_days_cache[(key, float(bases[i]))] = tuple(results[i])
+
+    return {"hdd": results[:, 0], "cdd": results[:, 1], "hdh": results[:, 2], "cdh": results[:, 3]}
+
+def calculate_monthly_degree_days(arrays, base_heating, base_cooling):
+    """
+    计算逐月的供暖/制冷度日数。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+        base_heating (float): 供暖基准温度（°C）。
+        base_cooling (float): 制冷基准温度（°C）。
+
+    Returns:
+        tuple: (逐月HDD数组, 逐月CDD数组)，长度均为 12。
+    """
+    daily, day_months = _daily_means(arrays)
+    heating = np.bincount(day_months, weights=np.maximum(base_heating - daily, 0.0), minlength=13)[1:13]
+    cooling = np.bincount(day_months, weights=np.maximum(daily - base_cooling, 0.0), minlength=13)[1:13]
+    return heating, cooling
+
+@instrument()
+def generate_degree_days_charts(epw, start_month, end_month, color_scheme, show_charts=True,
+                                base_heating=DEFAULT_HEATING_BASE, base_cooling=DEFAULT_COOLING_BASE):
+    """
+    生成度日数与度时数图表。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表（显示时基准温度由页面输入决定）。
+        base_heating (float): 供暖基准温度（°C），不显示图表时使用。
+        base_cooling (float): 制冷基准温度（°C），不显示图表时使用。
+    """
+    if show_charts:
+        col1, col2 = st.columns(2)
+        base_heating = col1.number_input("供暖基准温度/Heating base temperature (°C)", -10.0, 35.0, DEFAULT_HEATING_BASE, 0.5)
+        base_cooling = col2.number_input("制冷基准温度/Cooling base temperature (°C)", -10.0, 35.0, DEFAULT_COOLING_BASE, 0.5)
+
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
+
+    # 整列缺测的字段无法统计，直接给出提示
+    if not arrays.is_available("dry_bulb_temperature"):
+        summary = UnavailableSummary(DEGREE_DAYS)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
+
+    # 全年度日数与度时数
+    annual_heating = calculate_degree_days(arrays, base_heating)
+    annual_cooling = calculate_degree_days(arrays, base_cooling)
+    hdd, hdh = annual_heating["hdd"][0], annual_heating["hdh"][0]
+    cdd, cdh = annual_cooling["cdd"][0], annual_cooling["cdh"][0]
+
+    # 逐月度日数
+    monthly_hdd, monthly_cdd = calculate_monthly_degree_days(arrays, base_heating, base_cooling)
+    selected_months = np.array(months_between(start_month, end_month)) - 1
+    selected_hdd = monthly_hdd[selected_months].sum()
+    selected_cdd = monthly_cdd[selected_months].sum()
+
+    # 所选月份的逐日供暖/制冷度数
+    daily_averages = aggregate_by_day(selection.values("dry_bulb_temperature"), selection.day_of_year)
+    daily_heating = np.maximum(base_heating - daily_averages, 0.0)
+    daily_cooling = np.maximum(daily_averages - base_cooling, 0.0)
+    heating_days = int((daily_heating > 0).sum())
+    cooling_days = int((daily_cooling > 0).sum())
+
+    # 统计结果只保存数值，文字在显示或发送给 AI 时才生成
+    summary = DegreeDaysSummary(
+        base_heating=float(base_heating),
+        base_cooling=float(base_cooling),
+        hdd=float(hdd),
+        cdd=float(cdd),
+        hdh=float(hdh),
+        cdh=float(cdh),
+        max_hdd_month=int(monthly_hdd.argmax() + 1),
+        max_hdd=float(monthly_hdd.max()),
+        max_cdd_month=int(monthly_cdd.argmax() + 1),
+        max_cdd=float(monthly_cdd.max()),
+        period_hdd=float(selected_hdd),
+        period_cdd=float(selected_cdd),
+        heating_days=heating_days,
+        cooling_days=cooling_days,
+    )
+
+    if show_charts:
+        month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+        # 生成逐月的度日数柱状图
+        fig_dd1 = go.Figure(data=[
+            go.Bar(x=month_names, y=monthly_hdd, name=f"HDD{base_heating:g}", marker_color="royalblue"),
+            go.Bar(x=month_names, y=monthly_cdd, name=f"CDD{base_cooling:g}", marker_color="tomato"),
+        ])
+        fig_dd1.update_layout(
+            title="Monthly Heating and Cooling Degree Days",
+            xaxis_title="Month",
+            yaxis_title="Degree Days (°C·d)",
+            barmode="group",
+        )
+
+        # 生成每日的供暖/制冷度数柱状图
+        daily_degrees = daily_cooling - daily_heating
+        fig_dd2 = generate_bar_chart(
+            daily_degrees,
+            f"Daily Degree Days ({start_month} to {end_month} Month, cooling positive / heating negative)",
+            "Day",
+            "Degree Days (°C·d)",
+            color_scheme
+        )
+
+        # 生成平衡点曲线（一次扫描全部基准温度）
+        sweep = calculate_degree_days(arrays, SWEEP_BASES)
+        fig_dd3 = go.Figure(data=[
+            go.Scatter(x=SWEEP_BASES, y=sweep["hdd"], mode="lines", name="HDD", line_color="royalblue"),
+            go.Scatter(x=SWEEP_BASES, y=sweep["cdd"], mode="lines", name="CDD", line_color="tomato"),
+        ])
+        fig_dd3.add_vline(x=base_heating, line_dash="dash", line_color="royalblue")
+        fig_dd3.add_vline(x=base_cooling, line_dash="dash", line_color="tomato")
+        fig_dd3.update_layout(
+            title="Degree Days by Base Temperature (Balance Point Curve)",
+            xaxis_title="Base Temperature (°C)",
+            yaxis_title="Annual Degree Days (°C·d)",
+        )
+
+        # 显示图表
+        chart_selection = st.radio('Select Chart to Display', ['Monthly Degree Days', 'Daily Degree Days', 'Balance Point Curve'])
+        if chart_selection == 'Monthly Degree Days':
+            st.plotly_chart(fig_dd1, use_container_width=True)
+        elif chart_selection == 'Daily Degree Days':
+            st.plotly_chart(fig_dd2, use_container_width=True)
+        else:
+            st.plotly_chart(fig_dd3, use_container_width=True)
+
+        # 新增AI分析按钮
+        if st.button('Current Month and Annual Degree Days Evaluation'):
+            advice = generate_degree_days_analysis_advice(summary.monthly_text(), summary.daily_text())
+            st.markdown(f"**AI分析结果:**\n{advice}")
+
+    return summary
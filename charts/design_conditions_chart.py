@@ -0,0 +1,222 @@
+# design_conditions_chart.py
+
+import threading
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from utils.epw_arrays import load_epw_arrays
+from utils.summaries import DESIGN_CONDITIONS, DesignConditionsSummary, UnavailableSummary
+from utils.openai_integration import generate_design_conditions_advice
+from utils.metrics import instrument
+
+# ASHRAE 设计工况：(名称, 年超越小时比例对应的分位数)
+# 制冷 0.4%/1%/2% 为全年有 0.4%/1%/2% 的小时高于该值；供暖 99.6%/99% 为全年有 99.6%/99% 的小时高于该值
+DESIGN_LEVELS = [
+    ("Cooling 0.4%", 0.996),
+    ("Cooling 1%", 0.99),
+    ("Cooling 2%", 0.98),
+    ("Heating 99.6%", 0.004),
+    ("Heating 99%", 0.01),
+]
+
+DESIGN_VARIABLES = [
+    ("Dry Bulb", "干球温度"),
+    ("Wet Bulb", "湿球温度"),
+    ("Dew Point", "露点温度"),
+]
+
+# 计算设计工况所需的 EPW 字段，任一字段整列缺测时无法计算
+DESIGN_FIELDS = ("dry_bulb_temperature", "relative_humidity", "dew_point_temperature")
+
+_design_cache = LRUCache(maxsize=256)
+_cache_lock = threading.Lock()
+
+def _partition_quantiles(values, quantiles):
+    """
+    用部分排序（np.partition）计算分位数，插值方式与 numpy.percentile 的线性插值一致。
+
+    Args:
+        values (numpy.ndarray): 数据数组，最后一维为时间；可以是二维（站点 × 时刻）。
+        quantiles (numpy.ndarray): 分位数（0–1）。
+
+    Returns:
+        numpy.ndarray: 形状为 values.shape[:-1] + (len(quantiles),) 的分位数值。
+    """
+    n = values.shape[-1]
+    positions = np.asarray(quantiles, dtype=np.float64) * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    # 只需把各分位数两侧的次序统计量放到正确位置，其余元素不排序
+    kth = np.unique(np.concatenate((lower, upper)))
+    partitioned = np.partition(values, kth, axis=-1)
+    fraction = positions - lower
+    return partitioned[..., lower] * (1.0 - fraction) + partitioned[..., upper] * fraction
+
+def saturated_vapor_pressure(t_kelvin):
+    """
+    向量化计算饱和水蒸气压（ASHRAE Handbook 公式，与 ladybug 的 saturated_vapor_pressure 一致）。
+
+    Args:
+        t_kelvin (numpy.ndarray): 温度（K）。
+
+    Returns:
+        numpy.ndarray: 饱和水蒸气压（Pa）。
+    """
+    t = np.asarray(t_kelvin, dtype=np.float64)
+    ice = (-5.6745359E+03 / t + 6.3925247 - 9.677843E-03 * t + 6.2215701E-07 * t ** 2
+           + 2.0747825E-09 * t ** 3 - 9.484024E-13 * t ** 4 + 4.1635019 * np.log(t))
+    water = (-5.8002206E+03 / t + 1.3914993 - 4.8640239E-02 * t + 4.1764768E-05 * t ** 2
+             - 1.4452093E-08 * t ** 3 + 6.5459673 * np.log(t))
+    return np.exp(np.where(t <= 273.15, ice, water))
+
+def _humid_ratio_from_db_wb(t_drybulb, t_wetbulb, b_press):
+    """由干球与湿球温度计算含湿量（kg/kg，ASHRAE Handbook 式 33/35）。"""
+    p_ws = saturated_vapor_pressure(t_wetbulb + 273.15)
+    w_star = 0.621945 * p_ws / (b_press - p_ws)
+    above = ((2501. - 2.326 * t_wetbulb) * w_star - 1.006 * (t_drybulb - t_wetbulb)) / (2501. + 1.86 * t_drybulb - 4.186 * t_wetbulb)
+    below = ((2830. - 0.24 * t_wetbulb) * w_star - 1.006 * (t_drybulb - t_wetbulb)) / (2830. + 1.86 * t_drybulb - 2.1 * t_wetbulb)
+    return np.where(t_wetbulb >= 0, above, below)
+
+def calculate_wet_bulb(t_drybulb, rh, b_press=101325, iterations=40):
+    """
+    向量化计算湿球温度（ladybug wet_bulb_from_db_rh 的心理学公式，全部时刻同时二分求解）。
+
+    湿球温度位于干球温度之下 100 °C 的区间内，固定二分 40 次后误差小于 1e-10 °C。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        rh (numpy.ndarray): 相对湿度（%）。
+        b_press (float): 大气压（Pa），默认海平面大气压。
+        iterations (int): 二分次数。
+
+    Returns:
+        numpy.ndarray: 湿球温度（°C），输入缺测时为 NaN。
+    """
+    t_drybulb = np.asarray(t_drybulb, dtype=np.float64)
+    p_w = saturated_vapor_pressure(t_drybulb + 273.15) * (np.asarray(rh, dtype=np.float64) / 100)
+    humid_ratio = p_w * 0.621945 / (b_press - p_w)
+    low, high = t_drybulb - 100.0, t_drybulb.copy()
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        above = _humid_ratio_from_db_wb(t_drybulb, middle, b_press) > humid_ratio
+        high = np.where(above, middle, high)
+        low = np.where(above, low, middle)
+    return np.where(np.isfinite(humid_ratio), (low + high) / 2, np.nan)
+
+def _design_series(arrays):
+    """干球、湿球、露点温度的逐时数组（按 DESIGN_VARIABLES 的顺序叠放）。"""
+    t_drybulb = arrays.values("dry_bulb_temperature")
+    t_wetbulb = calculate_wet_bulb(t_drybulb, arrays.values("relative_humidity"))
+    return np.stack((t_drybulb, t_wetbulb, arrays.values("dew_point_temperature")))
+
+def _to_table(values):
+    """将（变量 × 设计工况）数组整理为表格。"""
+    return pd.DataFrame(
+        values,
+        index=[name for name, _ in DESIGN_VARIABLES],
+        columns=[name for name, _ in DESIGN_LEVELS],
+    )
+
+def calculate_design_conditions(arrays):
+    """
+    计算单个站点的 ASHRAE 设计工况（按站点缓存）。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+
+    Returns:
+        pandas.DataFrame: 行为干球/湿球/露点温度，列为各设计工况，单位 °C。
+    """
+    key = arrays.cache_key
+    with _cache_lock:
+        cached = _design_cache.get(key) if key is not None else None
+    if cached is None:
+        cached = _partition_quantiles(_design_series(arrays), [q for _, q in DESIGN_LEVELS])
+        if key is not None:
+            with _cache_lock:
+                _design_cache[key] = cached
+    return _to_table(cached)
+
+def calculate_design_conditions_batch(epw_paths):
+    """
+    批量计算多个站点的设计工况，用于站点对比表。
+
+    行数相同的站点（例如都是 8760 行的逐时文件）会叠成一个（站点 × 变量 × 时刻）数组，
+    一次 np.partition 完成整组计算；已缓存的站点直接复用。
+
+    Args:
+        epw_paths (list): EPW 文件路径列表。
+
+    Returns:
+        pandas.DataFrame: 以（站点路径, 变量）为行索引、各设计工况为列的对比表。
+    """
+    station_arrays = [load_epw_arrays(path) for path in epw_paths]
+    results = [None] * len(station_arrays)
+
+    groups = {}
+    with _cache_lock:
+        for i, arrays in enumerate(station_arrays):
+            cached = _design_cache.get(arrays.cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                groups.setdefault(len(arrays), []).append(i)
+
+    quantiles = [q for _, q in DESIGN_LEVELS]
+    for indices in groups.values():
+        stacked = np.stack([_design_series(station_arrays[i]) for i in indices])
+        values = _partition_quantiles(stacked, quantiles)
+        with _cache_lock:
+            for i, station_values in zip(indices, values):
+                _design_cache[station_arrays[i].cache_key] = station_values
+                results[i] = station_values
+
+    return pd.concat([_to_table(values) for values in results], keys=list(epw_paths), names=["Station", "Variable"])
+
+@instrument()
+def generate_design_conditions_charts(epw, show_charts=True):
+    """
+    生成设计工况表格与图表。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        show_charts (bool): 是否显示图表。
+    """
+    arrays = load_epw_arrays(epw)
+
+    # 整列缺测的字段无法统计，直接给出提示
+    if not all(arrays.is_available(field) for field in DESIGN_FIELDS):
+        summary = UnavailableSummary(DESIGN_CONDITIONS)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
+
+    table = calculate_design_conditions(arrays)
+
+    # 统计结果只保存（变量 × 设计工况）数值，文字在显示或发送给 AI 时才生成
+    summary = DesignConditionsSummary(tuple(tuple(row) for row in table.to_numpy().tolist()))
+
+    if show_charts:
+        st.dataframe(table.round(1))
+
+        # 生成各设计工况的分组柱状图
+        fig = go.Figure(data=[
+            go.Bar(x=table.columns.tolist(), y=table.loc[name].tolist(), name=name)
+            for name, _ in DESIGN_VARIABLES
+        ])
+        fig.update_layout(
+            title="Design Conditions/设计工况",
+            xaxis_title="Design Level/设计工况",
+            yaxis_title="Temperature (°C)",
+            barmode="group",
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        # 新增AI分析按钮
+        if st.button('Design Conditions Evaluation'):
+            advice = generate_design_conditions_advice(summary.render())
+            st.markdown(f"**AI分析结果:**\n{advice}")
+
+    return summary
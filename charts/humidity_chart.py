@@ -1,14 +1,17 @@
 # humidity_chart.py
 
 import streamlit as st
-import numpy as np
 from utils.chart_generator import generate_bar_chart
-from utils.data_processor import filter_by_analysis_period, calculate_daily_averages, calculate_monthly_averages
-from utils.template_base import map_to_color
+from utils.data_processor import aggregate_by_day, aggregate_by_month
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import select_period
+from utils import summary_store
+from utils.summaries import HUMIDITY, UnavailableSummary, summarize_series
 from utils.openai_integration import generate_humidity_analysis_advice
-from ladybug.analysisperiod import AnalysisPeriod
+from utils.metrics import instrument
 
-def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_charts=True):
+@instrument()
+def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_charts=True, station_key=None):
     """
     生成湿度相关图表。
 
@@ -16,62 +19,35 @@ def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_char
         epw (EPW): 加载的EPW对象。
         start_month (int): 起始月份。
         end_month (int): 终止月份。
-        color_scheme (int): 色卡编号。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表。
+        station_key (str): 站点标识，统计结果优先读取预计算存储，为 None 时直接计算。
     """
-    # 创建分析周期
-    range_select = AnalysisPeriod(st_month=start_month, end_month=end_month)
-    range_full = AnalysisPeriod(st_month=1, end_month=12)
-    range_day = AnalysisPeriod(st_month=start_month, st_day=1, end_month=end_month, end_day=31)
+    # 选择分析时段（按预计算的月份索引切片，不再逐个日期筛选）
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
 
-    # 获取相对湿度数据
-    humidity_select = filter_by_analysis_period(epw.relative_humidity, range_select)
-    humidity_full = filter_by_analysis_period(epw.relative_humidity, range_full)
-    humidity_day = filter_by_analysis_period(epw.relative_humidity, range_day)
-    
-    humidity_values_select = humidity_select.values
-    humidity_values_full = humidity_full.values
-    humidity_values_day = humidity_day.values
+    # 整列缺测的字段无法统计，直接给出提示
+    if not arrays.is_available("relative_humidity"):
+        summary = UnavailableSummary(HUMIDITY)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
 
-    # 处理颜色映射
-    min_humidity_select = np.min(humidity_values_select)
-    max_humidity_select = np.max(humidity_values_select)
-    min_humidity_full = np.min(humidity_values_full)
-    max_humidity_full = np.max(humidity_values_full)
-
-    color_values_select_humidity = [map_to_color(humidity, min_humidity_select, max_humidity_select, color_scheme) for humidity in humidity_values_select]
-    color_values_full_humidity = [map_to_color(humidity, min_humidity_full, max_humidity_full, color_scheme) for humidity in humidity_values_full]
+    # 获取相对湿度数据
+    humidity_values_select = selection.values("relative_humidity")
+    humidity_values_full = arrays.values("relative_humidity")
 
     # 计算日均湿度
-    daily_averages_humidity = calculate_daily_averages(humidity_values_day, humidity_day.datetimes)
-    min_humidity_daily_avg = daily_averages_humidity.min()
-    max_humidity_daily_avg = daily_averages_humidity.max()
-    color_values_day_humidity = [map_to_color(humidity, min_humidity_daily_avg, max_humidity_daily_avg, color_scheme) for humidity in daily_averages_humidity]
+    daily_averages_humidity = aggregate_by_day(humidity_values_select, selection.day_of_year)
 
     # 计算每月的相对湿度均值
-    monthly_averages_humidity = calculate_monthly_averages(humidity_values_full, humidity_full.datetimes)
-    min_avg_humidity = monthly_averages_humidity.min()
-    max_avg_humidity = monthly_averages_humidity.max()
-    avg_color_values_humidity = [map_to_color(humidity, min_avg_humidity, max_avg_humidity, color_scheme) for humidity in monthly_averages_humidity]
-
-    # 计算一些总结性统计数据
-    total_avg_humidity = monthly_averages_humidity.mean()
-    lowest_humidity_month = monthly_averages_humidity.idxmin()
-    highest_humidity_month = monthly_averages_humidity.idxmax()
-    humidity_difference = max_avg_humidity - min_avg_humidity
-    current_month_avg_humidity = daily_averages_humidity.mean()
-    max_humidity_daily_avg = daily_averages_humidity.max()
-    min_humidity_daily_avg = daily_averages_humidity.min()
-    
-    monthly_text = str(
-        f"从全年来看，总的平均相对湿度是{total_avg_humidity:.2f}%，"
-        f"最高相对湿度出现在{highest_humidity_month}月，为{min_avg_humidity:.2f}%，"
-        f"最低相对湿度出现在{lowest_humidity_month}月，为{max_avg_humidity:.2f}%，"
-        f"最高湿度月与最低湿度月之间的相对湿度差为{humidity_difference:.2f}%"
-    )
+    monthly_averages_humidity = aggregate_by_month(humidity_values_full, arrays.month)
 
-    daily_text = str(
-        f"当前月份的平均相对湿度是{current_month_avg_humidity:.2f}%，"
-        f"最高相对湿度是{max_humidity_daily_avg:.2f}%，最低相对湿度是{min_humidity_daily_avg:.2f}%"
+    # 统计结果只保存数值，文字在显示或发送给 AI 时才生成；仓库站点优先读取预计算结果
+    summary = summary_store.get_or_compute_summary(
+        station_key, HUMIDITY, start_month, end_month,
+        lambda: summarize_series(HUMIDITY, monthly_averages_humidity, daily_averages_humidity),
     )
 
     if show_charts:     
@@ -81,7 +57,7 @@ def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_char
             f"Hourly Relative Humidity ({start_month} to {end_month} Month)",
             "Hour",
             "Relative Humidity (%)",
-            color_values_select_humidity
+            color_scheme
         )
         
         # 生成每日的相对湿度柱状图
@@ -90,7 +66,7 @@ def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_char
             f"Daily Relative Humidity ({start_month} to {end_month} Month)",
             "Day",
             "Daily Average Relative Humidity (%)",
-            color_values_day_humidity
+            color_scheme
         )
 
         # 生成每月的相对湿度柱状图
@@ -99,7 +75,7 @@ def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_char
             "Monthly Average Relative Humidity",
             "Month",
             "Average Relative Humidity (%)",
-            avg_color_values_humidity
+            color_scheme
         )
         fig_humidity3.update_xaxes(tickvals=list(range(1, 13)), ticktext=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
@@ -114,7 +90,7 @@ def generate_humidity_charts(epw, start_month, end_month, color_scheme,show_char
     
         # 新增AI分析按钮
         if st.button('Evaluate Current Month and Annual Relative Humidity'):
-            advice = generate_humidity_analysis_advice(monthly_text, daily_text)
+            advice = generate_humidity_analysis_advice(summary.monthly_text(), summary.daily_text())
             st.markdown(f"**AI分析结果:**\n{advice}")
             
-    return f"{monthly_text}\n{daily_text}"
\ No newline at end of file
+    return summary
\ No newline at end of file
@@ -1,14 +1,17 @@
 # illuminance_chart.py
 
 import streamlit as st
-import numpy as np
 from utils.chart_generator import generate_bar_chart
-from utils.data_processor import filter_by_analysis_period, calculate_daily_averages, calculate_monthly_averages
-from utils.template_base import map_to_color
+from utils.data_processor import aggregate_by_day, aggregate_by_month
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import select_period
+from utils import summary_store
+from utils.summaries import ILLUMINANCE, UnavailableSummary, summarize_series
 from utils.openai_integration import generate_illuminance_analysis_advice
-from ladybug.analysisperiod import AnalysisPeriod
+from utils.metrics import instrument
 
-def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_type, show_charts=True):
+@instrument()
+def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_type, show_charts=True, station_key=None):
     """
     生成照度相关图表。
 
@@ -16,76 +19,46 @@ def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_t
         epw (EPW): 加载的EPW对象。
         start_month (int): 起始月份。
         end_month (int): 终止月份。
-        color_scheme (int): 色卡编号。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
         ill_type (str): 照度类型（"Direct", "Diffuse", "Global"之一）。
         show_charts (bool): 是否显示图表。
+        station_key (str): 站点标识，统计结果优先读取预计算存储，为 None 时直接计算。
     """
-    # 创建分析周期
-    range_select = AnalysisPeriod(st_month=start_month, end_month=end_month)
-    range_full = AnalysisPeriod(st_month=1, end_month=12)
-    range_day = AnalysisPeriod(st_month=start_month, st_day=1, end_month=end_month, end_day=31)
+    # 选择分析时段（按预计算的月份索引切片，不再逐个日期筛选）
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
 
     # 根据照度类型选择数据
     if ill_type == "Direct":
-        ill_select = filter_by_analysis_period(epw.direct_normal_illuminance, range_select)
-        ill_full = filter_by_analysis_period(epw.direct_normal_illuminance, range_full)
-        ill_day = filter_by_analysis_period(epw.direct_normal_illuminance, range_day)
+        field = "direct_normal_illuminance"
         y_label = "Direct Normal Illuminance (lux)"
     elif ill_type == "Diffuse":
-        ill_select = filter_by_analysis_period(epw.diffuse_horizontal_illuminance, range_select)
-        ill_full = filter_by_analysis_period(epw.diffuse_horizontal_illuminance, range_full)
-        ill_day = filter_by_analysis_period(epw.diffuse_horizontal_illuminance, range_day)
+        field = "diffuse_horizontal_illuminance"
         y_label = "Diffuse Horizontal Illuminance (lux)"
     elif ill_type == "Global":
-        ill_select = filter_by_analysis_period(epw.global_horizontal_illuminance, range_select)
-        ill_full = filter_by_analysis_period(epw.global_horizontal_illuminance, range_full)
-        ill_day = filter_by_analysis_period(epw.global_horizontal_illuminance, range_day)
+        field = "global_horizontal_illuminance"
         y_label = "Global Horizontal Illuminance (lux)"
 
-    illuminance_values_select = ill_select.values
-    illuminance_values_full = ill_full.values
-    illuminance_values_day = ill_day.values
+    # 整列缺测的字段无法统计，直接给出提示
+    if not arrays.is_available(field):
+        summary = UnavailableSummary(ILLUMINANCE, ill_type)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
 
-    # 处理颜色映射
-    min_ill_select = np.min(illuminance_values_select)
-    max_ill_select = np.max(illuminance_values_select)
-    min_ill_full = np.min(illuminance_values_full)
-    max_ill_full = np.max(illuminance_values_full)
+    illuminance_values_select = selection.values(field)
+    illuminance_values_full = arrays.values(field)
 
-    color_values_select = [map_to_color(ill, min_ill_select, max_ill_select, color_scheme) for ill in illuminance_values_select]
-    color_values_full = [map_to_color(ill, min_ill_full, max_ill_full, color_scheme) for ill in illuminance_values_full]
-    
     # 计算日均照度
-    daily_averages_ill = calculate_daily_averages(illuminance_values_day, ill_day.datetimes)
-    min_ill_daily_avg = daily_averages_ill.min()
-    max_ill_daily_avg = daily_averages_ill.max()
-    color_values_day_ill = [map_to_color(ill, min_ill_daily_avg, max_ill_daily_avg, color_scheme) for ill in daily_averages_ill]
+    daily_averages_ill = aggregate_by_day(illuminance_values_select, selection.day_of_year)
 
     # 计算每月的照度均值
-    monthly_averages_ill = calculate_monthly_averages(illuminance_values_full, ill_full.datetimes)
-    min_avg_ill = monthly_averages_ill.min()
-    max_avg_ill = monthly_averages_ill.max()
-    avg_color_values_ill = [map_to_color(ill, min_avg_ill, max_avg_ill, color_scheme) for ill in monthly_averages_ill]
+    monthly_averages_ill = aggregate_by_month(illuminance_values_full, arrays.month)
 
-    # 计算一些总结性统计数据
-    total_avg_ill = monthly_averages_ill.mean()
-    lowest_ill_month = monthly_averages_ill.idxmin()
-    highest_ill_month = monthly_averages_ill.idxmax()
-    ill_difference = max_avg_ill - min_avg_ill
-    current_month_avg_ill = daily_averages_ill.mean()
-    max_ill_daily_avg = daily_averages_ill.max()
-    min_ill_daily_avg = daily_averages_ill.min()
-    
-    monthly_text = str(
-        f"从全年来看，总的平均{ill_type}照度是{total_avg_ill:.2f}lux，"
-        f"最高{ill_type}照度出现在{highest_ill_month}月，为{max_avg_ill:.2f}lux，"
-        f"最低{ill_type}照度出现在{lowest_ill_month}月，为{min_avg_ill:.2f}lux，"
-        f"最高照度月与最低照度月之间的{ill_type}照度差为{ill_difference:.2f}lux"
-    )
-
-    daily_text = str(
-        f"当前月份的平均{ill_type}照度是{current_month_avg_ill:.2f}lux，"
-        f"最高{ill_type}照度是{max_ill_daily_avg:.2f}lux，最低{ill_type}照度是{min_ill_daily_avg:.2f}lux"
+    # 统计结果只保存数值，文字在显示或发送给 AI 时才生成；仓库站点优先读取预计算结果
+    summary = summary_store.get_or_compute_summary(
+        station_key, ILLUMINANCE, start_month, end_month,
+        lambda: summarize_series(ILLUMINANCE, monthly_averages_ill, daily_averages_ill, variant=ill_type), ill_type,
     )
 
     if show_charts:
@@ -95,7 +68,7 @@ def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_t
             f"Hourly {y_label} ({start_month} to {end_month} Month)",
             "Hour",
             y_label,
-            color_values_select
+            color_scheme
         )
 
         # 生成每日的照度柱状图
@@ -104,7 +77,7 @@ def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_t
             f"Daily {y_label} ({start_month} to {end_month} Month)",
             "Day",
             f"Daily Average {y_label}",
-            color_values_day_ill
+            color_scheme
         )
 
         # 生成每月的照度柱状图
@@ -113,7 +86,7 @@ def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_t
             f"Monthly Average {y_label}",
             "Month",
             f"Average {y_label}",
-            avg_color_values_ill
+            color_scheme
         )
         fig_ill3.update_xaxes(tickvals=list(range(1, 13)), ticktext=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
@@ -128,7 +101,7 @@ def generate_illuminance_charts(epw, start_month, end_month, color_scheme, ill_t
         
         # 新增AI分析按钮
         if st.button(f'Evaluate Current Month and Annual {ill_type} Illuminance'):
-            advice = generate_illuminance_analysis_advice(monthly_text, daily_text, ill_type)
+            advice = generate_illuminance_analysis_advice(summary.monthly_text(), summary.daily_text(), ill_type)
             st.markdown(f"**AI分析结果:**\n{advice}")
 
-    return f"{monthly_text}\n{daily_text}"
+    return summary
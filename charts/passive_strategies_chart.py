@@ -1,13 +1,321 @@
 # charts/passive_strategies_chart.py
 
+import threading
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import math
 import pandas as pd
 import json
+from cachetools import LRUCache
+from utils.epw_arrays import load_epw_arrays
+from utils.summaries import PASSIVE_STRATEGIES, PassiveStrategiesSummary, UnavailableSummary
 from utils.openai_integration import generate_passive_strategies_advice
+from utils.metrics import instrument
 
+# 常数
+R = 287.05  # 气体常数，单位 J/(kg*K)
+P = 101.325  # 标准大气压，单位 KPa
+
+# 被动策略名称，与 count_passive_strategies 返回值的顺序一致
+PASSIVE_STRATEGY_STATES = [
+    "Comfort/舒适时段",
+    "Sun Shading of windows/窗户遮阳",
+    "High Thermal Mass/高热质量",
+    "High Thermal Mass Night Flushed/高热质量+夜间通风",
+    "Direct Evaporative Cooling/直接蒸发冷却",
+    "Two-Stage Evaporative Cooling/双级蒸发冷却",
+    "Natural Ventilation Cooling/自然通风冷却",
+    "Fan-Forced Ventilation Cooling/风扇通风冷却",
+    "Internal Heating Gain/内部加热增益",
+    "Humidification Only/仅加湿",
+    "Dehumidification Only/仅除湿",
+    "Cooling add Dehumidification if needed/制冷除湿",
+    "Heating add Humidification if needed/加热增湿",
+]
+
+# 判断被动策略所需的 EPW 字段，任一字段整列缺测时无法统计
+PASSIVE_STRATEGY_FIELDS = ("dry_bulb_temperature", "relative_humidity", "dew_point_temperature")
+
+# 各策略的显示颜色，与 PASSIVE_STRATEGY_STATES 一一对应
+PASSIVE_STRATEGY_COLORS = [
+    "blue",
+    "lightblue",
+    "cyan",
+    "green",
+    "lightgreen",
+    "lime",
+    "yellow",
+    "lightgrey",
+    "khaki",
+    "orange",
+    "darkorange",
+    "orange",
+    "purple",
+]
+
+# 焓湿图分箱网格：干球温度（°C）与含湿量（g/kg）的范围及格宽，超出范围的数据点计入边缘格
+PSYCHRO_T_RANGE = (-30.0, 50.0)
+PSYCHRO_T_BIN = 1.0
+PSYCHRO_W_RANGE = (0.0, 30.0)
+PSYCHRO_W_BIN = 1.0
+
+# 策略区域轮廓的采样步长（°C、g/kg）
+ZONE_T_STEP = 0.25
+ZONE_W_STEP = 0.05
+
+# 焓湿图上绘制的等相对湿度线（0–1）
+RH_LINES = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# 默认叠加的策略区域（舒适、高热质量、自然通风）
+DEFAULT_ZONES = [0, 2, 6]
+
+_histogram_cache = LRUCache(maxsize=64)
+_zone_outlines = None
+_cache_lock = threading.Lock()
+
+def calculate_humidity_ratio(t_drybulb, rh_fraction):
+    """
+    向量化计算含湿量。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        rh_fraction (numpy.ndarray): 相对湿度（0–1）。
+
+    Returns:
+        numpy.ndarray: 含湿量（kg/kg）。
+    """
+    # 计算饱和水蒸气压
+    e = 6.1078 * np.power(10.0, 7.5 * t_drybulb / (t_drybulb + 237.3) - 1)
+    return 0.622 * (rh_fraction * e) / (P - rh_fraction * e)
+
+def _legacy_wet_bulb(t_drybulb, rh_fraction):
+    """
+    向量化计算被动策略判断使用的湿球温度（沿用原逐时循环中的 Stull 经验公式写法）。
+
+    该写法的第二项使用了相对湿度的小数形式，与 Stull 原式不同；被动策略的判断阈值按此结果设定，
+    只在本页使用，设计工况等其他模块使用 design_conditions_chart.calculate_wet_bulb。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        rh_fraction (numpy.ndarray): 相对湿度（0–1）。
+
+    Returns:
+        numpy.ndarray: 湿球温度（°C）。
+    """
+    rh = rh_fraction * 100
+    return (
+        t_drybulb * np.arctan(0.152 * np.sqrt(rh + 8.3136))
+        + np.arctan(t_drybulb + rh_fraction)
+        - np.arctan(rh - 1.6763)
+        + 0.00391838 * np.power(rh, 1.5) * np.arctan(0.0231 * rh)
+        - 4.686
+    )
+
+def calculate_enthalpy(t_drybulb, humidity_ratio):
+    """
+    向量化计算焓值。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        humidity_ratio (numpy.ndarray): 含湿量（kg/kg）。
+
+    Returns:
+        numpy.ndarray: 焓值（kJ/kg）。
+    """
+    return 1.006 * t_drybulb + (2501 + 1.86 * t_drybulb) * humidity_ratio
+
+def passive_strategy_conditions(t_drybulb, rh_fraction, t_dewpoint):
+    """
+    向量化判断各被动策略是否适用。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        rh_fraction (numpy.ndarray): 相对湿度（0–1）。
+        t_dewpoint (numpy.ndarray): 露点温度（°C）。
+
+    Returns:
+        list: 与策略列表顺序一致的布尔数组（共13项），形状与输入相同。
+    """
+    tw = _legacy_wet_bulb(t_drybulb, rh_fraction)
+    return [
+        (rh_fraction < 0.8) & (tw < 17) & (20 < t_drybulb) & (t_drybulb < 24),  # Comfort
+        (rh_fraction > 0.8) & (tw > 17) & (20 < t_drybulb),  # Sun Shading of windows
+        (-4 < t_dewpoint) & (t_dewpoint < 18) & (tw < 21.5) & (rh_fraction < 0.8) & (20 < t_drybulb) & (t_drybulb < 32.5),  # High Thermal Mass
+        (-4 < t_dewpoint) & (t_dewpoint < 18) & (t_drybulb > 20) & (rh_fraction < 0.8) & (tw < 23),  # High Thermal Mass Night Flushed
+        (9 < tw) & (tw < 18) & (t_drybulb > 20) & (rh_fraction < 0.8),  # Direct Evaporative Cooling
+        (9 < tw) & (tw < 22) & (t_drybulb > 20) & (rh_fraction < 0.8) & (t_dewpoint < 12),  # Two-Stage Evaporative Cooling
+        (20 < t_drybulb) & (t_drybulb < 26.5) & (-5 < t_dewpoint) & (0.15 < rh_fraction) & (rh_fraction < 0.9) & (tw < 23),  # Natural Ventilation Cooling
+        (20 < t_drybulb) & (t_drybulb < 28) & (-5 < t_dewpoint) & (0.15 < rh_fraction) & (rh_fraction < 0.9) & (tw < 23),  # Fan-Forced Ventilation Cooling
+        (12.5 < t_drybulb) & (t_drybulb < 20),  # Internal Heating Gain
+        (t_dewpoint < -4) & (20 < t_drybulb) & (t_drybulb < 24),  # Humidification Only
+        (rh_fraction > 0.8) & (tw > 17) & (20 < t_drybulb) & (t_drybulb < 24),  # Dehumidification Only
+        t_drybulb > 24,  # Cooling add Dehumidification if needed
+        t_drybulb < 20,  # Heating add Humidification if needed
+    ]
+
+def count_passive_strategies(t_drybulb, rh_fraction, t_dewpoint):
+    """
+    向量化统计各被动策略适用的数据点数量。
+
+    输入数组的最后一维为时间轴，前面的维度（例如多个站点）会被保留。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        rh_fraction (numpy.ndarray): 相对湿度（0–1）。
+        t_dewpoint (numpy.ndarray): 露点温度（°C）。
+
+    Returns:
+        numpy.ndarray: 各策略的数据点数量，最后一维与策略列表顺序一致（共13项）。
+    """
+    conditions = passive_strategy_conditions(t_drybulb, rh_fraction, t_dewpoint)
+    return np.stack([np.count_nonzero(c, axis=-1) for c in conditions], axis=-1)
+
+def psychrometric_histogram(arrays):
+    """
+    将全部数据点按（干球温度 × 含湿量）一次性分箱，统计每格的小时数，结果按站点缓存。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+
+    Returns:
+        numpy.ndarray: (含湿量格数, 温度格数) 的小时数矩阵（子小时数据换算为小时数，缺测数据点不计入）。
+    """
+    key = arrays.cache_key
+    with _cache_lock:
+        cached = _histogram_cache.get(key) if key is not None else None
+    if cached is not None:
+        return cached
+
+    t_drybulb = arrays.values("dry_bulb_temperature")
+    humidity_ratio = calculate_humidity_ratio(t_drybulb, arrays.values("relative_humidity") / 100.0) * 1000
+    nx = int(round((PSYCHRO_T_RANGE[1] - PSYCHRO_T_RANGE[0]) / PSYCHRO_T_BIN))
+    ny = int(round((PSYCHRO_W_RANGE[1] - PSYCHRO_W_RANGE[0]) / PSYCHRO_W_BIN))
+    # 缺测（NaN）的数据点不参与统计，否则转换为整数后会被截断到左下角的格子
+    valid = np.isfinite(t_drybulb) & np.isfinite(humidity_ratio)
+    t_drybulb, humidity_ratio = t_drybulb[valid], humidity_ratio[valid]
+    ix = np.clip(np.floor((t_drybulb - PSYCHRO_T_RANGE[0]) / PSYCHRO_T_BIN).astype(np.int64), 0, nx - 1)
+    iy = np.clip(np.floor((humidity_ratio - PSYCHRO_W_RANGE[0]) / PSYCHRO_W_BIN).astype(np.int64), 0, ny - 1)
+    hours = np.bincount(iy * nx + ix, minlength=nx * ny).reshape(ny, nx) / arrays.timestep
+
+    if key is not None:
+        with _cache_lock:
+            _histogram_cache[key] = hours
+    return hours
+
+def _boundary(x, y):
+    """去掉边界上与前后两点等高的中间点（水平段只保留端点）。"""
+    keep = np.ones(len(y), dtype=bool)
+    keep[1:-1] = (y[1:-1] != y[:-2]) | (y[1:-1] != y[2:])
+    return x[keep], y[keep]
+
+def strategy_zone_outlines():
+    """
+    计算各被动策略在焓湿图上的区域轮廓（与站点无关，首次调用时计算一次）。
+
+    在细网格上由（干球温度, 含湿量）反算相对湿度与露点，用与统计相同的判断条件求出适用区域；
+    同一温度下适用的含湿量是一个区间，轮廓由各温度列的上沿与下沿连接而成。
+
+    Returns:
+        list: 与策略列表顺序一致的 (x, y) 轮廓坐标，不连续的区域之间以 None 分隔；区域为空时为 None。
+    """
+    global _zone_outlines
+    with _cache_lock:
+        if _zone_outlines is not None:
+            return _zone_outlines
+
+    t = np.round(np.arange(PSYCHRO_T_RANGE[0], PSYCHRO_T_RANGE[1] + ZONE_T_STEP / 2, ZONE_T_STEP), 2)
+    w = np.round(np.arange(PSYCHRO_W_RANGE[0], PSYCHRO_W_RANGE[1] + ZONE_W_STEP / 2, ZONE_W_STEP), 2)
+    grid_t, grid_w = np.meshgrid(t, w)
+    # 由含湿量反算水蒸气分压（kPa），再求相对湿度与露点（与 calculate_humidity_ratio 的公式互逆）
+    kg = grid_w / 1000
+    e = kg * P / (0.622 + kg)
+    e_saturated = 6.1078 * np.power(10.0, 7.5 * grid_t / (grid_t + 237.3) - 1)
+    rh_fraction = e / e_saturated
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log10(e * 10 / 6.1078)
+        t_dewpoint = 237.3 * x / (7.5 - x)
+    # 超过饱和线的网格点不存在
+    valid = rh_fraction <= 1
+
+    outlines = []
+    for mask in passive_strategy_conditions(grid_t, rh_fraction, t_dewpoint):
+        mask = mask & valid
+        columns = np.flatnonzero(mask.any(axis=0))
+        if not len(columns):
+            outlines.append(None)
+            continue
+        xs, ys = [], []
+        # 温度方向不连续时分成多个区域
+        for run in np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1):
+            lower = w[mask[:, run].argmax(axis=0)]
+            upper = w[len(w) - 1 - mask[::-1, run].argmax(axis=0)]
+            upper_x, upper_y = _boundary(t[run], upper)
+            lower_x, lower_y = _boundary(t[run][::-1], lower[::-1])
+            xs += list(upper_x) + list(lower_x) + [upper_x[0], None]
+            ys += list(upper_y) + list(lower_y) + [upper_y[0], None]
+        outlines.append((xs[:-1], ys[:-1]))
+
+    with _cache_lock:
+        _zone_outlines = outlines
+    return outlines
+
+def generate_psychrometric_chart(hours, selected_zones):
+    """
+    生成焓湿图：分箱的小时数密度、等相对湿度线与所选策略区域。
+
+    浏览器只接收分箱后的小网格，而不是逐时的散点。
+
+    Args:
+        hours (numpy.ndarray): psychrometric_histogram 的结果。
+        selected_zones (list): 需要叠加的策略在 PASSIVE_STRATEGY_STATES 中的序号。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的焓湿图。
+    """
+    ny, nx = hours.shape
+    t_centers = PSYCHRO_T_RANGE[0] + (np.arange(nx) + 0.5) * PSYCHRO_T_BIN
+    w_centers = PSYCHRO_W_RANGE[0] + (np.arange(ny) + 0.5) * PSYCHRO_W_BIN
+
+    fig = go.Figure(go.Heatmap(
+        x=t_centers,
+        y=w_centers,
+        z=np.where(hours > 0, np.round(hours, 1), np.nan),
+        colorscale="YlOrRd",
+        colorbar=dict(title="Hours"),
+        hovertemplate="%{x} °C, %{y} g/kg<br>%{z} h<extra></extra>",
+    ))
+
+    # 等相对湿度线（合并为一条以 None 分隔的曲线）
+    t_line = np.arange(PSYCHRO_T_RANGE[0], PSYCHRO_T_RANGE[1] + 1, 1.0)
+    line_x, line_y = [], []
+    for rh in RH_LINES:
+        w_line = calculate_humidity_ratio(t_line, rh) * 1000
+        inside = w_line <= PSYCHRO_W_RANGE[1]
+        line_x += list(t_line[inside]) + [None]
+        line_y += list(np.round(w_line[inside], 2)) + [None]
+        fig.add_annotation(x=t_line[inside][-1], y=w_line[inside][-1], text=f"{rh:.0%}", showarrow=False, font=dict(size=10, color="grey"))
+    fig.add_trace(go.Scatter(x=line_x, y=line_y, mode="lines", line=dict(color="grey", width=1, dash="dot"),
+                             name="相对湿度/RH", hoverinfo="skip"))
+
+    outlines = strategy_zone_outlines()
+    for i in selected_zones:
+        if outlines[i] is None:
+            continue
+        x, y = outlines[i]
+        fig.add_trace(go.Scatter(x=x, y=y, mode="lines", fill="toself", opacity=0.35, name=PASSIVE_STRATEGY_STATES[i],
+                                 line=dict(color=PASSIVE_STRATEGY_COLORS[i], width=2), hoverinfo="name"))
+
+    fig.update_layout(
+        title="Psychrometric Chart/焓湿图",
+        xaxis_title="Dry Bulb Temperature/干球温度 (°C)",
+        yaxis_title="Humidity Ratio/含湿量 (g/kg)",
+        xaxis_range=list(PSYCHRO_T_RANGE),
+        yaxis_range=list(PSYCHRO_W_RANGE),
+        legend=dict(orientation="h", y=-0.2),
+    )
+    return fig
+
+@instrument()
 def generate_passive_strategies_chart(epw,show_charts=True):
     """
     生成被动策略相关图表。
@@ -16,161 +324,33 @@ def generate_passive_strategies_chart(epw,show_charts=True):
         epw (EPW): 加载的EPW对象。
     """
     # 定义状态名称 and 颜色
-    states = [
-        "Comfort/舒适时段",
-        "Sun Shading of windows/窗户遮阳",
-        "High Thermal Mass/高热质量",
-        "High Thermal Mass Night Flushed/高热质量+夜间通风",
-        "Direct Evaporative Cooling/直接蒸发冷却",
-        "Two-Stage Evaporative Cooling/双级蒸发冷却",
-        "Natural Ventilation Cooling/自然通风冷却",
-        "Fan-Forced Ventilation Cooling/风扇通风冷却",
-        "Internal Heating Gain/内部加热增益",
-        "Humidification Only/仅加湿",
-        "Dehumidification Only/仅除湿",
-        "Cooling add Dehumidification if needed/制冷除湿",
-        "Heating add Humidification if needed/加热增湿",
-    ]
-    colors = [
-        "blue",
-        "lightblue",
-        "cyan",
-        "green",
-        "lightgreen",
-        "lime",
-        "yellow",
-        "lightgrey",
-        "khaki",
-        "orange",
-        "darkorange",
-        "orange",
-        "purple",
-    ]
-    
-    # 初始化状态计数 and 焓比累计
-    state_counts = [0] * len(states)
-    total_h_sum = 0
-    total_h_count = 0
-    total_tw_sum = 0
-    total_tw_count = 0
-    
-    # 初始化湿球温度范围计数
-    tw_ranges = [0, 0, 0, 0, 0]  # 0-10, 10-20, 20-30, 30-40, 40+
-    
-    # 初始化焓比范围计数
-    h_ranges = [0, 0, 0, 0, 0]  # 0-10, 10-30, 30-50, 50-70, 70+
-    
-    # 常数 and 计算
-    R = 287.05  # 气体常数，单位 J/(kg*K)
-    P = 101.325  # 标准大气压，单位 KPa
-    
-    # 计算每个小时的热湿状态，并分配到不同状态
-    for i in range(8760):  # 假设共有8760个小时的数据
-        # 获取干球温度、相对湿度、露点温度（假设获取方法如下）
-        t_drybulb = epw.dry_bulb_temperature[i]
-        rh_percentage = epw.relative_humidity[i] / 100.0
-        t_dewpoint = epw.dew_point_temperature[i]
-    
-        # 计算饱 and 水蒸气压
-        e = 6.1078 * math.pow(10, (7.5 * t_drybulb / (t_drybulb + 237.3) - 1))
+    states = PASSIVE_STRATEGY_STATES
+    colors = PASSIVE_STRATEGY_COLORS
     
-        # 计算含湿量
-        d = 0.622 * (rh_percentage * e) / (P - rh_percentage * e)
-    
-        # 计算湿球温度
-        tw = (
-            t_drybulb * math.atan(0.152 * math.sqrt(rh_percentage * 100 + 8.3136))
-            + math.atan(t_drybulb + rh_percentage)
-            - math.atan(rh_percentage * 100 - 1.6763)
-            + 0.00391838 * math.pow(rh_percentage * 100, 1.5) * math.atan(0.0231 * rh_percentage * 100)
-            - 4.686
-        )
-    
-        # 计算焓比
-        h = 1.006 * t_drybulb + (2501 + 1.86 * t_drybulb) * d
-    
-        # 累计焓比 and 湿球温度
-        total_h_sum += h
-        total_h_count += 1
-        total_tw_sum += tw
-        total_tw_count += 1
-    
-        # 根据湿球温度范围计数
-        if 0 <= tw < 10:
-            tw_ranges[0] += 1
-        elif 10 <= tw < 20:
-            tw_ranges[1] += 1
-        elif 20 <= tw < 30:
-            tw_ranges[2] += 1
-        elif 30 <= tw < 40:
-            tw_ranges[3] += 1
-        elif tw >= 40:
-            tw_ranges[4] += 1
-    
-        # 根据焓比范围计数
-        if h < 10:
-            h_ranges[0] += 1
-        elif 10 <= h < 30:
-            h_ranges[1] += 1
-        elif 30 <= h < 50:
-            h_ranges[2] += 1
-        elif 50 <= h < 70:
-            h_ranges[3] += 1
-        elif h >= 70:
-            h_ranges[4] += 1
-    
-        # 根据条件将小时分配到不同状态
-        if rh_percentage < 0.8 and tw < 17 and 20 < t_drybulb < 24:
-            state_counts[0] += 1  # Comfort
-    
-        if rh_percentage > 0.8 and tw > 17 and 20 < t_drybulb:
-            state_counts[1] += 1  # Sun Shading of windows
-    
-        if -4 < t_dewpoint < 18 and tw < 21.5 and rh_percentage < 0.8 and 20 < t_drybulb < 32.5:
-            state_counts[2] += 1  # High Thermal Mass
-    
-        if -4 < t_dewpoint < 18 and t_drybulb > 20 and rh_percentage < 0.8 and tw < 23:
-            state_counts[3] += 1  # High Thermal Mass Night Flushed
-    
-        if 9 < tw < 18 and t_drybulb > 20 and rh_percentage < 0.8:
-            state_counts[4] += 1  # Direct Evaporative Cooling
-    
-        if 9 < tw < 22 and t_drybulb > 20 and rh_percentage < 0.8 and t_dewpoint < 12:
-            state_counts[5] += 1  # Two-Stage Evaporative Cooling
-    
-        if 20 < t_drybulb < 26.5 and -5 < t_dewpoint and  0.15 < rh_percentage < 0.9 and tw < 23:
-            state_counts[6] += 1  # Natural Ventilation Cooling
-    
-        if 20 < t_drybulb < 28 and -5 < t_dewpoint and 0.15 < rh_percentage < 0.9 and tw < 23:
-            state_counts[7] += 1  # Fan-Forced Ventilation Cooling
-    
-        if 12.5 < t_drybulb < 20:
-            state_counts[8] += 1  # Internal Heating Gain
-    
-        if t_dewpoint < -4 and 20 < t_drybulb < 24:
-            state_counts[9] += 1  # Humidification Only
-    
-        if rh_percentage > 0.8 and tw > 17 and 20 < t_drybulb < 24:
-            state_counts[10] += 1  # Dehumidification Only
-    
-        if t_drybulb > 24:
-            state_counts[11] += 1  # Cooling add Dehumidification if needed
-    
-        if t_drybulb < 20:
-            state_counts[12] += 1  # Heating add Humidification if needed
-    
-    # 计算分布比例
-    total_hours = 8760  # 假设共有8760个小时的数据
-    state_distribution = [count for count in state_counts]
+    # 读取数组数据（支持子小时与闰年文件），一次性向量化计算各策略的小时数
+    arrays = load_epw_arrays(epw)
+
+    # 整列缺测的字段无法统计，直接给出提示
+    if not all(arrays.is_available(field) for field in PASSIVE_STRATEGY_FIELDS):
+        summary = UnavailableSummary(PASSIVE_STRATEGIES)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
+
+    state_counts = count_passive_strategies(
+        arrays.values("dry_bulb_temperature"),
+        arrays.values("relative_humidity") / 100.0,
+        arrays.values("dew_point_temperature"),
+    )
+
+    # 计算分布比例（按实际数据行数计算，子小时数据换算为小时数）
+    state_distribution = (state_counts / arrays.timestep).tolist()
 
     # 计算被动策略的占比
-    passive_strategies_percentages = []
-    for i in range(len(states)):
-        percentage = (state_distribution[i] / total_hours) * 100
-        passive_strategies_percentages.append(percentage)
+    passive_strategies_percentages = (state_counts / len(arrays) * 100).tolist()
 
-    # 将图表整理成文字形式
-    chart_text = "".join(f"{states[i]} 占比 {passive_strategies_percentages[i]:.2f}%\n" for i in range(len(states)))
+    # 统计结果只保存各策略占比，文字在显示或发送给 AI 时才生成
+    summary = PassiveStrategiesSummary(tuple(passive_strategies_percentages))
 
     if show_charts:
         # 创建彩色条
@@ -187,10 +367,19 @@ def generate_passive_strategies_chart(epw,show_charts=True):
         # 绘制图表
         st.plotly_chart(fig, use_container_width=True)
 
+        # 焓湿图：全部数据点分箱后的小时数密度，叠加所选策略区域
+        selected_zones = st.multiselect(
+            "叠加策略区域/Overlay Strategy Zones",
+            list(range(len(states))),
+            default=DEFAULT_ZONES,
+            format_func=lambda i: states[i],
+        )
+        st.plotly_chart(generate_psychrometric_chart(psychrometric_histogram(arrays), selected_zones), use_container_width=True)
+
         # 新增AI分析按钮
         if st.button('Obtain passive strategy recommendations'):
-            advice = generate_passive_strategies_advice(chart_text)
+            advice = generate_passive_strategies_advice(summary.render())
             st.markdown(f"**AI分析结果:**\n{advice}")
      
 
-    return chart_text
\ No newline at end of file
+    return summary
\ No newline at end of file
@@ -1,14 +1,17 @@
 # radiation_chart.py
 
 import streamlit as st
-import numpy as np
 from utils.chart_generator import generate_bar_chart
-from utils.data_processor import filter_by_analysis_period, calculate_daily_averages, calculate_monthly_averages
-from utils.template_base import map_to_color
+from utils.data_processor import aggregate_by_day, aggregate_by_month
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import select_period
+from utils import summary_store
+from utils.summaries import RADIATION, UnavailableSummary, summarize_series
 from utils.openai_integration import generate_radiation_analysis_advice
-from ladybug.analysisperiod import AnalysisPeriod
+from utils.metrics import instrument
 
-def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_type, show_charts=True):
+@instrument()
+def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_type, show_charts=True, station_key=None):
     """
     生成辐射相关图表。
 
@@ -16,76 +19,46 @@ def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_typ
         epw (EPW): 加载的EPW对象。
         start_month (int): 起始月份。
         end_month (int): 终止月份。
-        color_scheme (int): 色卡编号。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
         rad_type (str): 辐射类型（"Direct", "Diffuse", "Global"之一）。
         show_charts (bool): 是否显示图表。
+        station_key (str): 站点标识，统计结果优先读取预计算存储，为 None 时直接计算。
     """
-    # 创建分析周期
-    range_select = AnalysisPeriod(st_month=start_month, end_month=end_month)
-    range_full = AnalysisPeriod(st_month=1, end_month=12)
-    range_day = AnalysisPeriod(st_month=start_month, st_day=1, end_month=end_month, end_day=31)
+    # 选择分析时段（按预计算的月份索引切片，不再逐个日期筛选）
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
 
     # 根据辐射类型选择数据
     if rad_type == "Direct":
-        rad_select = filter_by_analysis_period(epw.direct_normal_radiation, range_select)
-        rad_full = filter_by_analysis_period(epw.direct_normal_radiation, range_full)
-        rad_day = filter_by_analysis_period(epw.direct_normal_radiation, range_day)
+        field = "direct_normal_radiation"
         y_label = "Direct Normal Radiation (W/m²)"
     elif rad_type == "Diffuse":
-        rad_select = filter_by_analysis_period(epw.diffuse_horizontal_radiation, range_select)
-        rad_full = filter_by_analysis_period(epw.diffuse_horizontal_radiation, range_full)
-        rad_day = filter_by_analysis_period(epw.diffuse_horizontal_radiation, range_day)
+        field = "diffuse_horizontal_radiation"
         y_label = "Diffuse Horizontal Radiation (W/m²)"
     elif rad_type == "Global":
-        rad_select = filter_by_analysis_period(epw.global_horizontal_radiation, range_select)
-        rad_full = filter_by_analysis_period(epw.global_horizontal_radiation, range_full)
-        rad_day = filter_by_analysis_period(epw.global_horizontal_radiation, range_day)
+        field = "global_horizontal_radiation"
         y_label = "Global Horizontal Radiation (W/m²)"
 
-    radiation_values_select = rad_select.values
-    radiation_values_full = rad_full.values
-    radiation_values_day = rad_day.values
+    # 整列缺测的字段无法统计，直接给出提示
+    if not arrays.is_available(field):
+        summary = UnavailableSummary(RADIATION, rad_type)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
 
-    # 处理颜色映射
-    min_rad_select = np.min(radiation_values_select)
-    max_rad_select = np.max(radiation_values_select)
-    min_rad_full = np.min(radiation_values_full)
-    max_rad_full = np.max(radiation_values_full)
+    radiation_values_select = selection.values(field)
+    radiation_values_full = arrays.values(field)
 
-    color_values_select = [map_to_color(rad, min_rad_select, max_rad_select, color_scheme) for rad in radiation_values_select]
-    color_values_full = [map_to_color(rad, min_rad_full, max_rad_full, color_scheme) for rad in radiation_values_full]
-    
     # 计算日均辐射
-    daily_averages_rad = calculate_daily_averages(radiation_values_day, rad_day.datetimes)
-    min_rad_daily_avg = daily_averages_rad.min()
-    max_rad_daily_avg = daily_averages_rad.max()
-    color_values_day_rad = [map_to_color(rad, min_rad_daily_avg, max_rad_daily_avg, color_scheme) for rad in daily_averages_rad]
+    daily_averages_rad = aggregate_by_day(radiation_values_select, selection.day_of_year)
 
     # 计算每月的辐射均值
-    monthly_averages_rad = calculate_monthly_averages(radiation_values_full, rad_full.datetimes)
-    min_avg_rad = monthly_averages_rad.min()
-    max_avg_rad = monthly_averages_rad.max()
-    avg_color_values_rad = [map_to_color(rad, min_avg_rad, max_avg_rad, color_scheme) for rad in monthly_averages_rad]
+    monthly_averages_rad = aggregate_by_month(radiation_values_full, arrays.month)
 
-    # 计算一些总结性统计数据
-    total_avg_rad = monthly_averages_rad.mean()
-    lowest_rad_month = monthly_averages_rad.idxmin()
-    highest_rad_month = monthly_averages_rad.idxmax()
-    rad_difference = max_avg_rad - min_avg_rad
-    current_month_avg_rad = daily_averages_rad.mean()
-    max_rad_daily_avg = daily_averages_rad.max()
-    min_rad_daily_avg = daily_averages_rad.min()
-    
-    monthly_text = str(
-        f"从全年来看，总的平均{rad_type}辐射是{total_avg_rad:.2f} W/m²，"
-        f"最高{rad_type}辐射出现在{highest_rad_month}月，为{max_avg_rad:.2f} W/m²，"
-        f"最低{rad_type}辐射出现在{lowest_rad_month}月，为{min_avg_rad:.2f} W/m²，"
-        f"最高辐射月与最低辐射月之间的{rad_type}辐射差为{rad_difference:.2f} W/m²"
-    )
-
-    daily_text = str(
-        f"当前月份的平均{rad_type}辐射是{current_month_avg_rad:.2f} W/m²，"
-        f"最高{rad_type}辐射是{max_rad_daily_avg:.2f} W/m²，最低{rad_type}辐射是{min_rad_daily_avg:.2f} W/m²"
+    # 统计结果只保存数值，文字在显示或发送给 AI 时才生成；仓库站点优先读取预计算结果
+    summary = summary_store.get_or_compute_summary(
+        station_key, RADIATION, start_month, end_month,
+        lambda: summarize_series(RADIATION, monthly_averages_rad, daily_averages_rad, variant=rad_type), rad_type,
     )
 
     if show_charts:
@@ -95,7 +68,7 @@ def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_typ
             f"Hourly {y_label} ({start_month}-{end_month} Month)",
             "Hour",
             y_label,
-            color_values_select
+            color_scheme
         )
 
         # 生成每日的辐射柱状图
@@ -104,7 +77,7 @@ def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_typ
             f"Daily {y_label} ({start_month}-{end_month} Month)",
             "Day",
             f"Daily Average {y_label}",
-            color_values_day_rad
+            color_scheme
         )
 
         # 生成每月的辐射柱状图
@@ -113,7 +86,7 @@ def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_typ
             f"Monthly Average {y_label}",
             "Month",
             f"Average {y_label}",
-            avg_color_values_rad
+            color_scheme
         )
         fig_rad3.update_xaxes(tickvals=list(range(1, 13)), ticktext=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
@@ -128,7 +101,7 @@ def generate_radiation_charts(epw, start_month, end_month, color_scheme, rad_typ
         
         # 新增AI分析按钮
         if st.button(f'Evaluate Current Month and Annual {rad_type} Radiation'):
-            advice = generate_radiation_analysis_advice(monthly_text, daily_text, rad_type)
+            advice = generate_radiation_analysis_advice(summary.monthly_text(), summary.daily_text(), rad_type)
             st.markdown(f"**AI分析结果:**\n{advice}")
 
-    return f"{monthly_text}\n{daily_text}"
+    return summary
@@ -0,0 +1,135 @@
+# typical_day_chart.py
+
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+from utils.data_processor import month_hour_profiles
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import months_between
+from utils.template_base import as_color_context, color_scale
+from utils.metrics import instrument
+
+# 可选字段：显示名称 -> (字段, 单位)
+TYPICAL_DAY_FIELDS = {
+    "干球温度/Dry Bulb Temperature": ("dry_bulb_temperature", "°C"),
+    "相对湿度/Relative Humidity": ("relative_humidity", "%"),
+    "风速/Wind Speed": ("wind_speed", "m/s"),
+    "天空覆盖量/Total Sky Cover": ("total_sky_cover", "tenths"),
+    "全球水平辐射/Global Horizontal Rad": ("global_horizontal_radiation", "W/m²"),
+    "全球水平照度/Global Horizontal Ill": ("global_horizontal_illuminance", "lux"),
+}
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# 典型日曲线的分位数带（下分位、中位数、上分位）
+BAND_PERCENTILES = (10, 50, 90)
+
+def generate_profile_heatmap(matrix, months, title, unit, color_scheme):
+    """
+    生成“月 × 时”热力图。
+
+    Args:
+        matrix (numpy.ndarray): (12, 24) 的统计矩阵。
+        months (list): 显示的月份（1–12）。
+        title (str): 图表标题。
+        unit (str): 数值单位。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的热力图。
+    """
+    rows = np.asarray(months) - 1
+    fig = go.Figure(data=go.Heatmap(
+        z=np.round(matrix[rows], 2),
+        x=list(range(24)),
+        y=[MONTH_NAMES[m - 1] for m in months],
+        colorscale=color_scale(color_scheme),
+        colorbar=dict(title=unit),
+        hovertemplate="%{y} %{x}:00<br>%{z} " + unit + "<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title="Hour", yaxis_title="Month", yaxis_autorange="reversed")
+    return fig
+
+def generate_profile_band_chart(profiles, month, title, unit, color_scheme):
+    """
+    生成某月典型日的曲线图：均值曲线、分位数带与最小/最大包络。
+
+    Args:
+        profiles (dict): month_hour_profiles 的结果。
+        month (int): 月份（1–12）。
+        title (str): 图表标题。
+        unit (str): 数值单位。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的曲线图。
+    """
+    color = as_color_context(color_scheme)
+    line = 'rgb({}, {}, {})'.format(*(color.start or (0, 0, 0)))
+    fill = 'rgba({}, {}, {}, {{}})'.format(*(color.end or (128, 128, 128)))
+    hours = list(range(24))
+    row = month - 1
+    low, median, high = (profiles["percentiles"][q][row] for q in BAND_PERCENTILES)
+
+    fig = go.Figure()
+    # 包络与分位数带都用“上沿 + 填充到下沿”的两条曲线表示
+    for upper, lower, name, alpha in [
+        (profiles["max"][row], profiles["min"][row], "最小–最大/Min–Max", 0.25),
+        (high, low, f"P{BAND_PERCENTILES[0]}–P{BAND_PERCENTILES[2]}", 0.55),
+    ]:
+        fig.add_trace(go.Scatter(x=hours, y=lower, mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=hours, y=upper, mode="lines", line=dict(width=0), fill="tonexty",
+                                 fillcolor=fill.format(alpha), name=name))
+    fig.add_trace(go.Scatter(x=hours, y=median, mode="lines", line=dict(color=line, dash="dot"), name="中位数/Median"))
+    fig.add_trace(go.Scatter(x=hours, y=profiles["mean"][row], mode="lines", line=dict(color=line, width=3), name="均值/Mean"))
+    fig.update_layout(title=title, xaxis_title="Hour", yaxis_title=unit)
+    return fig
+
+@instrument()
+def generate_typical_day_charts(epw, start_month, end_month, color_scheme, show_charts=True):
+    """
+    生成典型日（各月逐时均值、分位数与包络）图表。
+
+    Args:
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表。
+
+    Returns:
+        dict: 所选字段的 month_hour_profiles 结果，字段整列缺测时返回 None。
+    """
+    arrays = load_epw_arrays(epw)
+    field_label = st.selectbox("选择字段/Select Field", list(TYPICAL_DAY_FIELDS)) if show_charts else next(iter(TYPICAL_DAY_FIELDS))
+    field, unit = TYPICAL_DAY_FIELDS[field_label]
+
+    # 整列缺测的字段无法统计，直接给出提示
+    if not arrays.is_available(field):
+        if show_charts:
+            st.warning(f"{field_label} 无有效数据/No valid data for this field.")
+        return None
+
+    # 全年的“日 × 时”与“月 × 时”统计一次算出，时段只决定显示哪些月份
+    profiles = month_hour_profiles(arrays.values(field), arrays.month, arrays.day, arrays.hour, arrays.day_of_year, BAND_PERCENTILES)
+    months = months_between(start_month, end_month)
+
+    if show_charts:
+        name = field_label.split("/")[-1]
+        statistic = st.radio("热力图统计量/Heatmap Statistic", ["均值/Mean", f"P{BAND_PERCENTILES[0]}", "中位数/Median", f"P{BAND_PERCENTILES[2]}", "最小/Min", "最大/Max"], horizontal=True)
+        matrix = {
+            "均值/Mean": profiles["mean"],
+            f"P{BAND_PERCENTILES[0]}": profiles["percentiles"][BAND_PERCENTILES[0]],
+            "中位数/Median": profiles["percentiles"][BAND_PERCENTILES[1]],
+            f"P{BAND_PERCENTILES[2]}": profiles["percentiles"][BAND_PERCENTILES[2]],
+            "最小/Min": profiles["min"],
+            "最大/Max": profiles["max"],
+        }[statistic]
+        st.plotly_chart(generate_profile_heatmap(matrix, months, f"Typical Day {name} by Month ({statistic.split('/')[-1]})", unit, color_scheme), use_container_width=True)
+
+        month = months[0]
+        if len(months) > 1:
+            month = st.select_slider("典型日月份/Month", options=months, format_func=lambda m: MONTH_NAMES[m - 1])
+        st.plotly_chart(generate_profile_band_chart(profiles, month, f"Typical Day {name} ({MONTH_NAMES[month - 1]})", unit, color_scheme), use_container_width=True)
+
+    return profiles
@@ -3,11 +3,14 @@
 import streamlit as st
 import numpy as np
 from utils.chart_generator import generate_bar_chart, generate_wind_rose
-from utils.data_processor import filter_by_analysis_period, calculate_daily_averages, calculate_monthly_averages
-from utils.template_base import map_to_color
+from utils.data_processor import aggregate_by_day, aggregate_by_month
+from utils.epw_arrays import load_epw_arrays
+from utils.period_filter import select_period
+from utils.template_base import as_color_context
+from utils import summary_store
+from utils.summaries import WIND, UnavailableSummary, summarize_series
 from utils.openai_integration import generate_wind_analysis_advice
-from ladybug.analysisperiod import AnalysisPeriod
-from ladybug.windrose import WindRose
+from utils.metrics import instrument
 
 def generate_legend_parameters(color_scheme):
     """
@@ -47,25 +50,26 @@ def generate_legend_parameters(color_scheme):
 
     return LegendParameters(colors=color_list)
 
-def get_wind_direction_name(degrees):
+def calculate_prevailing_direction(directions, speeds, direction_count=32):
     """
-    将风向度数转换为可读的风向名称。
+    向量化计算盛行风向，分箱方式与 ladybug 的 WindRose 一致（风速为 0 的时刻不计入）。
 
     Args:
-        degrees (list): 风向度数列表。
+        directions (numpy.ndarray): 风向度数数组。
+        speeds (numpy.ndarray): 与风向对齐的风速数组。
+        direction_count (int): 风向分箱数。
 
     Returns:
-        str: 风向名称。
+        tuple: 频数最高的风向（各分箱的中心角度），并列时返回多个。
     """
-    directions = ["北", "北偏东", "东北", "东偏北",
-                  "东", "东偏南", "东南", "南偏东",
-                  "南", "南偏西", "西南", "西偏南",
-                  "西", "西偏北", "西北", "北偏西"]
-    degree_val = degrees[0]  # 获取列表中的第一个元素
-    index = round((((degree_val + 11.25) % 360) - 11.25) / 22.5) 
-    return directions[index % 16]
-
-def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=True):
+    width = 360.0 / direction_count
+    windy = speeds > 1e-10
+    bins = np.floor((np.mod(directions[windy], 360.0) + width / 2) / width).astype(np.int64) % direction_count
+    counts = np.bincount(bins, minlength=direction_count)
+    return tuple(i / direction_count * 360.0 for i in np.flatnonzero(counts == counts.max()))
+
+@instrument()
+def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=True, station_key=None):
     """
     生成风速和风玫瑰图。
 
@@ -73,77 +77,46 @@ def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=T
         epw (EPW): 加载的EPW对象。
         start_month (int): 起始月份。
         end_month (int): 终止月份。
-        color_scheme (int): 色卡编号。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号）。
+        show_charts (bool): 是否显示图表。
+        station_key (str): 站点标识，统计结果优先读取预计算存储，为 None 时直接计算。
     """
-    # 创建分析周期
-    range_select = AnalysisPeriod(st_month=start_month, end_month=end_month)
-    range_full = AnalysisPeriod(st_month=1, end_month=12)
-    range_day = AnalysisPeriod(st_month=start_month, st_day=1, end_month=end_month, end_day=31)
-
-    # 获取风速数据
-    wind_speed_select = filter_by_analysis_period(epw.wind_speed, range_select)
-    wind_speed_full = filter_by_analysis_period(epw.wind_speed, range_full)
-    wind_speed_day = filter_by_analysis_period(epw.wind_speed, range_day)
-    
-    speed_values_select = wind_speed_select.values
-    speed_values_full = wind_speed_full.values
-    speed_values_day = wind_speed_day.values
-
-    # 获取风向数据
-    wind_direction_select = filter_by_analysis_period(epw.wind_direction, range_select)
-    wind_direction_full = filter_by_analysis_period(epw.wind_direction, range_full)
-    wind_direction_day = filter_by_analysis_period(epw.wind_direction, range_day)
-    
-    direction_values_select = wind_direction_select.values
-    direction_values_full = wind_direction_full.values
-    direction_values_day = wind_direction_day.values
-
-    # 处理颜色映射
-    min_speed_select = np.min(speed_values_select)
-    max_speed_select = np.max(speed_values_select)
-    min_speed_full = np.min(speed_values_full)
-    max_speed_full = np.max(speed_values_full)
-
-    color_values_select_speed = [map_to_color(speed, min_speed_select, max_speed_select, color_scheme) for speed in speed_values_select]
-    color_values_full_speed = [map_to_color(speed, min_speed_full, max_speed_full, color_scheme) for speed in speed_values_full]
+    # 选择分析时段（按预计算的月份索引切片，不再逐个日期筛选）
+    arrays = load_epw_arrays(epw)
+    selection = select_period(arrays, start_month, end_month)
+
+    # 整列缺测的字段无法统计，直接给出提示
+    if not (arrays.is_available("wind_speed") and arrays.is_available("wind_direction")):
+        summary = UnavailableSummary(WIND)
+        if show_charts:
+            st.warning(summary.render() + "/No valid data for this field.")
+        return summary
+
+    # 获取风速与风向数据
+    speed_values_select = selection.values("wind_speed")
+    speed_values_full = arrays.values("wind_speed")
+    direction_values_select = selection.values("wind_direction")
+    direction_values_full = arrays.values("wind_direction")
 
     # 计算日均风速
-    daily_averages_speed = calculate_daily_averages(speed_values_day, wind_speed_day.datetimes)
-    min_speed_daily_avg = daily_averages_speed.min()
-    max_speed_daily_avg = daily_averages_speed.max()
-    color_values_day_speed = [map_to_color(speed, min_speed_daily_avg, max_speed_daily_avg, color_scheme) for speed in daily_averages_speed]
+    daily_averages_speed = aggregate_by_day(speed_values_select, selection.day_of_year)
 
     # 生成每月的风速均值
-    monthly_averages_speed = calculate_monthly_averages(speed_values_full, wind_speed_full.datetimes)
-    min_avg_speed = monthly_averages_speed.min()
-    max_avg_speed = monthly_averages_speed.max()
-    avg_color_values_speed = [map_to_color(speed, min_avg_speed, max_avg_speed, color_scheme) for speed in monthly_averages_speed]
-    # 计算一些总结性统计数据
-    total_avg_speed = monthly_averages_speed.mean()
-    slowest_month = monthly_averages_speed.idxmin()
-    fastest_month = monthly_averages_speed.idxmax()
-    speed_difference = max_avg_speed - min_avg_speed
-
-    # 计算盛行风向
-    wind_rose_month = WindRose(wind_direction_select, wind_speed_select, 32)
-    wind_rose_year = WindRose(wind_direction_full, wind_speed_full, 32)
-    prevailing_direction_month = wind_rose_month.prevailing_direction
-    prevailing_direction_year = wind_rose_year.prevailing_direction
-
-    # 获取风向名称
-    prevailing_direction_month_name = str("该城市的月盛行风向" + get_wind_direction_name(prevailing_direction_month))
-    prevailing_direction_year_name = str("该城市的年盛行风向" + get_wind_direction_name(prevailing_direction_year))
-    monthly_text = str(
-    f"从全年来看，总的平均风速是{total_avg_speed:.2f} m/s，"
-    f"最高风速出现在{fastest_month}月，为{monthly_averages_speed.max():.2f} m/s，"
-    f"最低风速出现在{slowest_month}月，为{monthly_averages_speed.min():.2f} m/s，"
-    f"最高风速月与最低风速月之间的风速差值为{speed_difference:.2f} m/s"
-    )
-        
-    daily_text = str(
-        f"当前月份的平均风速是{daily_averages_speed.mean():.2f} m/s，"
-        f"最高风速是{max_speed_daily_avg:.2f} m/s，最低风速是{min_speed_daily_avg:.2f} m/s"
-    )
+    monthly_averages_speed = aggregate_by_month(speed_values_full, arrays.month)
+
+    # 统计结果只保存数值（盛行风向并列时取第一个），文字在显示或发送给 AI 时才生成；仓库站点优先读取预计算结果
+    def compute_summary():
+        # 计算盛行风向
+        prevailing_direction_month = calculate_prevailing_direction(direction_values_select, speed_values_select)
+        prevailing_direction_year = calculate_prevailing_direction(direction_values_full, speed_values_full)
+        return summarize_series(
+            WIND, monthly_averages_speed, daily_averages_speed,
+            prevailing_month=float(prevailing_direction_month[0]),
+            prevailing_year=float(prevailing_direction_year[0]),
+        )
+
+    summary = summary_store.get_or_compute_summary(station_key, WIND, start_month, end_month, compute_summary)
+
     if show_charts:
         # 生成每小时的风速柱状图
         fig_speed1 = generate_bar_chart(
@@ -151,7 +124,7 @@ def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=T
             f"Hourly Wind Speed ({start_month} to {end_month} Month)",
             "Hour",
             "Wind Speed (m/s)",
-            color_values_select_speed
+            color_scheme
         )
         # 生成每日的风速柱状图
         fig_speed2 = generate_bar_chart(
@@ -159,12 +132,12 @@ def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=T
             f"Daily Wind Speed ({start_month} to {end_month} Month)",
             "Day",
             "Daily Average Wind Speed (m/s)",
-            color_values_day_speed
+            color_scheme
         )
         # 生成风玫瑰图
-        legend_parameters = generate_legend_parameters(color_scheme)
+        legend_parameters = generate_legend_parameters(as_color_context(color_scheme).scheme)
         title = "Wind Rose Diagram"
-        fig_wind_rose = generate_wind_rose(wind_direction_full, wind_speed_full, range_full, legend_parameters, title)
+        fig_wind_rose = generate_wind_rose(arrays.to_collection("wind_direction"), arrays.to_collection("wind_speed"), None, legend_parameters, title)
     
         # 生成每月的风速柱状图
         fig_speed3 = generate_bar_chart(
@@ -172,7 +145,7 @@ def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=T
             "Monthly Average Wind Speed",
             "Month",
             "Average Wind Speed (m/s)",
-            avg_color_values_speed
+            color_scheme
         )
         fig_speed3.update_xaxes(tickvals=list(range(1, 13)), ticktext=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
@@ -189,7 +162,7 @@ def generate_wind_charts(epw, start_month, end_month, color_scheme,show_charts=T
 
         # 新增AI分析按钮
         if st.button('Current Month and Annual Wind Speed Analysis'):
-            advice = generate_wind_analysis_advice(monthly_text, daily_text, prevailing_direction_month_name, prevailing_direction_year_name)
+            advice = generate_wind_analysis_advice(summary.monthly_text(), summary.daily_text(), summary.prevailing_month_text(), summary.prevailing_year_text())
             st.markdown(f"**AI分析结果:**\n{advice}")
 
-    return f"{monthly_text}\n{daily_text}"
\ No newline at end of file
+    return summary
\ No newline at end of file
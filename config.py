@@ -1,10 +1,62 @@
 import os
+import tempfile
 
 # 从环境变量中读取 OpenAI API 的协议、主机和密钥
 OPENAI_API_SCHEME = os.getenv('OPENAI_API_SCHEME')
 OPENAI_API_HOST = os.getenv('OPENAI_API_HOST')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Alist 气象数据仓库的主机和授权码，可通过环境变量覆盖（压测时指向本地替身服务）
+ALIST_URL = os.getenv('ALIST_URL', "warehouse.archknowledge.com.cn")
+ALIST_AUTHORIZATION = os.getenv('ALIST_AUTHORIZATION', "alist-79f0737a-97a0-4c5f-a51e-df4afecd5d44dB1P9QSM5FRCJbUc0HrywajGijam55RFS1hSvLCGLviwwGhsoqtcaGGcByeg7ELM")
+
+# 预计算站点总结的 SQLite 存储路径
+SUMMARY_STORE_PATH = os.getenv('SUMMARY_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'summary_store.sqlite'))
+
+# 多站点对比的堆叠数组（内存映射 .npy 文件）缓存目录
+STACK_CACHE_DIR = os.getenv('STACK_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'stacks'))
+STACK_CACHE_MAX_BYTES = int(os.getenv('STACK_CACHE_MAX_BYTES', str(1024 ** 3)))
+
+# 站点空间索引（经纬度 KD 树的站点目录）的存储路径
+STATION_INDEX_PATH = os.getenv('STATION_INDEX_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'station_index.npz'))
+
+# 共享缓存后端：local（本地/共享卷目录）、redis（多副本共享）或 none；CACHE_MAX_BYTES 为总字节预算
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local')
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cache'))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+
+# 启动时预热的热门站点（逗号分隔的站点 ZIP 路径），以及是否在后台预加载重型模块
+WARM_STATIONS = os.getenv('WARM_STATIONS', '')
+PRELOAD_MODULES = os.getenv('PRELOAD_MODULES', '1') != '0'
+
+# 对每次重跑进行性能分析：cprofile、sample 或留空（也可通过查询参数 ?profile=1 / ?profile=sample 对单个会话开启）
+PROFILE_RERUNS = os.getenv('PROFILE_RERUNS', '')
+# 重跑性能分析耗时分解的日志级别（输出到标准错误）
+PROFILE_LOG_LEVEL = os.getenv('PROFILE_LOG_LEVEL', 'INFO')
+
+# Prometheus 抓取端点的端口，0 表示不启动
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))
+
+# JSON 接口服务的端口、计算线程数与响应缓存有效期（秒）
+API_PORT = int(os.getenv('API_PORT', '8080'))
+API_WORKERS = int(os.getenv('API_WORKERS', str(os.cpu_count() or 4)))
+API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', '3600'))
+
+# 全部变量总览页面的面板计算线程数（进程内所有会话共用一个线程池）
+DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', str(min(6, os.cpu_count() or 4))))
+
+# 站点文件的下载目录、读取块大小（字节）、超时（秒）与中断后的续传次数
+DOWNLOAD_DIR = os.getenv('DOWNLOAD_DIR', os.path.join(tempfile.gettempdir(), 'slt-downloads'))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', str(256 * 1024)))
+DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', '30'))
+DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', '3'))
+# 后台下载线程数（下载在工作线程中进行，页面只轮询进度，重跑不会中断下载）
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '4'))
+
+# 后台生成绿建气候报告的工作线程数（任务主要在等待语言模型接口，进程内所有会话共用）
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', '4'))
+
 def get_api_credentials():
     """
     返回 OpenAI API 的协议、主机和密钥。
@@ -13,3 +65,140 @@ def get_api_credentials():
         tuple: OpenAI API 的协议、主机和密钥
     """
     return OPENAI_API_SCHEME, OPENAI_API_HOST, OPENAI_API_KEY
+
+def get_alist_settings():
+    """
+    返回 Alist 气象数据仓库的主机和授权码。
+
+    Returns:
+        tuple: Alist 的主机和授权码
+    """
+    return ALIST_URL, ALIST_AUTHORIZATION
+
+def get_summary_store_path():
+    """
+    返回预计算站点总结的存储路径。
+
+    Returns:
+        str: SQLite 数据库文件路径
+    """
+    return SUMMARY_STORE_PATH
+
+def get_stack_cache_dir():
+    """
+    返回多站点堆叠数组的缓存目录。
+
+    Returns:
+        str: 缓存目录路径
+    """
+    return STACK_CACHE_DIR
+
+def get_stack_cache_max_bytes():
+    """
+    返回多站点堆叠数组缓存目录的总字节预算，超出后按最近访问时间淘汰旧文件。
+
+    Returns:
+        int: 字节预算
+    """
+    return STACK_CACHE_MAX_BYTES
+
+def get_station_index_path():
+    """
+    返回站点空间索引的存储路径。
+
+    Returns:
+        str: 索引文件路径
+    """
+    return STATION_INDEX_PATH
+
+def get_cache_settings():
+    """
+    返回共享缓存设置。
+
+    Returns:
+        tuple: 后端类型、位置（local 为目录，redis 为 URL）和总字节预算
+    """
+    location = REDIS_URL if CACHE_BACKEND == 'redis' else CACHE_DIR
+    return CACHE_BACKEND, location, CACHE_MAX_BYTES
+
+def get_warmup_settings():
+    """
+    返回启动预热设置。
+
+    Returns:
+        tuple: 是否预加载重型模块，以及需要预热的站点路径列表
+    """
+    stations = [path.strip() for path in WARM_STATIONS.split(',') if path.strip()]
+    return PRELOAD_MODULES, stations
+
+def get_profile_mode():
+    """
+    返回全局的重跑性能分析模式。
+
+    Returns:
+        str: "cprofile"、"sample" 或空字符串（不开启）
+    """
+    return PROFILE_RERUNS
+
+def get_profile_log_level():
+    """
+    返回重跑性能分析日志的级别。
+
+    Returns:
+        str: 日志级别名称（例如 "INFO"、"WARNING"）
+    """
+    return PROFILE_LOG_LEVEL
+
+def get_metrics_port():
+    """
+    返回 Prometheus 抓取端点的端口。
+
+    Returns:
+        int: 端口号，0 表示不启动
+    """
+    return METRICS_PORT
+
+def get_api_server_settings():
+    """
+    返回 JSON 接口服务的设置。
+
+    Returns:
+        tuple: 端口、计算线程数和响应缓存有效期（秒）
+    """
+    return API_PORT, API_WORKERS, API_CACHE_TTL
+
+def get_dashboard_workers():
+    """
+    返回全部变量总览页面的面板计算线程数。
+
+    Returns:
+        int: 线程数（进程内所有会话共用）
+    """
+    return DASHBOARD_WORKERS
+
+def get_report_workers():
+    """
+    返回后台报告任务的工作线程数。
+
+    Returns:
+        int: 线程数
+    """
+    return REPORT_WORKERS
+
+def get_download_settings():
+    """
+    返回站点文件的下载设置。
+
+    Returns:
+        tuple: 下载目录、读取块大小（字节）、超时（秒）和续传次数
+    """
+    return DOWNLOAD_DIR, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, DOWNLOAD_RETRIES
+
+def get_download_workers():
+    """
+    返回后台下载的工作线程数。
+
+    Returns:
+        int: 线程数
+    """
+    return DOWNLOAD_WORKERS
@@ -3,22 +3,17 @@
 import streamlit as st
 import http.client
 import json
-import requests
-import os
-import tempfile
-from utils.template_base import set_user_defined_colors
-from utils.data_loader import unzip_and_load_epw, load_uploaded_epw
-from charts.temperature_chart import generate_temperature_charts
-from charts.humidity_chart import generate_humidity_charts
-from charts.wind_chart import generate_wind_charts
-from charts.sky_cover_chart import generate_sky_cover_charts
-from charts.radiation_chart import generate_radiation_charts
-from charts.illuminance_chart import generate_illuminance_charts
-from charts.passive_strategies_chart import generate_passive_strategies_chart
-from charts.artificial_intelligence_zone import generate_ai_report
-
-ALIST_URL = "warehouse.archknowledge.com.cn"
-ALIST_AUTHORIZATION = "alist-79f0737a-97a0-4c5f-a51e-df4afecd5d44dB1P9QSM5FRCJbUc0HrywajGijam55RFS1hSvLCGLviwwGhsoqtcaGGcByeg7ELM"
+import time
+from utils.template_base import make_color_context
+from utils.warmup import start_warmup
+from utils.profiling import profiled_rerun
+from utils.metrics import instrument, record_bytes, start_metrics_server
+from config import get_alist_settings
+
+ALIST_URL, ALIST_AUTHORIZATION = get_alist_settings()
+
+# 页面轮询后台下载进度的间隔（秒）
+DOWNLOAD_POLL_INTERVAL = 0.2
 
 st.set_page_config(
     page_title="气象数据与被动策略在线可视化/Visualization of Meteorological Data and Passive Strategies", 
@@ -27,6 +22,7 @@ st.set_page_config(
     initial_sidebar_state="auto"
 )
 
+@instrument()
 def fetch_file_list(path="/"):
     conn = http.client.HTTPConnection(ALIST_URL)
     payload = json.dumps({"path": path, "password": "", "page": 1, "per_page": 0, "refresh": False})
@@ -37,7 +33,9 @@ def fetch_file_list(path="/"):
     }
     conn.request("POST", "/api/fs/list", payload, headers)
     res = conn.getresponse()
-    data = json.loads(res.read().decode("utf-8"))
+    body = res.read()
+    record_bytes("alist", "in", len(body))
+    data = json.loads(body.decode("utf-8"))
     
     if data['code'] == 200:
         return data['data']['content']
@@ -45,36 +43,201 @@ def fetch_file_list(path="/"):
         st.error("无法获取文件列表: " + data['message'])
         return []
 
-def download_file(url):
-    local_filename = os.path.join(tempfile.gettempdir(), os.path.basename(url))  # 存储在临时目录
-    with requests.get(url, stream=True) as r:
-        r.raise_for_status()  # 确保请求成功
-        with open(local_filename, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
-    return local_filename
+def keep_valid_selection(key, options):
+    """
+    上级目录变化后，清除不在当前选项中的选择框状态，避免沿用其他目录下的选择。
+
+    Args:
+        key (str): 选择框的 key。
+        options (list): 当前选项列表。
+    """
+    if key in st.session_state and st.session_state[key] not in options:
+        del st.session_state[key]
+
+def select_station(station_path):
+    """
+    将站点路径写入目录选择框的 session_state，下一次重跑时直接定位并加载该站点。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径，例如 "/WMO_Region_2_Asia/CHN_China/SN_Shaanxi/CHN_SN_Xian.570360_CSWD.zip"。
+    """
+    parts = station_path.strip("/").split("/")
+    st.session_state['continent'] = parts[0]
+    st.session_state['country'] = parts[1]
+    if len(parts) == 4:
+        st.session_state['region'] = parts[2]
+    st.session_state['station_file'] = parts[-1]
+
+def find_nearby_stations():
+    """
+    按坐标查找附近站点：在站点空间索引上做 k 近邻或半径查询，选中后跳转加载。
+    """
+    from utils.station_index import load_station_index
+
+    with st.expander("按坐标查找附近站点/Find stations near lat/lon"):
+        index = load_station_index()
+        if index is None:
+            st.caption("尚未构建站点空间索引，请先运行 python -m scripts.build_station_index/The station index has not been built yet.")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        latitude = col1.number_input("纬度/Latitude", -90.0, 90.0, 34.27, 0.01, format="%.4f")
+        longitude = col2.number_input("经度/Longitude", -180.0, 180.0, 108.95, 0.01, format="%.4f")
+        radius_km = col3.number_input("半径/Radius (km)，0 表示按数量查找", 0.0, 5000.0, 0.0, 10.0)
+        if radius_km > 0:
+            stations = index.within(latitude, longitude, radius_km)
+        else:
+            stations = index.nearest(latitude, longitude, st.slider("站点数/Number of stations", 1, 20, 5))
+
+        if not stations:
+            st.info("该范围内没有站点/No stations found.")
+            return
+        options = {f"{station['name']}（{station['distance_km']:.1f} km）": station['path'] for station in stations}
+        choice = st.radio("附近站点/Nearby stations", list(options))
+        st.button("加载该站点/Load this station", on_click=select_station, args=(options[choice],))
+
+def wait_for_download(url, download):
+    """
+    轮询后台下载的共享进度并显示进度条，直到下载完成（性能分析时这段等待计入 Download 阶段）。
+
+    Args:
+        url (str): 下载地址。
+        download (Future): start_download 返回的任务。
+
+    Returns:
+        str: 下载完成后的本地文件路径。
+    """
+    from utils.file_manager import get_download_progress
+
+    download_progress = st.empty()
+    while not download.done():
+        progress = get_download_progress(url)
+        if progress is not None and progress[1]:
+            done, total = progress
+            download_progress.progress(min(done / total, 1.0), text=f"下载中/Downloading {done / 1024:.0f} / {total / 1024:.0f} KB")
+        time.sleep(DOWNLOAD_POLL_INTERVAL)
+    download_progress.empty()
+    return download.result()
+
+def zoom_to(latitude, longitude, zoom):
+    """
+    将站点地图的中心与缩放级别写入 session_state（点击聚合点后放大到该区域）。
+
+    Args:
+        latitude (float): 中心纬度。
+        longitude (float): 中心经度。
+        zoom (int): 缩放级别。
+    """
+    from utils.station_clusters import MAX_ZOOM
+
+    st.session_state['map_latitude'] = round(latitude, 4)
+    st.session_state['map_longitude'] = round(longitude, 4)
+    st.session_state['map_zoom'] = min(zoom, MAX_ZOOM)
+
+def show_station_map():
+    """
+    显示站点分布地图：站点在服务端按缩放级别和瓦片聚合，只发送可见范围内的聚合点。
+    """
+    import pydeck as pdk
+    from utils.station_index import load_station_index
+    from utils.station_clusters import visible_clusters, MAX_ZOOM
+
+    with st.expander("站点地图/Station map"):
+        index = load_station_index()
+        if index is None:
+            st.caption("尚未构建站点空间索引，请先运行 python -m scripts.build_station_index/The station index has not been built yet.")
+            return
+
+        # 默认值写入 session_state，点击聚合点放大时由 zoom_to 修改
+        st.session_state.setdefault('map_latitude', 35.0)
+        st.session_state.setdefault('map_longitude', 105.0)
+        st.session_state.setdefault('map_zoom', 3)
+        col1, col2, col3 = st.columns(3)
+        latitude = col1.number_input("中心纬度/Center latitude", -85.0, 85.0, step=0.5, format="%.4f", key="map_latitude")
+        longitude = col2.number_input("中心经度/Center longitude", -180.0, 180.0, step=0.5, format="%.4f", key="map_longitude")
+        zoom = col3.slider("缩放级别/Zoom", 0, MAX_ZOOM, key="map_zoom")
+
+        # 聚合点来自进程内共享的瓦片缓存，显示字段写入新的字典，不修改缓存中的对象
+        clusters = [
+            {
+                **cluster,
+                'radius': 6 + 4 * cluster['count'] ** 0.5,
+                'label': str(cluster['count']) if cluster['count'] > 1 else "",
+                'color': [230, 120, 40, 200] if cluster['count'] > 1 else [40, 110, 220, 200],
+            }
+            for cluster in visible_clusters(index, latitude, longitude, zoom)
+        ]
+
+        deck = pdk.Deck(
+            layers=[
+                pdk.Layer(
+                    "ScatterplotLayer",
+                    id="stations",
+                    data=clusters,
+                    get_position=["longitude", "latitude"],
+                    get_radius="radius",
+                    radius_units="pixels",
+                    get_fill_color="color",
+                    pickable=True,
+                ),
+                pdk.Layer(
+                    "TextLayer",
+                    id="station_counts",
+                    data=[cluster for cluster in clusters if cluster['count'] > 1],
+                    get_position=["longitude", "latitude"],
+                    get_text="label",
+                    get_size=12,
+                    get_color=[255, 255, 255],
+                ),
+            ],
+            initial_view_state=pdk.ViewState(latitude=latitude, longitude=longitude, zoom=zoom),
+            tooltip={"text": "{name}"},
+        )
+        st.pydeck_chart(deck)
+        st.caption(f"当前视图共 {len(clusters)} 个聚合点、{sum(c['count'] for c in clusters)} 个站点；拖动地图不会加载新的区域，请调整中心和缩放级别/Pan with the controls above to load other areas.")
+
+        if not clusters:
+            return
+        # 站点多的聚合点排在前面
+        choices = {cluster['name']: cluster for cluster in sorted(clusters, key=lambda c: -c['count'])}
+        cluster = choices[st.selectbox("视图中的站点或聚合点/Stations or clusters in view", list(choices))]
+        if cluster['path']:
+            st.button(f"加载该站点/Load {cluster['name']}", on_click=select_station, args=(cluster['path'],))
+        else:
+            st.button("放大该区域/Zoom in", on_click=zoom_to, args=(cluster['latitude'], cluster['longitude'], zoom + 2))
 
 def run_app():
     st.header("气象数据与被动策略在线可视化/Visualization of Meteorological Data and Passive Strategies")
+
+    # 每个进程只启动一次：后台预加载重型模块与热门站点，并启动 Prometheus 抓取端点
+    start_warmup()
+    start_metrics_server()
     
+    find_nearby_stations()
+    show_station_map()
+
     continent_folders = fetch_file_list()
     continent_folders = [f for f in continent_folders if f['is_dir']]
     
     epw = None # 初始化 epw 变量
+    station_key = None # 仓库站点标识，用于读取预计算结果；上传的文件没有站点标识
 
     if continent_folders:
-        selected_continent = st.selectbox("选择大洲/Select a continent", [f['name'] for f in continent_folders])
+        keep_valid_selection("continent", [f['name'] for f in continent_folders])
+        selected_continent = st.selectbox("选择大洲/Select a continent", [f['name'] for f in continent_folders], key="continent")
 
         country_folders = fetch_file_list(f"/{selected_continent}")
         country_folders = [f for f in country_folders if f['is_dir']]
 
         if country_folders:
-            selected_country = st.selectbox("选择国家或地区/Select a country or region", [f['name'] for f in country_folders])
+            keep_valid_selection("country", [f['name'] for f in country_folders])
+            selected_country = st.selectbox("选择国家或地区/Select a country or region", [f['name'] for f in country_folders], key="country")
             
             administrative_region_folders = fetch_file_list(f"/{selected_continent}/{selected_country}")
             administrative_region_folders = [f for f in administrative_region_folders if f['is_dir']]
             if administrative_region_folders:
-                selected_administrative_region = st.selectbox("选择行政区/Select an administrative region", [f['name'] for f in administrative_region_folders])
+                keep_valid_selection("region", [f['name'] for f in administrative_region_folders])
+                selected_administrative_region = st.selectbox("选择行政区/Select an administrative region", [f['name'] for f in administrative_region_folders], key="region")
                 selected_files_path = f"/{selected_continent}/{selected_country}/{selected_administrative_region}"
                 selected_files = fetch_file_list(selected_files_path)
             else:
@@ -82,16 +245,22 @@ def run_app():
                 selected_files = fetch_file_list(selected_files_path)
 
             selected_files = [f for f in selected_files if not f['is_dir']]
-            selected_file = st.selectbox("选择文件/Select a file", [f['name'] for f in selected_files])
+            keep_valid_selection("station_file", [f['name'] for f in selected_files])
+            selected_file = st.selectbox("选择文件/Select a file", [f['name'] for f in selected_files], key="station_file")
 
             if selected_file and selected_file.endswith(".zip"):
+                from utils.file_manager import start_download
+                from utils.data_loader import unzip_and_load_epw
                 file_url = f"http://{ALIST_URL}/d{selected_files_path}/{selected_file}"
-                geoinfo = file_url.replace("http://warehouse.archknowledge.com.cn/d/", "").replace(".zip", "")
+                geoinfo = file_url.replace(f"http://{ALIST_URL}/d/", "").replace(".zip", "")
                 # 保存 geoinfo 到 session_state
                 st.session_state['geoinfo'] = geoinfo
+                station_key = geoinfo
 
-                # 下载文件到临时目录，并获取本地路径
-                local_zip_path = download_file(file_url)
+                # 下载文件到下载目录并显示进度（按仓库列表中的大小校验），获取本地路径
+                selected_size = next((f.get('size') for f in selected_files if f['name'] == selected_file), None)
+                # 下载在后台线程中进行（合并的会话共用一次下载），本会话只轮询共享的进度
+                local_zip_path = wait_for_download(file_url, start_download(file_url, expected_size=selected_size or None))
 
                 # 使用选中的 ZIP 文件名调用 unzip_and_load_epw，加载 EPW 对象
                 epw = unzip_and_load_epw(local_zip_path, selected_file)  
@@ -105,14 +274,32 @@ def run_app():
                     mime='application/zip'
                 )
 
+                # 加入多站点对比（跨会话重跑保留在 session_state 中）
+                if st.button("加入多站点对比/Add to station comparison"):
+                    comparison_stations = st.session_state.setdefault('comparison_stations', [])
+                    station_path = f"{selected_files_path}/{selected_file}"
+                    if station_path not in comparison_stations:
+                        comparison_stations.append(station_path)
+
             uploaded_file = st.file_uploader("上传EPW文件/Upload an EPW file", type="epw")
             if uploaded_file is not None:
+                from utils.data_loader import load_uploaded_epw
                 epw = load_uploaded_epw(uploaded_file)
+                station_key = None
                 st.success("成功读取上传的EPW文件/EPW file uploaded successfully!")
 
             # 检查 epw 是否为 None
             if epw:
                 st.subheader('您当前读取的数据是：' + str(epw))
+
+                # 显示缺测与超限数据的质量报告（数据已在读取时填补）
+                from utils.epw_arrays import load_epw_arrays
+                quality = load_epw_arrays(epw).quality
+                issues = quality[(quality["missing"] + quality["out_of_range"]) > 0]
+                if not issues.empty:
+                    with st.expander(f"数据质量报告/Data quality report（{len(issues)} 个字段存在缺测或超限值）"):
+                        st.caption("短缺口已线性插值，长缺口以同月同时刻均值填补，整列缺失的字段不参与统计。")
+                        st.dataframe(issues)
             else:
                 st.warning("未读取到有效的数据/No valid data read.")
 
@@ -122,16 +309,23 @@ def run_app():
             start_month = min(slider1, slider2)
             end_month = max(slider1, slider2)
 
-            color_scheme = st.slider("色卡选择，9为自定义颜色/Color Scheme, 9 is custom color", 1, 9, key=3)
-            if color_scheme == 9:
+            color_number = st.slider("色卡选择，9为自定义颜色/Color Scheme, 9 is custom color", 1, 9, key=3)
+            custom_color_1 = custom_color_2 = None
+            if color_number == 9:
                 custom_color_1 = st.color_picker("选择第一个颜色/Select the first color", "#FFFFFF")
                 custom_color_2 = st.color_picker("选择第二个颜色/Select the second color", "#000000")
-                set_user_defined_colors(custom_color_1, custom_color_2)
+            # 配色随本次重跑传入各图表模块，不写入模块级全局变量，不同会话互不影响
+            color_scheme = make_color_context(color_number, custom_color_1, custom_color_2)
 
             data_type = st.selectbox("选择可视化内容/Select Data Type", [
                 "人工智能专区/Artificial Intelligence Zone",
+                "全部变量总览/All Variables Dashboard",
                 "被动策略/Passive Strategies",
+                "热舒适/Thermal Comfort",
+                "设计工况/Design Conditions",
                 "温度/Temperature",
+                "度日数/Degree Days",
+                "典型日/Typical Day Profiles",
                 "相对湿度/Relative Humidity",
                 "风速和风玫瑰/Wind Speed and Wind Rose",
                 "天空覆盖量/Total Sky Cover",
@@ -140,49 +334,70 @@ def run_app():
                 "全球水平辐射/Global Horizontal Rad",
                 "直接法线照度/Direct Normal Ill",
                 "散射水平照度/Diffuse Horizontal Ill",
-                "全球水平照度/Global Horizontal Ill"
+                "全球水平照度/Global Horizontal Ill",
+                "多站点对比/Station Comparison"
             ])
 
+            # 图表模块在各分支中按需导入，首次加载页面时不必导入全部依赖；
+            # 仓库站点的各模块统计结果优先读取预计算存储（与人工智能专区共用）
             if data_type == "人工智能专区/Artificial Intelligence Zone":
-                # 生成图表模块并收集总结信息（不显示图表）
-                passive_strategies_summary = generate_passive_strategies_chart(epw, show_charts=False)
-                temperature_summary = generate_temperature_charts(epw, start_month, end_month, color_scheme, show_charts=False)
-                humidity_summary = generate_humidity_charts(epw, start_month, end_month, color_scheme, show_charts=False)
-                wind_summary = generate_wind_charts(epw, start_month, end_month, color_scheme, show_charts=False)
-                sky_cover_summary = generate_sky_cover_charts(epw, start_month, end_month, color_scheme, show_charts=False)
-                radiation_summary = generate_radiation_charts(epw, start_month, end_month, color_scheme, "Global",show_charts=False)
-                illuminance_summary = generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Global",show_charts=False)
-                generate_ai_report(
-                    passive_strategies_summary=passive_strategies_summary, 
-                    temperature_summary=temperature_summary, 
-                    humidity_summary=humidity_summary, 
-                    wind_summary=wind_summary, 
-                    sky_cover_summary=sky_cover_summary,
-                    radiation_summary = radiation_summary,
-                    illuminance_summary = illuminance_summary
-                )
+                from charts.artificial_intelligence_zone import generate_ai_report, collect_ai_summaries
+                from utils.report_jobs import report_key
+                # 收集各模块总结信息（优先读取预计算结果，不显示图表）
+                summaries = collect_ai_summaries(epw, start_month, end_month, color_scheme, station_key)
+                # 报告在后台线程中生成，地理编码需要在此显式传入（上传的文件没有站点标识）
+                generate_ai_report(**summaries, report_key=report_key(station_key, epw, start_month, end_month), geoinfo=station_key)
+            elif data_type == "全部变量总览/All Variables Dashboard":
+                from charts.dashboard_chart import generate_dashboard_charts
+                generate_dashboard_charts(epw, start_month, end_month, color_scheme)
             elif data_type == "被动策略/Passive Strategies":
+                from charts.passive_strategies_chart import generate_passive_strategies_chart
                 generate_passive_strategies_chart(epw)
+            elif data_type == "热舒适/Thermal Comfort":
+                from charts.comfort_chart import generate_comfort_charts
+                generate_comfort_charts(epw, start_month, end_month, color_scheme)
+            elif data_type == "设计工况/Design Conditions":
+                from charts.design_conditions_chart import generate_design_conditions_charts
+                generate_design_conditions_charts(epw)
             elif data_type == "温度/Temperature":
-                generate_temperature_charts(epw, start_month, end_month, color_scheme)
+                from charts.temperature_chart import generate_temperature_charts
+                generate_temperature_charts(epw, start_month, end_month, color_scheme, station_key=station_key)
+            elif data_type == "度日数/Degree Days":
+                from charts.degree_days_chart import generate_degree_days_charts
+                generate_degree_days_charts(epw, start_month, end_month, color_scheme)
+            elif data_type == "典型日/Typical Day Profiles":
+                from charts.typical_day_chart import generate_typical_day_charts
+                generate_typical_day_charts(epw, start_month, end_month, color_scheme)
             elif data_type == "相对湿度/Relative Humidity":
-                generate_humidity_charts(epw, start_month, end_month, color_scheme)
+                from charts.humidity_chart import generate_humidity_charts
+                generate_humidity_charts(epw, start_month, end_month, color_scheme, station_key=station_key)
             elif data_type == "风速和风玫瑰/Wind Speed and Wind Rose":
-                generate_wind_charts(epw, start_month, end_month, color_scheme)
+                from charts.wind_chart import generate_wind_charts
+                generate_wind_charts(epw, start_month, end_month, color_scheme, station_key=station_key)
             elif data_type == "天空覆盖量/Total Sky Cover":
-                generate_sky_cover_charts(epw, start_month, end_month, color_scheme)
+                from charts.sky_cover_chart import generate_sky_cover_charts
+                generate_sky_cover_charts(epw, start_month, end_month, color_scheme, station_key=station_key)
             elif data_type == "直接法线辐射/Direct Normal Rad":
-                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Direct")
+                from charts.radiation_chart import generate_radiation_charts
+                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Direct", station_key=station_key)
             elif data_type == "散射水平辐射/Diffuse Horizontal Rad":
-                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Diffuse")
+                from charts.radiation_chart import generate_radiation_charts
+                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Diffuse", station_key=station_key)
             elif data_type == "全球水平辐射/Global Horizontal Rad":
-                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Global")
+                from charts.radiation_chart import generate_radiation_charts
+                generate_radiation_charts(epw, start_month, end_month, color_scheme, "Global", station_key=station_key)
             elif data_type == "直接法线照度/Direct Normal Ill":
-                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Direct")
+                from charts.illuminance_chart import generate_illuminance_charts
+                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Direct", station_key=station_key)
             elif data_type == "散射水平照度/Diffuse Horizontal Ill":
-                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Diffuse")
+                from charts.illuminance_chart import generate_illuminance_charts
+                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Diffuse", station_key=station_key)
             elif data_type == "全球水平照度/Global Horizontal Ill":
-                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Global")
+                from charts.illuminance_chart import generate_illuminance_charts
+                generate_illuminance_charts(epw, start_month, end_month, color_scheme, "Global", station_key=station_key)
+            elif data_type == "多站点对比/Station Comparison":
+                from charts.comparison_chart import generate_comparison_charts
+                generate_comparison_charts(st.session_state.get('comparison_stations', []), start_month, end_month)
 
             # 设置尾部信息
             end_info = ("<font size='2'>Created by <a href='https://zhenzixu.com.cn'>Zhen Zixu</a>,"
@@ -197,4 +412,6 @@ def run_app():
         st.error("未找到包含 'Region' 的大洲文件夹/No continent folders containing 'Region' found.")
 
 if __name__ == "__main__":
-    run_app()
+    # 通过 ?profile=1 或环境变量 PROFILE_RERUNS 开启本次重跑的性能分析
+    with profiled_rerun():
+        run_app()
@@ -0,0 +1,110 @@
+# benchmark_aggregation.py
+#
+# 时间步感知聚合与被动策略统计的基准测试：在 8760 行（逐时）到 525,600 行（逐分钟）
+# 的数据上计时，验证耗时随行数线性增长（每行耗时基本不变）。
+#
+# 用法（在仓库根目录执行）：
+#     python -m scripts.benchmark_aggregation
+#     python -m scripts.benchmark_aggregation --with-files   # 额外生成子小时/闰年EPW并计时完整读取流程
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+TIMESTEPS = [1, 2, 4, 6, 12, 30, 60]
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def synthetic_arrays(timestep, rng):
+    """
+    生成指定时间步数的一年合成数据（非闰年）。
+
+    Args:
+        timestep (int): 每小时的时间步数。
+        rng (numpy.random.Generator): 随机数生成器。
+
+    Returns:
+        dict: 包含 month、day_of_year 以及干球温度、相对湿度、露点温度数组。
+    """
+    days_in_month = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    rows_per_day = 24 * timestep
+    month = np.repeat(np.arange(1, 13), days_in_month * rows_per_day)
+    day_of_year = np.repeat(np.arange(1, 366), rows_per_day)
+    n = len(month)
+    phase = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    t_drybulb = 14 - 14 * np.cos(phase) + rng.normal(0, 3, n)
+    rh = np.clip(65 + rng.normal(0, 15, n), 5, 100)
+    return {
+        "month": month,
+        "day_of_year": day_of_year,
+        "dry_bulb_temperature": t_drybulb,
+        "relative_humidity": rh,
+        "dew_point_temperature": t_drybulb - (100 - rh) / 5.0,
+    }
+
+def run_array_benchmark(repeat):
+    from utils.data_processor import aggregate_by_month, aggregate_by_day
+    from charts.passive_strategies_chart import count_passive_strategies
+
+    rng = np.random.default_rng(0)
+    print(f"{'timestep':>8} {'rows':>8} {'strategies ms':>14} {'monthly ms':>11} {'daily ms':>9} {'total ns/row':>13}")
+    rows = []
+    for timestep in TIMESTEPS:
+        data = synthetic_arrays(timestep, rng)
+        n = len(data["month"])
+        t_strategy = _best_of(lambda: count_passive_strategies(
+            data["dry_bulb_temperature"], data["relative_humidity"] / 100.0, data["dew_point_temperature"]), repeat)
+        t_month = _best_of(lambda: aggregate_by_month(data["dry_bulb_temperature"], data["month"], timestep=timestep), repeat)
+        t_day = _best_of(lambda: aggregate_by_day(data["dry_bulb_temperature"], data["day_of_year"], timestep=timestep), repeat)
+        total = t_strategy + t_month + t_day
+        rows.append((n, total))
+        print(f"{timestep:>8} {n:>8} {t_strategy * 1e3:>14.2f} {t_month * 1e3:>11.2f} {t_day * 1e3:>9.2f} {total / n * 1e9:>13.1f}")
+
+    # 对 log(耗时) ~ log(行数) 做线性拟合，斜率接近 1 即为线性扩展
+    sizes, times = np.log([r[0] for r in rows]), np.log([r[1] for r in rows])
+    slope = np.polyfit(sizes, times, 1)[0]
+    print(f"扩展指数（log-log 斜率，1.0 为线性）：{slope:.2f}")
+
+def run_file_benchmark(repeat):
+    from scripts.standins import build_subhourly_epw
+    from utils.epw_arrays import read_epw_arrays
+    from charts.passive_strategies_chart import count_passive_strategies
+
+    print(f"\n{'timestep':>8} {'leap':>5} {'rows':>8} {'hours':>7} {'read+count ms':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for timestep, leap_year in [(1, False), (1, True), (4, False), (15, True), (60, False)]:
+            path = build_subhourly_epw(os.path.join(tmp_dir, f"ts{timestep}_{leap_year}.epw"), timestep, leap_year)
+
+            def read_and_count():
+                arrays = read_epw_arrays(path)
+                count_passive_strategies(arrays.values("dry_bulb_temperature"),
+                                         arrays.values("relative_humidity") / 100.0,
+                                         arrays.values("dew_point_temperature"))
+                return arrays
+
+            arrays = read_and_count()
+            elapsed = _best_of(read_and_count, repeat)
+            print(f"{timestep:>8} {str(leap_year):>5} {len(arrays):>8} {arrays.total_hours:>7.0f} {elapsed * 1e3:>14.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="时间步感知聚合基准测试/Timestep-aware aggregation benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="每项计时重复次数（取最小值）")
+    parser.add_argument("--with-files", action="store_true", help="同时生成子小时/闰年EPW文件并计时读取流程")
+    args = parser.parse_args(argv)
+
+    run_array_benchmark(args.repeat)
+    if args.with_files:
+        run_file_benchmark(max(1, args.repeat // 2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
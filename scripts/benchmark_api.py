@@ -0,0 +1,162 @@
+# benchmark_api.py
+#
+# JSON 接口服务（api_server）的吞吐量基准测试：Alist 替换为本地替身服务，
+# 预计算存储与共享缓存使用临时目录，依次测量三个阶段：
+#     cold         每个接口地址首次请求（下载、解析与统计）
+#     warm         响应缓存命中
+#     conditional  携带 If-None-Match 的条件请求（304，不传输响应体）
+#
+# 用法（在仓库根目录执行）：
+#     python -m scripts.benchmark_api --concurrency 64 --requests 5000
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+def start_api_in_thread():
+    """
+    在后台线程的事件循环中启动接口服务（随机空闲端口）。
+
+    Returns:
+        str: 服务根地址，例如 "http://127.0.0.1:54321"。
+    """
+    from aiohttp import web
+    from api_server import create_app
+
+    started = threading.Event()
+    address = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(create_app())
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        address["url"] = "http://%s:%d" % runner.addresses[0][:2]
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="api-server", daemon=True).start()
+    started.wait()
+    return address["url"]
+
+async def run_phase(base_url, paths, total, concurrency, etags=None):
+    """
+    以固定并发数发送请求，统计吞吐量与延迟分布。
+
+    Args:
+        base_url (str): 服务根地址。
+        paths (list): 接口路径列表，按顺序循环（total 为 None 时每个路径请求一次）。
+        total (int): 请求总数，None 表示与路径数相同。
+        concurrency (int): 并发数。
+        etags (dict): 路径到 ETag 的映射，提供时发送条件请求。
+
+    Returns:
+        tuple: (结果字典, 路径到 ETag 的映射)
+    """
+    import aiohttp
+
+    total = total or len(paths)
+    latencies, statuses, seen_etags = [], {}, {}
+    counter = iter(range(total))
+
+    async def worker(session):
+        for i in counter:
+            path = paths[i % len(paths)]
+            headers = {"If-None-Match": etags[path]} if etags else {}
+            start = time.perf_counter()
+            async with session.get(base_url + path, headers=headers) as response:
+                await response.read()
+                seen_etags[path] = response.headers.get("ETag", "")
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "seconds": elapsed,
+        "rps": total / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "statuses": statuses,
+    }, seen_etags
+
+def endpoint_paths(stations):
+    """每个站点的全部基准测试接口路径。"""
+    paths = ["/api/stations"]
+    for station in stations:
+        prefix = f"/api/stations/{station}"
+        paths += [
+            f"{prefix}/aggregates?field=dry_bulb_temperature&period=monthly",
+            f"{prefix}/aggregates?field=relative_humidity&period=daily",
+            f"{prefix}/summaries/temperature?start_month=6&end_month=8",
+            f"{prefix}/summaries/radiation?variant=Direct",
+            f"{prefix}/summaries/passive_strategies",
+            f"{prefix}/passive-strategies",
+            f"{prefix}/wind",
+        ]
+    return paths
+
+async def run_benchmark(base_url, total, concurrency):
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(base_url + "/api/stations") as response:
+            stations = [item["key"] for item in (await response.json())["stations"]]
+    paths = endpoint_paths(stations)
+    paths_shuffled = random.Random(0).sample(paths, len(paths))
+
+    results = {}
+    results["cold"], etags = await run_phase(base_url, paths_shuffled, None, concurrency)
+    results["warm"], _ = await run_phase(base_url, paths_shuffled, total, concurrency)
+    results["conditional"], _ = await run_phase(base_url, paths_shuffled, total, concurrency, etags)
+    return len(stations), len(paths), results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON 接口服务吞吐量基准测试/API server throughput benchmark")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=5000, help="warm 与 conditional 阶段的请求数")
+    args = parser.parse_args(argv)
+
+    from scripts.standins import start_standin_server
+
+    # 替身服务与临时存储需要在导入接口服务（及其读取的配置）之前设置
+    server = start_standin_server()
+    workdir = tempfile.mkdtemp(prefix="benchmark-api-")
+    os.environ["ALIST_URL"] = "%s:%d" % server.server_address
+    os.environ["SUMMARY_STORE_PATH"] = os.path.join(workdir, "summary_store.sqlite")
+    os.environ["STACK_CACHE_DIR"] = os.path.join(workdir, "stacks")
+    os.environ["CACHE_BACKEND"] = "local"
+    os.environ["CACHE_DIR"] = os.path.join(workdir, "cache")
+
+    base_url = start_api_in_thread()
+    stations, endpoints, results = asyncio.run(run_benchmark(base_url, args.requests, args.concurrency))
+
+    print(f"{stations} 个站点，{endpoints} 个接口地址，并发 {args.concurrency}")
+    print(f"{'phase':<12} {'requests':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for phase, result in results.items():
+        print(f"{phase:<12} {result['requests']:>8} {result['rps']:>9.0f} {result['p50_ms']:>8.2f} "
+              f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}  {result['statuses']}")
+    ok = all(status in (200, 304) for result in results.values() for status in result["statuses"])
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
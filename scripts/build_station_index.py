@@ -0,0 +1,88 @@
+# build_station_index.py
+#
+# 构建站点空间索引：遍历 Alist 站点目录（或站点清单），只读取每个站点 EPW 头部的 LOCATION 行，
+# 将站点经纬度写入 config 中的 STATION_INDEX_PATH，供页面的“按坐标查找附近站点”使用。
+# 已在索引中的站点默认跳过，可作为定时任务增量更新，例如：
+#     python -m scripts.build_station_index --workers 16
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def fetch_station_location(station_path):
+    """
+    下载站点 ZIP 并读取其 LOCATION 信息（在线程中执行）。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+
+    Returns:
+        tuple: (站点路径, LOCATION 字典或 None, 错误信息或 None)
+    """
+    import requests
+    from utils.file_manager import get_station_url
+    from utils.station_index import read_zip_location
+
+    try:
+        response = requests.get(get_station_url(station_path), timeout=60)
+        response.raise_for_status()
+        return station_path, read_zip_location(response.content), None
+    except Exception as exc:
+        return station_path, None, repr(exc)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="构建站点空间索引/Build the station spatial index")
+    parser.add_argument("--root", default="/", help="遍历的 Alist 起始目录")
+    parser.add_argument("--stations-file", help="站点清单，每行一个站点 ZIP 路径；提供时不遍历目录")
+    parser.add_argument("--workers", type=int, default=8, help="并发下载线程数")
+    parser.add_argument("--output", help="索引输出路径，默认使用 STATION_INDEX_PATH")
+    parser.add_argument("--refresh", action="store_true", help="忽略已有索引，重新读取全部站点")
+    args = parser.parse_args(argv)
+
+    from utils.file_manager import list_station_files
+    from utils.station_index import StationIndex, load_station_index, save_station_index
+
+    if args.stations_file:
+        with open(args.stations_file, encoding="utf-8") as f:
+            stations = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        stations = list_station_files(args.root)
+
+    # 已有索引中的站点直接复用
+    entries = {}
+    existing = None if args.refresh else load_station_index(args.output)
+    if existing is not None:
+        for i, path in enumerate(existing.paths):
+            entries[str(path)] = (existing.names[i], existing.latitudes[i], existing.longitudes[i], existing.elevations[i])
+    pending = [station for station in stations if station not in entries]
+
+    print(f"共 {len(stations)} 个站点，需读取 {len(pending)} 个，{args.workers} 个线程")
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(fetch_station_location, station) for station in pending]
+        for future in as_completed(futures):
+            station, location, error = future.result()
+            if error:
+                failures += 1
+                print(f"[失败] {station}: {error}")
+                continue
+            name = os.path.basename(station).replace(".zip", "")
+            entries[station] = (name, location["latitude"], location["longitude"], location["elevation"])
+
+    paths = sorted(entries)
+    index = StationIndex(
+        paths,
+        [entries[path][0] for path in paths],
+        [entries[path][1] for path in paths],
+        [entries[path][2] for path in paths],
+        [entries[path][3] for path in paths],
+    )
+    save_station_index(index, args.output)
+    print(f"索引包含 {len(index)} 个站点，耗时 {time.perf_counter() - start:.1f}s，失败 {failures} 个")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
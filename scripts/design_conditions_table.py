@@ -0,0 +1,58 @@
+# design_conditions_table.py
+#
+# 多站点设计工况对比表：从 Alist 站点目录（或站点清单）下载 EPW，
+# 批量计算干球/湿球/露点温度的 ASHRAE 设计工况并导出 CSV，例如：
+#     python -m scripts.design_conditions_table --root /WMO_Region_2_Asia/CHN_China --output design_conditions.csv
+
+import argparse
+import os
+import sys
+import time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多站点设计工况对比表/Design conditions comparison table")
+    parser.add_argument("--root", default="/", help="遍历的 Alist 起始目录")
+    parser.add_argument("--stations-file", help="站点清单，每行一个站点 ZIP 路径；提供时不遍历目录")
+    parser.add_argument("--limit", type=int, help="最多计算的站点数")
+    parser.add_argument("--output", default="design_conditions.csv", help="输出 CSV 文件路径")
+    args = parser.parse_args(argv)
+
+    from utils.file_manager import list_station_files, download_file, get_station_url, get_station_key
+    from utils.data_loader import unzip_and_load_epw
+    from charts.design_conditions_chart import calculate_design_conditions_batch
+
+    if args.stations_file:
+        with open(args.stations_file, encoding="utf-8") as f:
+            stations = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        stations = list_station_files(args.root)
+    if args.limit:
+        stations = stations[:args.limit]
+
+    start = time.perf_counter()
+    epw_paths, station_keys = [], []
+    for station_path in stations:
+        try:
+            local_zip_path = download_file(get_station_url(station_path))
+            epw = unzip_and_load_epw(local_zip_path, os.path.basename(station_path))
+        except Exception as exc:
+            print(f"[失败] {station_path}: {exc!r}")
+            continue
+        epw_paths.append(epw.file_path)
+        station_keys.append(get_station_key(station_path))
+    download_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = calculate_design_conditions_batch(epw_paths)
+    compute_time = time.perf_counter() - start
+
+    # 用仓库中的站点标识替换临时文件路径
+    table.index = table.index.set_levels(
+        table.index.levels[0].map(dict(zip(epw_paths, station_keys))), level=0
+    )
+    table.round(2).to_csv(args.output, encoding="utf-8-sig")
+    print(f"{len(epw_paths)} 个站点：下载与解压 {download_time:.1f}s，计算 {compute_time:.2f}s，结果已写入 {args.output}")
+    return 0 if len(epw_paths) == len(stations) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# load_test.py
+#
+# 多会话重跑压测工具：用 Streamlit 的脚本测试框架（AppTest，需要 streamlit>=1.28）
+# 同时驱动多个会话反复操作下拉框、滑块与 data_type 切换，
+# Alist 与 LLM 接口替换为本地替身服务，记录每次重跑的耗时、CPU 与内存增长。
+#
+# 用法（在仓库根目录执行）：
+#     python -m scripts.load_test --sessions 50 --reruns 20 --output load_test.json
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def _find_selectbox(app, label_prefix):
+    for selectbox in app.selectbox:
+        if selectbox.label.startswith(label_prefix):
+            return selectbox
+    return None
+
+def _random_action(app, rng):
+    """
+    对会话随机施加一次交互操作，返回操作描述。
+
+    Args:
+        app (AppTest): 会话对应的 AppTest 实例。
+        rng (random.Random): 随机数生成器。
+
+    Returns:
+        str: 操作描述，用于按操作类型汇总耗时；页面未完整渲染时返回 "rerun"。
+    """
+    data_type_box = _find_selectbox(app, "选择可视化内容")
+    if data_type_box is None:
+        # 上一次重跑未渲染出完整页面（例如出错），直接重跑
+        return "rerun"
+    action = rng.choice(["data_type", "data_type", "month", "color", "station", "compare"])
+    if action == "data_type":
+        # 直接从页面的选项中抽取，main.py 新增的页面（总览、热舒适、典型日等）自动纳入压测
+        data_type = rng.choice(data_type_box.options)
+        data_type_box.select(data_type)
+        return f"data_type:{data_type.split('/')[-1]}"
+    if action == "month":
+        app.slider(key="1").set_value(rng.randint(1, 12))
+        app.slider(key="2").set_value(rng.randint(1, 12))
+        return "month"
+    if action == "color":
+        app.slider(key="3").set_value(rng.randint(1, 8))
+        return "color"
+    if action == "compare":
+        for button in app.button:
+            if button.label.startswith("加入多站点对比"):
+                button.click()
+        return "compare"
+    station_box = _find_selectbox(app, "选择文件")
+    station_box.select(rng.choice(station_box.options))
+    return "station"
+
+def run_session(session_id, reruns, seed, timeout, results, lock):
+    """
+    运行单个模拟会话：首次加载后连续执行若干次随机交互与重跑。
+
+    Args:
+        session_id (int): 会话编号。
+        reruns (int): 交互重跑次数。
+        seed (int): 随机种子。
+        timeout (float): 单次重跑的超时时间（秒）。
+        results (list): 共享的结果列表，每次重跑追加一条记录。
+        lock (threading.Lock): 保护结果列表的锁。
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "main.py"), default_timeout=timeout)
+    action = "initial"
+    for step in range(reruns + 1):
+        if step > 0:
+            action = _random_action(app, rng)
+        start = time.perf_counter()
+        error = None
+        try:
+            app.run()
+            if app.exception:
+                error = app.exception[0].message
+        except Exception as exc:  # 超时或脚本错误都记为失败
+            error = repr(exc)
+        elapsed = time.perf_counter() - start
+        with lock:
+            results.append({
+                "session": session_id,
+                "step": step,
+                "action": action,
+                "latency_s": elapsed,
+                "error": error,
+            })
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def _sample_process(process, samples, stop_event, interval):
+    """后台线程：周期性采样进程的 CPU 时间与 RSS。"""
+    while not stop_event.is_set():
+        cpu = process.cpu_times()
+        samples.append({"t": time.perf_counter(), "cpu_s": cpu.user + cpu.system, "rss_mb": process.memory_info().rss / 2 ** 20})
+        stop_event.wait(interval)
+
+def summarize(results, samples, wall_time):
+    """
+    汇总压测结果。
+
+    Args:
+        results (list): 每次重跑的记录。
+        samples (list): 进程资源采样。
+        wall_time (float): 总耗时（秒）。
+
+    Returns:
+        dict: 汇总报告。
+    """
+    latencies = [r["latency_s"] for r in results if r["error"] is None]
+    by_action = {}
+    for record in results:
+        if record["error"] is None:
+            by_action.setdefault(record["action"], []).append(record["latency_s"])
+
+    report = {
+        "reruns": len(results),
+        "errors": sum(1 for r in results if r["error"] is not None),
+        "wall_time_s": wall_time,
+        "throughput_reruns_per_s": len(results) / wall_time if wall_time else 0.0,
+        "latency_s": {
+            "mean": statistics.mean(latencies) if latencies else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": max(latencies) if latencies else 0.0,
+        },
+        "latency_by_action_p95_s": {action: _percentile(values, 95) for action, values in sorted(by_action.items())},
+    }
+    if samples:
+        cpu_used = samples[-1]["cpu_s"] - samples[0]["cpu_s"]
+        report["cpu"] = {
+            "cpu_seconds": cpu_used,
+            "cpu_seconds_per_rerun": cpu_used / len(results) if results else 0.0,
+            "mean_cores_busy": cpu_used / wall_time if wall_time else 0.0,
+        }
+        report["rss_mb"] = {
+            "start": samples[0]["rss_mb"],
+            "end": samples[-1]["rss_mb"],
+            "peak": max(s["rss_mb"] for s in samples),
+            "growth": samples[-1]["rss_mb"] - samples[0]["rss_mb"],
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit 多会话重跑压测/Multi-session rerun load test")
+    parser.add_argument("--sessions", type=int, default=10, help="并发会话数")
+    parser.add_argument("--reruns", type=int, default=10, help="每个会话的交互重跑次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--timeout", type=float, default=120.0, help="单次重跑超时（秒）")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="LLM 替身的模拟响应耗时（秒）")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="CPU/RSS 采样间隔（秒）")
+    parser.add_argument("--output", help="将原始记录和汇总写入该 JSON 文件")
+    args = parser.parse_args(argv)
+
+    import psutil
+    from scripts.standins import start_standin_server
+
+    # 替身服务必须在导入 config 之前写入环境变量
+    server = start_standin_server(llm_delay=args.llm_delay)
+    address = "%s:%d" % server.server_address
+    os.environ["ALIST_URL"] = address
+    os.environ["OPENAI_API_HOST"] = address
+    os.environ["OPENAI_API_SCHEME"] = "http"
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    process = psutil.Process()
+    samples = []
+    stop_event = threading.Event()
+    sampler = threading.Thread(target=_sample_process, args=(process, samples, stop_event, args.sample_interval), daemon=True)
+    sampler.start()
+
+    results = []
+    lock = threading.Lock()
+    sessions = [
+        threading.Thread(target=run_session, args=(i, args.reruns, args.seed, args.timeout, results, lock))
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in sessions:
+        thread.start()
+    for thread in sessions:
+        thread.join()
+    wall_time = time.perf_counter() - start
+
+    stop_event.set()
+    sampler.join()
+    # 补一次结束时的采样，保证 CPU/RSS 覆盖整个压测区间
+    cpu = process.cpu_times()
+    samples.append({"t": time.perf_counter(), "cpu_s": cpu.user + cpu.system, "rss_mb": process.memory_info().rss / 2 ** 20})
+    server.shutdown()
+
+    report = summarize(results, samples, wall_time)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"summary": report, "reruns": results, "samples": samples}, f, ensure_ascii=False, indent=2)
+    return 0 if report["errors"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
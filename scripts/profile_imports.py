@@ -0,0 +1,60 @@
+# profile_imports.py
+#
+# 启动导入耗时分析：在新的解释器中用 `python -X importtime` 导入入口模块，
+# 按累计耗时列出最慢的导入，用于检查首屏渲染前的导入开销。
+#
+# 用法（在仓库根目录执行）：
+#     python -m scripts.profile_imports                     # 入口 main.py 的顶层导入
+#     python -m scripts.profile_imports --module charts.wind_chart --top 20
+
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def profile_import(module):
+    """
+    在子进程中导入模块并解析 -X importtime 的输出。
+
+    Args:
+        module (str): 模块名。
+
+    Returns:
+        list: (模块名, 自身耗时 μs, 累计耗时 μs, 嵌套层级) 元组列表，按导入顺序排列。
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动导入耗时分析/Import-time profile of the entry point")
+    parser.add_argument("--module", action="append", help="需要分析的模块，可重复；默认分析 main")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最长的导入数")
+    args = parser.parse_args(argv)
+
+    for module in args.module or ["main"]:
+        records = profile_import(module)
+        total = sum(cumulative for _, _, cumulative, depth in records if depth == 0)
+        print(f"{module}：导入 {len(records)} 个模块，总耗时 {total / 1000:.0f} ms")
+        for name, self_us, cumulative_us, _ in sorted(records, key=lambda r: -r[2])[:args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms（自身 {self_us / 1000:6.1f} ms）  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+# standins.py
+
+import io
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 本地替身服务使用的虚拟目录结构：大洲/国家/行政区/站点
+STANDIN_CONTINENT = "WMO_Region_2_Asia"
+STANDIN_COUNTRY = "CHN_China"
+STANDIN_REGION = "SN_Shaanxi"
+STANDIN_STATIONS = [
+    "CHN_SN_Xian.570360_CSWD",
+    "CHN_SN_Baoji.570160_CSWD",
+    "CHN_SN_Yanan.538450_CSWD",
+]
+# 替身站点的 LOCATION 信息：(城市, 纬度, 经度, 海拔)
+STANDIN_LOCATIONS = {
+    "CHN_SN_Xian.570360_CSWD": ("Xian", 34.30, 108.93, 398.0),
+    "CHN_SN_Baoji.570160_CSWD": ("Baoji", 34.35, 107.13, 612.0),
+    "CHN_SN_Yanan.538450_CSWD": ("Yanan", 36.60, 109.50, 959.0),
+}
+
+def build_synthetic_epw(file_path, seed=0, location=None):
+    """
+    生成一个数值合理的合成EPW文件，供替身服务和基准测试使用。
+
+    Args:
+        file_path (str): 输出EPW文件的路径。
+        seed (int): 相位偏移种子，用于让不同站点的数据略有差异。
+        location (tuple): 可选的 (城市, 纬度, 经度, 海拔)，写入 EPW 头部的 LOCATION 行。
+
+    Returns:
+        str: 生成的EPW文件路径。
+    """
+    from ladybug.epw import EPW
+
+    epw = EPW.from_missing_values()
+    if location:
+        epw.location.city, epw.location.latitude, epw.location.longitude, epw.location.elevation = location
+        epw.location.country = "CHN"
+        epw.location.time_zone = 8
+    hours = range(8760)
+    phase = seed * 0.3
+
+    def annual(i, mean, amp):
+        return mean - amp * math.cos(2 * math.pi * (i / 8760.0) + phase)
+
+    def diurnal(i, amp):
+        return amp * math.sin(2 * math.pi * ((i % 24) - 9) / 24.0)
+
+    dry_bulb = [annual(i, 14, 14) + diurnal(i, 5) for i in hours]
+    humidity = [int(max(15, min(100, 65 - diurnal(i, 15) + 10 * math.sin(i / 97.0)))) for i in hours]
+    epw.dry_bulb_temperature.values = dry_bulb
+    epw.relative_humidity.values = humidity
+    epw.dew_point_temperature.values = [t - (100 - rh) / 5.0 for t, rh in zip(dry_bulb, humidity)]
+    epw.wind_speed.values = [abs(3 + 2 * math.sin(i / 13.0)) for i in hours]
+    epw.wind_direction.values = [(i * 7 + seed * 40) % 360 for i in hours]
+    epw.total_sky_cover.values = [int(5 + 4 * math.sin(i / 53.0)) for i in hours]
+    solar = [max(0.0, 800 * math.sin(math.pi * ((i % 24) - 6) / 12.0)) if 6 <= i % 24 <= 18 else 0.0 for i in hours]
+    epw.global_horizontal_radiation.values = solar
+    epw.direct_normal_radiation.values = [v * 0.7 for v in solar]
+    epw.diffuse_horizontal_radiation.values = [v * 0.3 for v in solar]
+    epw.global_horizontal_illuminance.values = [v * 110 for v in solar]
+    epw.direct_normal_illuminance.values = [v * 77 for v in solar]
+    epw.diffuse_horizontal_illuminance.values = [v * 33 for v in solar]
+    epw.save(file_path)
+    return file_path
+
+def build_subhourly_epw(file_path, timestep, leap_year=False, seed=0):
+    """
+    由合成逐时EPW派生子小时（以及可选闰年）EPW文件，用于验证时间步感知的读取与聚合。
+
+    Args:
+        file_path (str): 输出EPW文件的路径。
+        timestep (int): 每小时的时间步数（1–60）。
+        leap_year (bool): 是否插入2月29日，生成闰年（8784 小时）数据。
+        seed (int): 传递给合成EPW的相位种子。
+
+    Returns:
+        str: 生成的EPW文件路径。
+    """
+    hourly_path = build_synthetic_epw(file_path + ".hourly.epw", seed)
+    with open(hourly_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    os.remove(hourly_path)
+    header, body = lines[:8], [line for line in lines[8:] if line]
+
+    period = header[7].split(",")
+    period[2] = str(timestep)
+    header[7] = ",".join(period)
+
+    if leap_year:
+        feb_28 = [row for row in body if row.split(",")[1:3] == ["2", "28"]]
+        feb_29 = [",".join(row.split(",")[:2] + ["29"] + row.split(",")[3:]) for row in feb_28]
+        insert_at = body.index(feb_28[-1]) + 1
+        body = body[:insert_at] + feb_29 + body[insert_at:]
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(header) + "\n")
+        for row in body:
+            parts = row.split(",")
+            for step in range(1, timestep + 1):
+                parts[4] = str(step * 60 // timestep)
+                f.write(",".join(parts) + "\n")
+    return file_path
+
+def build_station_zip(station_name, seed=0):
+    """
+    将合成EPW打包为与Alist仓库同名结构的ZIP字节串。
+
+    Args:
+        station_name (str): 站点文件名（不含扩展名）。
+        seed (int): 传递给合成EPW的相位种子。
+
+    Returns:
+        bytes: ZIP文件内容。
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        epw_path = build_synthetic_epw(os.path.join(tmp_dir, station_name + ".epw"), seed, STANDIN_LOCATIONS.get(station_name))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+            zip_ref.write(epw_path, station_name + ".epw")
+    return buffer.getvalue()
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    """同时模拟 Alist 文件列表/下载接口与 OpenAI 对话接口的请求处理器。"""
+
+    server_version = "StandinServer/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/fs/list":
+            content = self.server.listing.get(payload.get("path", "/").rstrip("/") or "/")
+            if content is None:
+                body = {"code": 404, "message": "object not found", "data": None}
+            else:
+                body = {"code": 200, "message": "success", "data": {"content": content}}
+            self._send(200, json.dumps(body).encode("utf-8"))
+        elif self.path == "/v1/chat/completions":
+            time.sleep(self.server.llm_delay)
+            answer = {"choices": [{"message": {"role": "assistant", "content": "替身服务的模拟回答/Stand-in answer."}}]}
+            self._send(200, json.dumps(answer, ensure_ascii=False).encode("utf-8"))
+        else:
+            self._send(404, b"{}")
+
+    def do_GET(self):
+        blob = self.server.files.get(self.path)
+        if blob is None:
+            self._send(404, b"not found", "text/plain")
+            return
+        # 支持 "Range: bytes=N-" 续传请求
+        start = 0
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes=") and range_header.endswith("-"):
+            start = int(range_header[6:-1])
+            if start >= len(blob):
+                self._send(416, b"", "text/plain")
+                return
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(len(blob) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(blob) - 1}/{len(blob)}")
+        self.end_headers()
+        # 模拟传输中断：发送 drop_after 字节后关闭连接（只生效一次）
+        drop_after, self.server.drop_after = self.server.drop_after, None
+        if drop_after is not None:
+            self.wfile.write(blob[start:start + drop_after])
+            self.close_connection = True
+            return
+        self.wfile.write(blob[start:])
+
+def start_standin_server(host="127.0.0.1", port=0, llm_delay=0.0, stations=None):
+    """
+    在后台线程中启动 Alist 与 LLM 的本地替身服务。
+
+    Args:
+        host (str): 监听地址。
+        port (int): 监听端口，0 表示随机空闲端口。
+        llm_delay (float): 模拟 LLM 响应耗时（秒）。
+        stations (list): 站点文件名列表，默认使用 STANDIN_STATIONS。
+
+    Returns:
+        ThreadingHTTPServer: 已启动的服务对象，其 server_address 给出实际端口。
+    """
+    stations = stations or STANDIN_STATIONS
+    region_path = f"/{STANDIN_CONTINENT}/{STANDIN_COUNTRY}/{STANDIN_REGION}"
+    zips = {name: build_station_zip(name, seed) for seed, name in enumerate(stations)}
+
+    server = ThreadingHTTPServer((host, port), _StandinHandler)
+    server.daemon_threads = True
+    server.llm_delay = llm_delay
+    server.drop_after = None  # 设为整数时下一次文件下载在发送该字节数后中断
+    server.listing = {
+        "/": [{"name": STANDIN_CONTINENT, "is_dir": True, "size": 0}],
+        f"/{STANDIN_CONTINENT}": [{"name": STANDIN_COUNTRY, "is_dir": True, "size": 0}],
+        f"/{STANDIN_CONTINENT}/{STANDIN_COUNTRY}": [{"name": STANDIN_REGION, "is_dir": True, "size": 0}],
+        region_path: [{"name": name + ".zip", "is_dir": False, "size": len(blob)} for name, blob in zips.items()],
+    }
+    server.files = {f"/d{region_path}/{name}.zip": blob for name, blob in zips.items()}
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+class _RedisStandinHandler(socketserver.StreamRequestHandler):
+    """最小的 RESP 协议替身，实现共享缓存后端用到的 Redis 命令。"""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, bool):
+            self.wfile.write(b"+OK\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, bytes):
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self._write(item)
+        else:
+            self.wfile.write(b"-ERR %s\r\n" % str(value).encode("utf-8"))
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            with self.server.lock:
+                try:
+                    reply = self.server.execute(args[0].decode().upper(), args[1:])
+                except Exception as e:
+                    reply = e
+            self._write(reply)
+
+class _RedisStandinServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _RedisStandinHandler)
+        self.lock = threading.Lock()
+        self.values = {}
+        self.expires = {}
+        self.commands = 0
+
+    def _alive(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at < time.time():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def execute(self, name, args):
+        self.commands += 1
+        if name in ("PING", "AUTH", "SELECT"):
+            return True
+        if name == "FLUSHDB":
+            self.values.clear()
+            self.expires.clear()
+            return True
+        key = args[0]
+        alive = self._alive(key)
+        if name == "GET":
+            return self.values[key] if alive else None
+        if name == "SET":
+            self.values[key] = args[1]
+            self.expires.pop(key, None)
+            options = [a.upper() for a in args[2:]]
+            if b"PX" in options:
+                self.expires[key] = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            return True
+        if name == "DEL":
+            return sum(1 for k in args if self._alive(k) and self.values.pop(k, None) is not None)
+        if name in ("INCRBY", "DECRBY"):
+            delta = int(args[1]) * (1 if name == "INCRBY" else -1)
+            self.values[key] = str(int(self.values.get(key, b"0")) + delta).encode()
+            return int(self.values[key])
+        if name in ("HSET", "HGET", "HMGET", "HDEL"):
+            table = self.values.setdefault(key, {})
+            if name == "HSET":
+                table[args[1]] = args[2]
+                return 1
+            if name == "HGET":
+                return table.get(args[1])
+            if name == "HMGET":
+                return [table.get(field) for field in args[1:]]
+            return sum(1 for field in args[1:] if table.pop(field, None) is not None)
+        if name in ("ZADD", "ZREM", "ZRANGE"):
+            zset = self.values.setdefault(key, {})
+            if name == "ZADD":
+                only_existing = args[1].upper() == b"XX"
+                score, member = args[-2:]
+                if only_existing and member not in zset:
+                    return 0
+                zset[member] = float(score)
+                return 1
+            if name == "ZREM":
+                return sum(1 for member in args[1:] if zset.pop(member, None) is not None)
+            start, stop = int(args[1]), int(args[2])
+            members = [member for member, _ in sorted(zset.items(), key=lambda item: item[1])]
+            return members[start:] if stop == -1 else members[start:stop + 1]
+        return ValueError(f"unknown command {name}")
+
+def start_redis_standin(host="127.0.0.1", port=0):
+    """
+    在后台线程中启动 Redis 协议的本地替身服务，用于测试共享缓存后端。
+
+    Args:
+        host (str): 监听地址。
+        port (int): 监听端口，0 表示随机空闲端口。
+
+    Returns:
+        socketserver.ThreadingTCPServer: 已启动的服务对象，其 server_address 给出实际端口，commands 为已处理的命令数。
+    """
+    server = _RedisStandinServer((host, port))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
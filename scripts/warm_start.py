@@ -0,0 +1,81 @@
+# warm_start.py
+#
+# 容器启动预热：等待 Streamlit 服务就绪后，通过 WebSocket 建立一个无头会话并执行一次 main.py，
+# 使服务进程在第一个真实用户到来前完成重型模块导入，并触发 utils/warmup.py 中的后台预热
+# （预加载模块，以及 WARM_STATIONS 中列出的热门站点）。
+#
+# 用法（容器启动命令中与 streamlit 同时运行）：
+#     python -m scripts.warm_start --url http://localhost:8501
+
+import argparse
+import sys
+import time
+import requests
+
+def wait_until_ready(url, timeout):
+    """
+    轮询 Streamlit 的健康检查接口，直到服务就绪或超时。
+
+    Args:
+        url (str): 服务地址，例如 "http://localhost:8501"。
+        timeout (float): 最长等待时间（秒）。
+
+    Returns:
+        bool: 服务是否就绪。
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/_stcore/health", timeout=2).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+def run_headless_session(url, timeout):
+    """
+    建立一个无头会话并请求执行一次脚本，等待脚本运行结束。
+
+    Args:
+        url (str): 服务地址。
+        timeout (float): 等待脚本结束的最长时间（秒）。
+
+    Returns:
+        float: 脚本执行耗时（秒）。
+    """
+    import websocket
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    ws = websocket.create_connection(url.replace("http", "ws", 1) + "/_stcore/stream", timeout=timeout)
+    try:
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        start = time.perf_counter()
+        ws.send_binary(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(ws.recv())
+            if forward.WhichOneof("type") == "script_finished":
+                return time.perf_counter() - start
+    finally:
+        ws.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="容器启动预热/Warm the Streamlit server at boot")
+    parser.add_argument("--url", default="http://localhost:8501", help="Streamlit 服务地址")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="等待服务就绪的最长时间（秒）")
+    parser.add_argument("--timeout", type=float, default=300.0, help="等待预热会话执行完毕的最长时间（秒）")
+    args = parser.parse_args(argv)
+
+    if not wait_until_ready(args.url, args.ready_timeout):
+        print(f"服务未在 {args.ready_timeout:.0f}s 内就绪：{args.url}")
+        return 1
+    seconds = run_headless_session(args.url, args.timeout)
+    print(f"预热会话执行完毕，耗时 {seconds:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
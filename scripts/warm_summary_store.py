@@ -0,0 +1,122 @@
+# warm_summary_store.py
+#
+# 预计算结果存储的预热任务：从 Alist 站点目录（或热门站点清单）并行下载 EPW，
+# 计算全年与各月份区间的模块总结以及逐月/逐日聚合，写入 utils/summary_store。
+# 已存在的结果会被跳过，因此可以作为夜间定时任务反复执行，例如：
+#     0 3 * * * cd /app && python -m scripts.warm_summary_store --stations-file popular_stations.txt --workers 4
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 预热的逐月/逐日聚合字段
+AGGREGATE_FIELDS = [
+    "dry_bulb_temperature",
+    "relative_humidity",
+    "wind_speed",
+    "total_sky_cover",
+    "direct_normal_radiation",
+    "diffuse_horizontal_radiation",
+    "global_horizontal_radiation",
+    "direct_normal_illuminance",
+    "diffuse_horizontal_illuminance",
+    "global_horizontal_illuminance",
+]
+
+def month_ranges(mode):
+    """
+    生成需要预热的月份区间。
+
+    Args:
+        mode (str): "full" 仅全年；"months" 全年加各单月；"all" 全部 1<=起始<=终止<=12 的区间。
+
+    Returns:
+        list: (起始月份, 终止月份) 元组列表。
+    """
+    if mode == "full":
+        return [(1, 12)]
+    if mode == "months":
+        return [(1, 12)] + [(m, m) for m in range(1, 13)]
+    return [(s, e) for s in range(1, 13) for e in range(s, 13)]
+
+def warm_station(station_path, ranges, refresh=False):
+    """
+    预热单个站点的全部总结与聚合结果（在子进程中执行）。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+        ranges (list): 需要预热的月份区间。
+        refresh (bool): 是否先删除该站点已有的结果再重新计算。
+
+    Returns:
+        tuple: (站点路径, 耗时秒数, 错误信息或 None)
+    """
+    from utils import summary_store
+    from utils.file_manager import download_file, get_station_url, get_station_key
+    from utils.data_loader import unzip_and_load_epw
+    from utils.data_processor import aggregate_by_month, aggregate_by_day
+    from utils.epw_arrays import load_epw_arrays
+    from charts.artificial_intelligence_zone import collect_ai_summaries
+
+    start = time.perf_counter()
+    station_key = get_station_key(station_path)
+    try:
+        if refresh:
+            summary_store.delete_station(station_key)
+        local_zip_path = download_file(get_station_url(station_path))
+        epw = unzip_and_load_epw(local_zip_path, os.path.basename(station_path))
+        for start_month, end_month in ranges:
+            collect_ai_summaries(epw, start_month, end_month, 1, station_key=station_key)
+        # 聚合基于经过缺测填补的数组数据，整列缺失的字段不写入
+        arrays = load_epw_arrays(epw)
+        for field in AGGREGATE_FIELDS:
+            if not arrays.is_available(field):
+                continue
+            if summary_store.get_aggregates(station_key, field, "monthly") is None:
+                summary_store.put_aggregates(station_key, field, "monthly", aggregate_by_month(arrays.values(field), arrays.month))
+            if summary_store.get_aggregates(station_key, field, "daily") is None:
+                summary_store.put_aggregates(station_key, field, "daily", aggregate_by_day(arrays.values(field), arrays.day_of_year))
+    except Exception as exc:
+        return station_path, time.perf_counter() - start, repr(exc)
+    return station_path, time.perf_counter() - start, None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="预热站点总结存储/Warm the station summary store")
+    parser.add_argument("--root", default="/", help="遍历的 Alist 起始目录")
+    parser.add_argument("--stations-file", help="热门站点清单，每行一个站点 ZIP 路径；提供时不遍历目录")
+    parser.add_argument("--limit", type=int, help="最多预热的站点数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument("--ranges", choices=["full", "months", "all"], default="all", help="预热的月份区间")
+    parser.add_argument("--refresh", action="store_true", help="删除已有结果后重新计算")
+    args = parser.parse_args(argv)
+
+    from utils.file_manager import list_station_files
+
+    if args.stations_file:
+        with open(args.stations_file, encoding="utf-8") as f:
+            stations = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        stations = list_station_files(args.root)
+    if args.limit:
+        stations = stations[:args.limit]
+    ranges = month_ranges(args.ranges)
+
+    print(f"预热 {len(stations)} 个站点，每个站点 {len(ranges)} 个月份区间，{args.workers} 个进程")
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(warm_station, station, ranges, args.refresh) for station in stations]
+        for future in as_completed(futures):
+            station, elapsed, error = future.result()
+            if error:
+                failures += 1
+                print(f"[失败] {station} ({elapsed:.1f}s): {error}")
+            else:
+                print(f"[完成] {station} ({elapsed:.1f}s)")
+    print(f"共耗时 {time.perf_counter() - start:.1f}s，失败 {failures} 个站点")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
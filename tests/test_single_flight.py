@@ -0,0 +1,115 @@
+# test_single_flight.py
+
+import threading
+import time
+import unittest
+from utils.single_flight import single_flight
+
+class Interrupt(BaseException):
+    """模拟 Streamlit 的 RerunException / StopException（均继承自 BaseException）。"""
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_calls_share_result(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return object()
+
+        results = [None, None]
+
+        def run(i):
+            results[i] = single_flight("test", "shared", compute)
+
+        leader = threading.Thread(target=run, args=(0,))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=run, args=(1,))
+        follower.start()
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIs(results[0], results[1])
+
+    def test_exception_is_shared(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        errors = [None, None]
+
+        def run(i):
+            try:
+                single_flight("test", "error", compute)
+            except ValueError as e:
+                errors[i] = e
+
+        leader = threading.Thread(target=run, args=(0,))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=run, args=(1,))
+        follower.start()
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertIsNotNone(errors[0])
+        self.assertIs(errors[0], errors[1])
+
+    def test_base_exception_is_not_shared(self):
+        # 先到的请求被 BaseException 中断时，等待者不应收到该异常，而是自己重新执行
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def interrupted():
+            calls.append("leader")
+            started.set()
+            release.wait(5)
+            raise Interrupt("session=A")
+
+        def compute():
+            calls.append("follower")
+            return "B"
+
+        outcome = {}
+
+        def run_leader():
+            try:
+                single_flight("test", "interrupt", interrupted)
+            except Interrupt as e:
+                outcome["leader"] = e
+
+        def run_follower():
+            try:
+                outcome["follower"] = single_flight("test", "interrupt", compute)
+            except BaseException as e:
+                outcome["follower"] = e
+
+        leader = threading.Thread(target=run_leader)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=run_follower)
+        follower.start()
+        # 等待者进入等待后再中断先到的请求
+        time.sleep(0.2)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertIsInstance(outcome["leader"], Interrupt)
+        self.assertEqual(outcome["follower"], "B")
+        self.assertEqual(calls, ["leader", "follower"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# test_summary_store.py
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+from utils import summary_store
+from utils.summaries import TEMPERATURE, UnavailableSummary, summary_to_payload
+
+class SummaryStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, "store.sqlite")
+        patches = [
+            mock.patch.object(summary_store, "get_summary_store_path", return_value=self.path),
+            mock.patch.object(summary_store, "get_cache", return_value=mock.Mock(get=mock.Mock(return_value=None))),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _write_row(self, payload):
+        # 先写入一条当前版本的结果以建表，再直接覆盖为旧版本的行
+        summary_store.put_summary("station", TEMPERATURE, 1, 12, UnavailableSummary(TEMPERATURE))
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("UPDATE summaries SET payload=?, created_at=?", (json.dumps(payload, ensure_ascii=False), time.time()))
+
+    def test_round_trip(self):
+        summary = UnavailableSummary(TEMPERATURE)
+        summary_store.put_summary("station", TEMPERATURE, 1, 12, summary)
+        self.assertEqual(summary_store.get_summary("station", TEMPERATURE, 1, 12), summary)
+
+    def test_legacy_rows_are_recomputed(self):
+        # 旧版本存储的渲染文字与不带版本号的记录都视为未命中，重新计算后覆盖
+        summary = UnavailableSummary(TEMPERATURE)
+        for legacy in ("该站点缺少干球温度数据", summary_to_payload(summary)):
+            self._write_row(legacy)
+            self.assertIsNone(summary_store.get_summary("station", TEMPERATURE, 1, 12))
+            computed = summary_store.get_or_compute_summary("station", TEMPERATURE, 1, 12, lambda: summary)
+            self.assertEqual(computed, summary)
+            self.assertEqual(summary_store.get_summary("station", TEMPERATURE, 1, 12), summary)
+
+if __name__ == "__main__":
+    unittest.main()
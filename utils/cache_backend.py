@@ -0,0 +1,432 @@
+# cache_backend.py
+
+import hashlib
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+from config import get_cache_settings
+from utils.metrics import record_cache
+
+# 各类缓存内容的默认有效期（秒）
+NAMESPACE_TTLS = {
+    "download": 7 * 24 * 3600,
+    "epw_arrays": 7 * 24 * 3600,
+    "summary": 30 * 24 * 3600,
+    "aggregates": 30 * 24 * 3600,
+    "llm": 7 * 24 * 3600,
+    "report": 30 * 24 * 3600,
+}
+
+# 值的编码格式（首字节）：原始字节、pickle、zlib 压缩的 pickle
+_RAW, _PICKLE, _ZLIB_PICKLE = b"B", b"P", b"Z"
+
+# 小于该字节数的 pickle 不压缩
+_COMPRESS_MIN_BYTES = 1024
+
+def encode_value(value):
+    """
+    将对象编码为紧凑的二进制：bytes 原样保存（例如已压缩的 ZIP），其他对象使用 pickle 协议 5，
+    较大的结果再做 zlib 压缩（numpy 数组以原始缓冲区写入，不经过文本转换）。
+
+    Args:
+        value (object): 需要缓存的对象。
+
+    Returns:
+        bytes: 编码结果。
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return _RAW + bytes(value)
+    data = pickle.dumps(value, protocol=5)
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        return _ZLIB_PICKLE + zlib.compress(data, 1)
+    return _PICKLE + data
+
+def decode_value(data):
+    """
+    解码 encode_value 的结果。
+
+    注意：pickle 只能用于可信数据，缓存目录与 Redis 实例不应对外开放。
+
+    Args:
+        data (bytes): 编码结果。
+
+    Returns:
+        object: 原对象。
+    """
+    kind, payload = data[:1], data[1:]
+    if kind == _RAW:
+        return payload
+    if kind == _ZLIB_PICKLE:
+        payload = zlib.decompress(payload)
+    return pickle.loads(payload)
+
+class CacheBackend:
+    """
+    跨进程/跨副本共享的缓存接口：按命名空间存取对象，支持有效期与总字节预算。
+
+    子类实现 _get_bytes、_set_bytes、_delete；缓存故障（例如 Redis 不可用）按未命中处理，不影响页面。
+    """
+
+    def __init__(self, max_bytes=None, namespace_ttls=None):
+        self.max_bytes = max_bytes
+        self.namespace_ttls = dict(NAMESPACE_TTLS, **(namespace_ttls or {}))
+
+    def make_key(self, namespace, key):
+        """命名空间加键的摘要，避免键中出现路径分隔符或过长。"""
+        return f"{namespace}:{hashlib.sha1(str(key).encode('utf-8')).hexdigest()}"
+
+    def get(self, namespace, key):
+        """
+        读取缓存对象。
+
+        Args:
+            namespace (str): 命名空间，例如 "download"、"epw_arrays"、"summary"、"llm"。
+            key (str): 命名空间内的键。
+
+        Returns:
+            object: 缓存对象，未命中、过期或出错时返回 None。
+        """
+        try:
+            data = self._get_bytes(self.make_key(namespace, key))
+            record_cache(f"shared:{namespace}", data is not None)
+            return None if data is None else decode_value(data)
+        except (OSError, ValueError, EOFError, struct.error, pickle.UnpicklingError, zlib.error):
+            return None
+
+    def set(self, namespace, key, value, ttl=None):
+        """
+        写入缓存对象。
+
+        Args:
+            namespace (str): 命名空间。
+            key (str): 命名空间内的键。
+            value (object): 需要缓存的对象。
+            ttl (float): 有效期（秒），默认使用 NAMESPACE_TTLS 中该命名空间的设置，0 表示不过期。
+        """
+        ttl = self.namespace_ttls.get(namespace, 0) if ttl is None else ttl
+        data = encode_value(value)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        try:
+            self._set_bytes(self.make_key(namespace, key), data, ttl)
+        except OSError:
+            pass
+
+    def delete(self, namespace, key):
+        """删除缓存对象。"""
+        try:
+            self._delete(self.make_key(namespace, key))
+        except OSError:
+            pass
+
+    def get_or_compute(self, namespace, key, compute, ttl=None):
+        """
+        优先读取缓存，未命中时调用 compute 计算并写回缓存（compute 返回 None 时不写入）。
+
+        Args:
+            namespace (str): 命名空间。
+            key (str): 命名空间内的键。
+            compute (callable): 无参数的计算函数。
+            ttl (float): 有效期（秒）。
+
+        Returns:
+            object: 缓存或计算得到的对象。
+        """
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(namespace, key, value, ttl)
+        return value
+
+    def _get_bytes(self, key):
+        raise NotImplementedError
+
+    def _set_bytes(self, key, data, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+class NullBackend(CacheBackend):
+    """不缓存任何内容（CACHE_BACKEND=none）。"""
+
+    def _get_bytes(self, key):
+        return None
+
+    def _set_bytes(self, key, data, ttl):
+        pass
+
+    def _delete(self, key):
+        pass
+
+class LocalFileBackend(CacheBackend):
+    """
+    本地文件系统缓存：每个键一个文件，文件头为 8 字节的过期时间戳（0 表示不过期）。
+
+    读取命中时更新文件修改时间，超出字节预算时按修改时间淘汰最久未使用的文件；
+    多个副本挂载同一目录（例如共享卷）时可以共享结果。
+    """
+
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, directory, max_bytes=None, namespace_ttls=None):
+        super().__init__(max_bytes, namespace_ttls)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key):
+        namespace, digest = key.split(":", 1)
+        return os.path.join(self.directory, namespace, digest[:2], digest)
+
+    def _scan(self):
+        """列出全部缓存文件：(路径, 大小, 修改时间)。"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _get_bytes(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        expires_at = self._HEADER.unpack_from(data)[0]
+        if expires_at and expires_at < time.time():
+            self._delete(key)
+            return None
+        os.utime(path)
+        return data[self._HEADER.size:]
+
+    def _set_bytes(self, key, data, ttl):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(self._HEADER.pack(time.time() + ttl if ttl else 0.0))
+            f.write(data)
+        # 先写临时文件再改名，其他进程不会读到写了一半的文件
+        os.replace(temp_path, path)
+        with self._lock:
+            self._bytes += len(data) + self._HEADER.size
+            over_budget = self.max_bytes is not None and self._bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """按修改时间淘汰最旧的文件，直到总大小降到预算的 90% 以下，同时清理已过期的文件。"""
+        with self._lock:
+            entries = sorted(self._scan(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            now = time.time()
+            for path, size, _ in entries:
+                try:
+                    with open(path, "rb") as f:
+                        expires_at = self._HEADER.unpack(f.read(self._HEADER.size))[0]
+                    if total <= target and not (expires_at and expires_at < now):
+                        continue
+                    os.remove(path)
+                    total -= size
+                except (OSError, struct.error):
+                    continue
+            self._bytes = total
+
+class RedisBackend(CacheBackend):
+    """
+    Redis 协议（RESP）缓存，使用标准库 socket 实现的最小客户端，每个线程一个连接。
+
+    有效期由 Redis 的 PX 选项实现；字节预算通过命名空间下的有序集合（最近访问时间）
+    与大小哈希表实现近似 LRU 淘汰，多个副本并发写入时预算为近似值。
+    """
+
+    def __init__(self, url, max_bytes=None, namespace_ttls=None, prefix="slt", timeout=2.0):
+        super().__init__(max_bytes, namespace_ttls)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.strip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+        # 连接失败后的一段时间内直接按未命中处理，避免每次访问都等待连接超时
+        self._down_until = 0.0
+        self._index_key = f"{prefix}:__lru__"
+        self._sizes_key = f"{prefix}:__sizes__"
+        self._total_key = f"{prefix}:__bytes__"
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if time.time() < self._down_until:
+                raise ConnectionError("Redis 暂不可用")
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except OSError:
+                self._down_until = time.time() + 30
+                raise
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._execute([("AUTH", self.password)])
+            if self.db:
+                self._execute([("SELECT", self.db)])
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    @staticmethod
+    def _pack(command):
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    @classmethod
+    def _read_reply(cls, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis 连接已关闭")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise ConnectionError(rest.decode("utf-8", errors="replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [cls._read_reply(reader) for _ in range(count)]
+        raise ConnectionError(f"无法解析的 Redis 响应: {line!r}")
+
+    def _execute(self, commands):
+        """
+        以流水线方式发送多条命令，一次网络往返读取全部响应。
+
+        Args:
+            commands (list): 命令元组列表，例如 [("GET", key), ("ZADD", index, score, key)]。
+
+        Returns:
+            list: 与命令一一对应的响应。
+        """
+        sock, reader = self._connection()
+        try:
+            sock.sendall(b"".join(self._pack(command) for command in commands))
+            return [self._read_reply(reader) for _ in commands]
+        except OSError:
+            # 连接异常后丢弃该连接，下次调用时重新连接
+            self._close()
+            raise
+
+    def _full_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _get_bytes(self, key):
+        full_key = self._full_key(key)
+        data, _ = self._execute([("GET", full_key), ("ZADD", self._index_key, "XX", time.time(), full_key)])
+        return data
+
+    def _set_bytes(self, key, data, ttl):
+        full_key = self._full_key(key)
+        set_command = ("SET", full_key, data, "PX", int(ttl * 1000)) if ttl else ("SET", full_key, data)
+        old_size = self._execute([("HGET", self._sizes_key, full_key)])[0]
+        delta = len(data) - (int(old_size) if old_size else 0)
+        replies = self._execute([
+            set_command,
+            ("ZADD", self._index_key, time.time(), full_key),
+            ("HSET", self._sizes_key, full_key, len(data)),
+            ("INCRBY", self._total_key, delta),
+        ])
+        if self.max_bytes is not None and replies[-1] > self.max_bytes:
+            self._evict(replies[-1])
+
+    def _delete(self, key):
+        full_key = self._full_key(key)
+        size = self._execute([("HGET", self._sizes_key, full_key)])[0]
+        self._execute([
+            ("DEL", full_key),
+            ("ZREM", self._index_key, full_key),
+            ("HDEL", self._sizes_key, full_key),
+            ("DECRBY", self._total_key, int(size) if size else 0),
+        ])
+
+    def _evict(self, total, batch=16):
+        """按最近访问时间淘汰最旧的键（已过期的键也在索引中，一并清理），直到低于预算的 90%。"""
+        target = self.max_bytes * 0.9
+        while total > target:
+            keys = self._execute([("ZRANGE", self._index_key, 0, batch - 1)])[0]
+            if not keys:
+                break
+            sizes = self._execute([("HMGET", self._sizes_key, *keys)])[0]
+            # 只淘汰降到目标以下所需的最旧的若干个键
+            victims, freed = [], 0
+            for key, size in zip(keys, sizes):
+                victims.append(key)
+                freed += int(size) if size else 0
+                if total - freed <= target:
+                    break
+            total = self._execute([
+                ("ZREM", self._index_key, *victims),
+                ("DEL", *victims),
+                ("HDEL", self._sizes_key, *victims),
+                ("DECRBY", self._total_key, freed),
+            ])[-1]
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_cache():
+    """
+    返回按 config 创建的共享缓存后端（每个进程一个实例）。
+
+    Returns:
+        CacheBackend: LocalFileBackend、RedisBackend 或 NullBackend。
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind, location, max_bytes = get_cache_settings()
+            if kind == "redis":
+                _backend = RedisBackend(location, max_bytes)
+            elif kind == "local":
+                _backend = LocalFileBackend(location, max_bytes)
+            else:
+                _backend = NullBackend()
+        return _backend
@@ -1,27 +1,81 @@
 # chart_generator.py
 
+import numpy as np
+import plotly
 import plotly.graph_objects as go
 from utils.data_processor import filter_by_analysis_period, calculate_monthly_averages, calculate_daily_averages
+from utils.template_base import color_scale
 
-def generate_bar_chart(data, title, x_label, y_label, color_values):
+# 柱子颜色按数值量化的级数：数值映射为 0–255 的色阶等级，由 colorscale 在浏览器端插值为颜色
+COLOR_LEVELS = 256
+
+# plotly 6 起 NumPy 数组以 base64 类型数组（typed array）序列化；更早的版本转为 JSON 列表
+TYPED_ARRAYS = int(plotly.__version__.split(".")[0]) >= 6
+
+# 数值在图表中保留的小数位数（悬停提示的显示精度）
+VALUE_DECIMALS = 2
+
+def color_levels(values):
     """
-    生成柱状图。
+    将数值线性量化为色阶等级（最小值为 0，最大值为 COLOR_LEVELS - 1）。
 
     Args:
-        data (list): 要可视化的数据值列表。
+        values (numpy.ndarray): 数据值数组。
+
+    Returns:
+        numpy.ndarray: uint8 色阶等级。
+    """
+    low, high = np.min(values), np.max(values)
+    if high == low:
+        return np.full(len(values), COLOR_LEVELS // 2, dtype=np.uint8)  # 防止除以零
+    return ((values - low) / (high - low) * (COLOR_LEVELS - 1)).astype(np.uint8)
+
+def encode_array(values, dtype):
+    """
+    按当前 plotly 版本选择数值数组的编码：支持时保留为紧凑的 NumPy 类型数组（base64 序列化），否则转为列表。
+
+    Args:
+        values (numpy.ndarray): 数值数组。
+        dtype: 类型数组使用的数据类型（例如 numpy.float32、numpy.uint8）。
+
+    Returns:
+        numpy.ndarray | list: 编码后的数组。
+    """
+    if TYPED_ARRAYS:
+        return np.asarray(values, dtype=dtype)
+    return np.asarray(values).tolist()
+
+def generate_bar_chart(data, title, x_label, y_label, color_scheme):
+    """
+    生成柱状图，柱子颜色由数值经 colorscale 映射（不再逐柱生成 RGB 字符串）。
+
+    Args:
+        data (array-like): 要可视化的数据值。
         title (str): 图表标题。
         x_label (str): x轴标签。
         y_label (str): y轴标签。
-        color_values (list): 每个柱的颜色列表。
+        color_scheme (ColorContext | int): 配色对象（也可以是色卡编号），颜色按数据的最小值到最大值线性映射。
 
     Returns:
         plotly.graph_objects.Figure: 生成的柱状图。
     """
-    fig = go.Figure(data=[go.Bar(x=list(range(len(data))), y=data, marker_color=color_values)])
+    values = np.round(np.asarray(data, dtype=np.float64), VALUE_DECIMALS)
+    # x 轴省略时 plotly 默认使用 0, 1, 2, ... 的下标，无需传输
+    fig = go.Figure(data=[go.Bar(
+        y=encode_array(values, np.float32),
+        marker=dict(
+            color=encode_array(color_levels(values), np.uint8),
+            colorscale=color_scale(color_scheme),
+            cmin=0,
+            cmax=COLOR_LEVELS - 1,
+        ),
+    )])
     fig.update_layout(
         title=title,
         xaxis_title=x_label,
-        yaxis_title=y_label
+        yaxis_title=y_label,
+        # float32 传输的数值在悬停提示中按 6 位有效数字显示，避免出现 12.340000152 这样的尾数
+        yaxis_hoverformat=".6~g"
     )
     return fig
 
@@ -32,7 +86,7 @@ def generate_wind_rose(wind_directions, wind_speeds, analysis_period, legend_par
     Args:
         wind_directions (TimeSeries): 风向数据。
         wind_speeds (TimeSeries): 风速数据。
-        analysis_period (AnalysisPeriod): 分析周期。
+        analysis_period (AnalysisPeriod): 分析周期，为 None 时直接使用传入的全部数据。
         legend_parameters (LegendParameters): 图例参数。
         title (str): 图表标题。
 
@@ -42,8 +96,11 @@ def generate_wind_rose(wind_directions, wind_speeds, analysis_period, legend_par
     from ladybug.windrose import WindRose
     from ladybug_charts import to_figure
 
-    wind_directions_filtered = filter_by_analysis_period(wind_directions, analysis_period)
-    wind_speeds_filtered = filter_by_analysis_period(wind_speeds, analysis_period)
+    if analysis_period is None:
+        wind_directions_filtered, wind_speeds_filtered = wind_directions, wind_speeds
+    else:
+        wind_directions_filtered = filter_by_analysis_period(wind_directions, analysis_period)
+        wind_speeds_filtered = filter_by_analysis_period(wind_speeds, analysis_period)
 
     wind_rose = WindRose(wind_directions_filtered, wind_speeds_filtered)
     wind_rose.legend_parameters = legend_parameters
@@ -53,4 +110,58 @@ def generate_wind_rose(wind_directions, wind_speeds, analysis_period, legend_par
     # 添加标题
     figure.update_layout(title=title)
 
-    return figure
\ No newline at end of file
+    return figure
+
+
+def generate_line_chart(series, title, x_label, y_label, x_values=None):
+    """
+    生成多条折线叠加的对比图（例如多站点的月均值）。
+
+    Args:
+        series (dict): 折线名称到数据值列表的映射。
+        title (str): 图表标题。
+        x_label (str): x轴标签。
+        y_label (str): y轴标签。
+        x_values (list): x轴取值，默认为数据下标。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的折线图。
+    """
+    fig = go.Figure(data=[
+        go.Scatter(x=x_values if x_values is not None else list(range(len(values))), y=values, mode="lines", name=name)
+        for name, values in series.items()
+    ])
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title=y_label
+    )
+    return fig
+
+def generate_grouped_bar_chart(categories, series, title, x_label, y_label, orientation="v"):
+    """
+    生成分组柱状图，每个系列（例如每个站点）一组颜色。
+
+    Args:
+        categories (list): 类别名称列表。
+        series (dict): 系列名称到与类别对应的数据值列表的映射。
+        title (str): 图表标题。
+        x_label (str): x轴标签。
+        y_label (str): y轴标签。
+        orientation (str): "v" 为竖向柱，"h" 为横向柱。
+
+    Returns:
+        plotly.graph_objects.Figure: 生成的分组柱状图。
+    """
+    if orientation == "h":
+        bars = [go.Bar(x=values, y=categories, name=name, orientation="h") for name, values in series.items()]
+    else:
+        bars = [go.Bar(x=categories, y=values, name=name) for name, values in series.items()]
+    fig = go.Figure(data=bars)
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        barmode="group"
+    )
+    return fig
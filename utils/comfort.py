@@ -0,0 +1,543 @@
+# comfort.py
+
+import threading
+import numpy as np
+from cachetools import LRUCache
+from utils.data_processor import aggregate_by_day
+from utils.metrics import instrument
+
+# 舒适模型
+UTCI = "utci"
+PMV = "pmv"
+ADAPTIVE = "adaptive"
+
+# UTCI “无热应力”区间（°C），低于下限为冷应力，高于上限为热应力
+UTCI_COMFORT_RANGE = (9.0, 26.0)
+# UTCI 多项式适用的风速范围（m/s，10 m 高度），与 ladybug-comfort 一致地截断
+UTCI_WIND_RANGE = (0.5, 17.0)
+
+# PMV 舒适区间（ISO 7730 B 类 / ASHRAE-55，|PMV| ≤ 0.5，对应 PPD ≤ 10%）
+PMV_COMFORT_RANGE = (-0.5, 0.5)
+DEFAULT_MET = 1.1
+DEFAULT_CLO = 0.7
+# Fanger 方程适用于静止空气，风速高于 0.1 m/s 时 ladybug-comfort 改用 SET 修正，这里固定为静止空气
+STILL_AIR_SPEED = 0.1
+# 服装表面温度迭代的收敛阈值与最大次数（与 ladybug-comfort 一致）
+PMV_TOLERANCE = 0.00015
+PMV_MAX_ITERATIONS = 150
+
+# ASHRAE-55 适应性模型：80% 可接受范围（±°C）与主导室外温度的适用范围（°C）
+ADAPTIVE_OFFSET = 3.5
+ADAPTIVE_PREVAILING_RANGE = (10.0, 33.5)
+# 主导室外温度按逐日均温的指数加权滑动平均计算（Nicol & McCartney，α = 0.8）
+PREVAILING_ALPHA = 0.8
+# 滑动平均回溯的天数（0.8^30 ≈ 0.001，更早的日子可以忽略），年初从年末回绕
+PREVAILING_DAYS = 30
+
+# 舒适状态：偏冷、舒适、偏热；指标缺测（非有限值）的数据点为 MISSING，不计入占比
+COLD, COMFORT, HOT = -1, 0, 1
+MISSING = 2
+
+# 各模型需要的 EPW 字段，任一字段整列缺测时该模型不可用
+MODEL_FIELDS = {
+    UTCI: ("dry_bulb_temperature", "relative_humidity", "wind_speed"),
+    PMV: ("dry_bulb_temperature", "relative_humidity"),
+    ADAPTIVE: ("dry_bulb_temperature",),
+}
+
+_comfort_cache = LRUCache(maxsize=256)
+_cache_lock = threading.Lock()
+
+def saturated_vapor_pressure_hpa(t_drybulb):
+    """
+    向量化计算饱和水蒸气压（UTCI 模型专用的 Hardy 公式）。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+
+    Returns:
+        numpy.ndarray: 饱和水蒸气压（hPa）。
+    """
+    g = (-2836.5744, -6028.076559, 19.54263612, -0.02737830188, 0.000016261698,
+         7.0229056e-10, -1.8680009e-13)
+    tk = np.asarray(t_drybulb, dtype=np.float64) + 273.15
+    es = 2.7150305 * np.log(tk)
+    for i, x in enumerate(g):
+        es = es + x * tk ** (i - 2)
+    return np.exp(es) * 0.01
+
+def _utci_polynomial(ta, d_tr, vel, pa_pr):
+    """
+    UTCI 六阶多项式近似（移植自 UTCI_approx Fortran 程序 a 0.002 版，与 ladybug-comfort 的系数相同）。
+
+    只包含加、乘与乘方运算，传入数组即可整列求值。
+
+    Args:
+        ta (numpy.ndarray): 空气温度（°C）。
+        d_tr (numpy.ndarray): 平均辐射温度与空气温度之差（°C）。
+        vel (numpy.ndarray): 10 m 高度风速（m/s）。
+        pa_pr (numpy.ndarray): 水蒸气分压（kPa）。
+
+    Returns:
+        numpy.ndarray: UTCI（°C）。
+    """
+    # 预先计算各变量的乘方，供多项式各项复用
+    ta2 = ta ** 2
+    ta3 = ta ** 3
+    ta4 = ta ** 4
+    ta5 = ta ** 5
+    ta6 = ta ** 6
+    vel2 = vel ** 2
+    vel3 = vel ** 3
+    vel4 = vel ** 4
+    vel5 = vel ** 5
+    vel6 = vel ** 6
+    d_tr2 = d_tr ** 2
+    d_tr3 = d_tr ** 3
+    d_tr4 = d_tr ** 4
+    d_tr5 = d_tr ** 5
+    d_tr6 = d_tr ** 6
+    pa_pr2 = pa_pr ** 2
+    pa_pr3 = pa_pr ** 3
+    pa_pr4 = pa_pr ** 4
+    pa_pr5 = pa_pr ** 5
+    pa_pr6 = pa_pr ** 6
+
+    # UTCI 多项式近似
+    utci_approx = ta + \
+        0.607562052 + \
+        -0.0227712343 * ta + \
+        8.06470249e-4 * ta2 + \
+        -1.54271372e-4 * ta3 + \
+        -3.24651735e-6 * ta4 + \
+        7.32602852e-8 * ta5 + \
+        1.35959073e-9 * ta6 + \
+        -2.25836520 * vel + \
+        0.0880326035 * ta * vel + \
+        0.00216844454 * ta2 * vel + \
+        -1.53347087e-5 * ta3 * vel + \
+        -5.72983704e-7 * ta4 * vel + \
+        -2.55090145e-9 * ta5 * vel + \
+        -0.751269505 * vel2 + \
+        -0.00408350271 * ta * vel2 + \
+        -5.21670675e-5 * ta2 * vel2 + \
+        1.94544667e-6 * ta3 * vel2 + \
+        1.14099531e-8 * ta4 * vel2 + \
+        0.158137256 * vel3 + \
+        -6.57263143e-5 * ta * vel3 + \
+        2.22697524e-7 * ta2 * vel3 + \
+        -4.16117031e-8 * ta3 * vel3 + \
+        -0.0127762753 * vel4 + \
+        9.66891875e-6 * ta * vel4 + \
+        2.52785852e-9 * ta2 * vel4 + \
+        4.56306672e-4 * vel5 + \
+        -1.74202546e-7 * ta * vel5 + \
+        -5.91491269e-6 * vel6 + \
+        0.398374029 * d_tr + \
+        1.83945314e-4 * ta * d_tr + \
+        -1.73754510e-4 * ta2 * d_tr + \
+        -7.60781159e-7 * ta3 * d_tr + \
+        3.77830287e-8 * ta4 * d_tr + \
+        5.43079673e-10 * ta5 * d_tr + \
+        -0.0200518269 * vel * d_tr + \
+        8.92859837e-4 * ta * vel * d_tr + \
+        3.45433048e-6 * ta2 * vel * d_tr + \
+        -3.77925774e-7 * ta3 * vel * d_tr + \
+        -1.69699377e-9 * ta4 * vel * d_tr + \
+        1.69992415e-4 * vel2 * d_tr + \
+        -4.99204314e-5 * ta * vel2 * d_tr + \
+        2.47417178e-7 * ta2 * vel2 * d_tr + \
+        1.07596466e-8 * ta3 * vel2 * d_tr + \
+        8.49242932e-5 * vel3 * d_tr + \
+        1.35191328e-6 * ta * vel3 * d_tr + \
+        -6.21531254e-9 * ta2 * vel3 * d_tr + \
+        -4.99410301e-6 * vel4 * d_tr + \
+        -1.89489258e-8 * ta * vel4 * d_tr + \
+        8.15300114e-8 * vel5 * d_tr + \
+        7.55043090e-4 * d_tr2 + \
+        -5.65095215e-5 * ta * d_tr2 + \
+        -4.52166564e-7 * ta2 * d_tr2 + \
+        2.46688878e-8 * ta3 * d_tr2 + \
+        2.42674348e-10 * ta4 * d_tr2 + \
+        1.54547250e-4 * vel * d_tr2 + \
+        5.24110970e-6 * ta * vel * d_tr2 + \
+        -8.75874982e-8 * ta2 * vel * d_tr2 + \
+        -1.50743064e-9 * ta3 * vel * d_tr2 + \
+        -1.56236307e-5 * vel2 * d_tr2 + \
+        -1.33895614e-7 * ta * vel2 * d_tr2 + \
+        2.49709824e-9 * ta2 * vel2 * d_tr2 + \
+        6.51711721e-7 * vel3 * d_tr2 + \
+        1.94960053e-9 * ta * vel3 * d_tr2 + \
+        -1.00361113e-8 * vel4 * d_tr2 + \
+        -1.21206673e-5 * d_tr3 + \
+        -2.18203660e-7 * ta * d_tr3 + \
+        7.51269482e-9 * ta2 * d_tr3 + \
+        9.79063848e-11 * ta3 * d_tr3 + \
+        1.25006734e-6 * vel * d_tr3 + \
+        -1.81584736e-9 * ta * vel * d_tr3 + \
+        -3.52197671e-10 * ta2 * vel * d_tr3 + \
+        -3.36514630e-8 * vel2 * d_tr3 + \
+        1.35908359e-10 * ta * vel2 * d_tr3 + \
+        4.17032620e-10 * vel3 * d_tr3 + \
+        -1.30369025e-9 * d_tr4 + \
+        4.13908461e-10 * ta * d_tr4 + \
+        9.22652254e-12 * ta2 * d_tr4 + \
+        -5.08220384e-9 * vel * d_tr4 + \
+        -2.24730961e-11 * ta * vel * d_tr4 + \
+        1.17139133e-10 * vel2 * d_tr4 + \
+        6.62154879e-10 * d_tr5 + \
+        4.03863260e-13 * ta * d_tr5 + \
+        1.95087203e-12 * vel * d_tr5 + \
+        -4.73602469e-12 * d_tr6 + \
+        5.12733497 * pa_pr + \
+        -0.312788561 * ta * pa_pr + \
+        -0.0196701861 * ta2 * pa_pr + \
+        9.99690870e-4 * ta3 * pa_pr + \
+        9.51738512e-6 * ta4 * pa_pr + \
+        -4.66426341e-7 * ta5 * pa_pr + \
+        0.548050612 * vel * pa_pr + \
+        -0.00330552823 * ta * vel * pa_pr + \
+        -0.00164119440 * ta2 * vel * pa_pr + \
+        -5.16670694e-6 * ta3 * vel * pa_pr + \
+        9.52692432e-7 * ta4 * vel * pa_pr + \
+        -0.0429223622 * vel2 * pa_pr + \
+        0.00500845667 * ta * vel2 * pa_pr + \
+        1.00601257e-6 * ta2 * vel2 * pa_pr + \
+        -1.81748644e-6 * ta3 * vel2 * pa_pr + \
+        -1.25813502e-3 * vel3 * pa_pr + \
+        -1.79330391e-4 * ta * vel3 * pa_pr + \
+        2.34994441e-6 * ta2 * vel3 * pa_pr + \
+        1.29735808e-4 * vel4 * pa_pr + \
+        1.29064870e-6 * ta * vel4 * pa_pr + \
+        -2.28558686e-6 * vel5 * pa_pr + \
+        -0.0369476348 * d_tr * pa_pr + \
+        0.00162325322 * ta * d_tr * pa_pr + \
+        -3.14279680e-5 * ta2 * d_tr * pa_pr + \
+        2.59835559e-6 * ta3 * d_tr * pa_pr + \
+        -4.77136523e-8 * ta4 * d_tr * pa_pr + \
+        8.64203390e-3 * vel * d_tr * pa_pr + \
+        -6.87405181e-4 * ta * vel * d_tr * pa_pr + \
+        -9.13863872e-6 * ta2 * vel * d_tr * pa_pr + \
+        5.15916806e-7 * ta3 * vel * d_tr * pa_pr + \
+        -3.59217476e-5 * vel2 * d_tr * pa_pr + \
+        3.28696511e-5 * ta * vel2 * d_tr * pa_pr + \
+        -7.10542454e-7 * ta2 * vel2 * d_tr * pa_pr + \
+        -1.24382300e-5 * vel3 * d_tr * pa_pr + \
+        -7.38584400e-9 * ta * vel3 * d_tr * pa_pr + \
+        2.20609296e-7 * vel4 * d_tr * pa_pr + \
+        -7.32469180e-4 * d_tr2 * pa_pr + \
+        -1.87381964e-5 * ta * d_tr2 * pa_pr + \
+        4.80925239e-6 * ta2 * d_tr2 * pa_pr + \
+        -8.75492040e-8 * ta3 * d_tr2 * pa_pr + \
+        2.77862930e-5 * vel * d_tr2 * pa_pr + \
+        -5.06004592e-6 * ta * vel * d_tr2 * pa_pr + \
+        1.14325367e-7 * ta2 * vel * d_tr2 * pa_pr + \
+        2.53016723e-6 * vel2 * d_tr2 * pa_pr + \
+        -1.72857035e-8 * ta * vel2 * d_tr2 * pa_pr + \
+        -3.95079398e-8 * vel3 * d_tr2 * pa_pr + \
+        -3.59413173e-7 * d_tr3 * pa_pr + \
+        7.04388046e-7 * ta * d_tr3 * pa_pr + \
+        -1.89309167e-8 * ta2 * d_tr3 * pa_pr + \
+        -4.79768731e-7 * vel * d_tr3 * pa_pr + \
+        7.96079978e-9 * ta * vel * d_tr3 * pa_pr + \
+        1.62897058e-9 * vel2 * d_tr3 * pa_pr + \
+        3.94367674e-8 * d_tr4 * pa_pr + \
+        -1.18566247e-9 * ta * d_tr4 * pa_pr + \
+        3.34678041e-10 * vel * d_tr4 * pa_pr + \
+        -1.15606447e-10 * d_tr5 * pa_pr + \
+        -2.80626406 * pa_pr2 + \
+        0.548712484 * ta * pa_pr2 + \
+        -0.00399428410 * ta2 * pa_pr2 + \
+        -9.54009191e-4 * ta3 * pa_pr2 + \
+        1.93090978e-5 * ta4 * pa_pr2 + \
+        -0.308806365 * vel * pa_pr2 + \
+        0.0116952364 * ta * vel * pa_pr2 + \
+        4.95271903e-4 * ta2 * vel * pa_pr2 + \
+        -1.90710882e-5 * ta3 * vel * pa_pr2 + \
+        0.00210787756 * vel2 * pa_pr2 + \
+        -6.98445738e-4 * ta * vel2 * pa_pr2 + \
+        2.30109073e-5 * ta2 * vel2 * pa_pr2 + \
+        4.17856590e-4 * vel3 * pa_pr2 + \
+        -1.27043871e-5 * ta * vel3 * pa_pr2 + \
+        -3.04620472e-6 * vel4 * pa_pr2 + \
+        0.0514507424 * d_tr * pa_pr2 + \
+        -0.00432510997 * ta * d_tr * pa_pr2 + \
+        8.99281156e-5 * ta2 * d_tr * pa_pr2 + \
+        -7.14663943e-7 * ta3 * d_tr * pa_pr2 + \
+        -2.66016305e-4 * vel * d_tr * pa_pr2 + \
+        2.63789586e-4 * ta * vel * d_tr * pa_pr2 + \
+        -7.01199003e-6 * ta2 * vel * d_tr * pa_pr2 + \
+        -1.06823306e-4 * vel2 * d_tr * pa_pr2 + \
+        3.61341136e-6 * ta * vel2 * d_tr * pa_pr2 + \
+        2.29748967e-7 * vel3 * d_tr * pa_pr2 + \
+        3.04788893e-4 * d_tr2 * pa_pr2 + \
+        -6.42070836e-5 * ta * d_tr2 * pa_pr2 + \
+        1.16257971e-6 * ta2 * d_tr2 * pa_pr2 + \
+        7.68023384e-6 * vel * d_tr2 * pa_pr2 + \
+        -5.47446896e-7 * ta * vel * d_tr2 * pa_pr2 + \
+        -3.59937910e-8 * vel2 * d_tr2 * pa_pr2 + \
+        -4.36497725e-6 * d_tr3 * pa_pr2 + \
+        1.68737969e-7 * ta * d_tr3 * pa_pr2 + \
+        2.67489271e-8 * vel * d_tr3 * pa_pr2 + \
+        3.23926897e-9 * d_tr4 * pa_pr2 + \
+        -0.0353874123 * pa_pr3 + \
+        -0.221201190 * ta * pa_pr3 + \
+        0.0155126038 * ta2 * pa_pr3 + \
+        -2.63917279e-4 * ta3 * pa_pr3 + \
+        0.0453433455 * vel * pa_pr3 + \
+        -0.00432943862 * ta * vel * pa_pr3 + \
+        1.45389826e-4 * ta2 * vel * pa_pr3 + \
+        2.17508610e-4 * vel2 * pa_pr3 + \
+        -6.66724702e-5 * ta * vel2 * pa_pr3 + \
+        3.33217140e-5 * vel3 * pa_pr3 + \
+        -0.00226921615 * d_tr * pa_pr3 + \
+        3.80261982e-4 * ta * d_tr * pa_pr3 + \
+        -5.45314314e-9 * ta2 * d_tr * pa_pr3 + \
+        -7.96355448e-4 * vel * d_tr * pa_pr3 + \
+        2.53458034e-5 * ta * vel * d_tr * pa_pr3 + \
+        -6.31223658e-6 * vel2 * d_tr * pa_pr3 + \
+        3.02122035e-4 * d_tr2 * pa_pr3 + \
+        -4.77403547e-6 * ta * d_tr2 * pa_pr3 + \
+        1.73825715e-6 * vel * d_tr2 * pa_pr3 + \
+        -4.09087898e-7 * d_tr3 * pa_pr3 + \
+        0.614155345 * pa_pr4 + \
+        -0.0616755931 * ta * pa_pr4 + \
+        0.00133374846 * ta2 * pa_pr4 + \
+        0.00355375387 * vel * pa_pr4 + \
+        -5.13027851e-4 * ta * vel * pa_pr4 + \
+        1.02449757e-4 * vel2 * pa_pr4 + \
+        -0.00148526421 * d_tr * pa_pr4 + \
+        -4.11469183e-5 * ta * d_tr * pa_pr4 + \
+        -6.80434415e-6 * vel * d_tr * pa_pr4 + \
+        -9.77675906e-6 * d_tr2 * pa_pr4 + \
+        0.0882773108 * pa_pr5 + \
+        -0.00301859306 * ta * pa_pr5 + \
+        0.00104452989 * vel * pa_pr5 + \
+        2.47090539e-4 * d_tr * pa_pr5 + \
+        0.00148348065 * pa_pr6
+
+    return utci_approx
+
+def calculate_utci(t_air, t_radiant, wind_speed, rh):
+    """
+    向量化计算通用热气候指数 UTCI（六阶多项式近似，Bröde et al. 2009）。
+
+    Args:
+        t_air (numpy.ndarray): 空气温度（°C）。
+        t_radiant (numpy.ndarray): 平均辐射温度（°C）。
+        wind_speed (numpy.ndarray): 10 m 高度风速（m/s）。
+        rh (numpy.ndarray): 相对湿度（%）。
+
+    Returns:
+        numpy.ndarray: UTCI（°C）。
+    """
+    t_air = np.asarray(t_air, dtype=np.float64)
+    vel = np.clip(np.asarray(wind_speed, dtype=np.float64), *UTCI_WIND_RANGE)
+    pa_pr = saturated_vapor_pressure_hpa(t_air) * (np.asarray(rh, dtype=np.float64) / 100.0) / 10.0
+    d_tr = np.asarray(t_radiant, dtype=np.float64) - t_air
+    return _utci_polynomial(t_air, d_tr, vel, pa_pr)
+
+def ppd_from_pmv(pmv):
+    """
+    由 PMV 计算预计不满意者百分数 PPD。
+
+    Args:
+        pmv (numpy.ndarray): 预计平均热感觉指数。
+
+    Returns:
+        numpy.ndarray: PPD（%）。
+    """
+    return 100.0 - 95.0 * np.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
+
+def calculate_pmv(t_air, t_radiant, air_speed, rh, met=DEFAULT_MET, clo=DEFAULT_CLO, wme=0.0):
+    """
+    向量化计算 Fanger PMV/PPD（ISO 7730）。
+
+    服装表面温度的不动点迭代对整列数据同时进行，已收敛的数据点不再更新，
+    结果与 ladybug-comfort 的 fanger_pmv 逐时计算一致。
+
+    Args:
+        t_air (numpy.ndarray): 空气温度（°C）。
+        t_radiant (numpy.ndarray): 平均辐射温度（°C）。
+        air_speed (float | numpy.ndarray): 相对风速（m/s）。
+        rh (numpy.ndarray): 相对湿度（%）。
+        met (float): 代谢率（met）。
+        clo (float): 服装热阻（clo）。
+        wme (float): 对外做功（met），静坐时为 0。
+
+    Returns:
+        tuple: (PMV 数组, PPD 数组)。
+    """
+    ta = np.asarray(t_air, dtype=np.float64)
+    tr = np.asarray(t_radiant, dtype=np.float64)
+    rh = np.asarray(rh, dtype=np.float64)
+    pa = rh * 10.0 * np.exp(16.6536 - 4030.183 / (ta + 235.0))
+
+    icl = 0.155 * clo  # 服装热阻（m²K/W）
+    m = met * 58.15  # 代谢率（W/m²）
+    w = wme * 58.15  # 对外做功（W/m²）
+    mw = m - w  # 人体内部产热
+    fcl = 1 + 1.29 * icl if icl <= 0.078 else 1.05 + 0.645 * icl
+
+    # 强迫对流换热系数
+    hcf = np.broadcast_to(12.1 * np.sqrt(air_speed), ta.shape)
+    taa = ta + 273.0
+    tra = tr + 273.0
+    tcla = taa + (35.5 - ta) / (3.5 * icl + 0.1)
+
+    p1 = icl * fcl
+    p2 = p1 * 3.96
+    p3 = p1 * 100.0
+    p4 = p1 * taa
+    p5 = 308.7 - 0.028 * mw + p2 * (tra / 100.0) ** 4
+    xn = tcla / 100.0
+    xf = tcla / 50.0
+    hc = hcf.copy()
+
+    for _ in range(PMV_MAX_ITERATIONS):
+        active = np.abs(xn - xf) > PMV_TOLERANCE
+        if not active.any():
+            break
+        xf = np.where(active, (xf + xn) / 2.0, xf)
+        hc = np.where(active, np.maximum(hcf, 2.38 * np.abs(100.0 * xf - taa) ** 0.25), hc)
+        xn = np.where(active, (p5 + p4 * hc - p2 * xf ** 4) / (100.0 + p3 * hc), xn)
+
+    tcl = 100.0 * xn - 273.0
+
+    hl1 = 3.05 * 0.001 * (5733.0 - 6.99 * mw - pa)  # 皮肤扩散散热
+    hl2 = 0.42 * (mw - 58.15) if mw > 58.15 else 0.0  # 出汗散热
+    hl3 = 1.7 * 0.00001 * m * (5867.0 - pa)  # 呼吸潜热
+    hl4 = 0.0014 * m * (34.0 - ta)  # 呼吸显热
+    hl5 = 3.96 * fcl * (xn ** 4 - (tra / 100.0) ** 4)  # 辐射散热
+    hl6 = fcl * hc * (tcl - ta)  # 对流散热
+
+    ts = 0.303 * np.exp(-0.036 * m) + 0.028
+    pmv = ts * (mw - hl1 - hl2 - hl3 - hl4 - hl5 - hl6)
+    return pmv, ppd_from_pmv(pmv)
+
+def prevailing_temperature(t_drybulb, day_of_year, alpha=PREVAILING_ALPHA, days=PREVAILING_DAYS):
+    """
+    计算逐行的主导室外温度：前一日起逐日均温的指数加权滑动平均（当日数据不计入）。
+
+    用卷积一次算出全年每天的加权平均，年初的回溯从年末回绕（典型气象年首尾相接）。
+
+    Args:
+        t_drybulb (numpy.ndarray): 干球温度（°C）。
+        day_of_year (numpy.ndarray): 每个数据点的年积日（1–366）。
+        alpha (float): 衰减系数（0–1）。
+        days (int): 回溯的天数。
+
+    Returns:
+        numpy.ndarray: 与输入等长的主导室外温度（°C）。
+    """
+    daily = aggregate_by_day(t_drybulb, day_of_year).to_numpy()
+    days = min(days, len(daily))
+    weights = alpha ** np.arange(days)
+    padded = np.concatenate((daily[-days:], daily))
+    running = np.convolve(padded, weights)[days - 1:days - 1 + len(daily)] / weights.sum()
+    _, day_index = np.unique(day_of_year, return_inverse=True)
+    return running[day_index]
+
+def calculate_adaptive(t_operative, t_prevail):
+    """
+    向量化计算 ASHRAE-55 适应性模型中操作温度与中性温度之差。
+
+    Args:
+        t_operative (numpy.ndarray): 操作温度（°C）。
+        t_prevail (numpy.ndarray): 主导室外温度（°C），超出模型适用范围时截断。
+
+    Returns:
+        numpy.ndarray: 操作温度减中性温度（°C），负值偏冷、正值偏热。
+    """
+    t_comf = 0.31 * np.clip(t_prevail, *ADAPTIVE_PREVAILING_RANGE) + 17.8
+    return np.asarray(t_operative, dtype=np.float64) - t_comf
+
+def comfort_states(values, low, high):
+    """
+    按舒适区间将指标划分为偏冷（-1）、舒适（0）与偏热（1），非有限值记为缺测（MISSING）。
+
+    Args:
+        values (numpy.ndarray): 舒适指标。
+        low (float): 舒适区间下限（含）。
+        high (float): 舒适区间上限（含）。
+
+    Returns:
+        numpy.ndarray: int8 状态数组。
+    """
+    states = np.where(values < low, COLD, np.where(values > high, HOT, COMFORT))
+    return np.where(np.isfinite(values), states, MISSING).astype(np.int8)
+
+def monthly_comfort_percentages(states, month):
+    """
+    统计各月偏冷、舒适、偏热的时间占比（缺测的数据点不计入）。
+
+    Args:
+        states (numpy.ndarray): comfort_states 的结果。
+        month (numpy.ndarray): 每个数据点的月份（1–12）。
+
+    Returns:
+        numpy.ndarray: (12, 3) 的百分比数组，列依次为偏冷、舒适、偏热；没有有效数据的月份为 NaN。
+    """
+    valid = states != MISSING
+    index = (np.asarray(month)[valid] - 1) * 3 + (states[valid].astype(np.int64) + 1)
+    counts = np.bincount(index, minlength=36).reshape(12, 3)
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return counts / totals * 100.0
+
+def _evaluate(arrays, model, met, clo):
+    """计算单个模型的逐行指标与舒适区间（平均辐射温度取空气温度，即遮阴条件）。"""
+    t_air = arrays.values("dry_bulb_temperature")
+    rh = arrays.values("relative_humidity")
+    if model == UTCI:
+        return calculate_utci(t_air, t_air, arrays.values("wind_speed"), rh), UTCI_COMFORT_RANGE
+    if model == PMV:
+        pmv, _ = calculate_pmv(t_air, t_air, STILL_AIR_SPEED, rh, met, clo)
+        return pmv, PMV_COMFORT_RANGE
+    if model == ADAPTIVE:
+        deg_comf = calculate_adaptive(t_air, prevailing_temperature(t_air, arrays.day_of_year))
+        return deg_comf, (-ADAPTIVE_OFFSET, ADAPTIVE_OFFSET)
+    raise ValueError(f"未知的舒适模型: {model}")
+
+@instrument()
+def calculate_comfort(arrays, model, met=DEFAULT_MET, clo=DEFAULT_CLO):
+    """
+    计算整年逐行的舒适指标、舒适状态与逐月舒适时间占比，结果按（站点, 模型, 参数）缓存。
+
+    UTCI 表示室外遮阴处的热应力；PMV 与适应性模型把室外气温与湿度当作自然通风室内的条件
+    （平均辐射温度取空气温度）。
+
+    Args:
+        arrays (EPWArrays): 数组数据。
+        model (str): UTCI、PMV 或 ADAPTIVE。
+        met (float): 代谢率（met），仅 PMV 使用。
+        clo (float): 服装热阻（clo），仅 PMV 使用。
+
+    Returns:
+        dict: "values" 为逐行指标（UTCI 为 °C，PMV 为热感觉指数，适应性模型为与中性温度之差 °C），
+        "states" 为逐行舒适状态，"monthly" 为 (12, 3) 的逐月占比，"range" 为舒适区间；
+        模型所需字段整列缺测时返回 None。
+    """
+    if not all(arrays.is_available(field) for field in MODEL_FIELDS[model]):
+        return None
+
+    params = (float(met), float(clo)) if model == PMV else ()
+    key = (arrays.cache_key, model) + params
+    if arrays.cache_key is not None:
+        with _cache_lock:
+            cached = _comfort_cache.get(key)
+        if cached is not None:
+            return cached
+
+    values, comfort_range = _evaluate(arrays, model, met, clo)
+    states = comfort_states(values, *comfort_range)
+    result = {
+        "values": values,
+        "states": states,
+        "monthly": monthly_comfort_percentages(states, arrays.month),
+        "range": comfort_range,
+    }
+    if arrays.cache_key is not None:
+        with _cache_lock:
+            _comfort_cache[key] = result
+    return result
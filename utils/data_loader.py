@@ -1,8 +1,14 @@
 # data_loader.py
+import hashlib
+import os
 import zipfile
-import tempfile
 from ladybug.epw import EPW
+from utils.download_manager import get_download_dir, write_atomic
+from utils.epw_arrays import file_digest
+from utils.metrics import instrument
+from utils.single_flight import coalesce, single_flight
 
+@instrument()
 def load_epw_file(file_path):
     """
     加载指定路径的EPW文件。
@@ -15,32 +21,48 @@ def load_epw_file(file_path):
     """
     return EPW(file_path)
 
-def unzip_and_load_epw(zip_file_path, selected_zip_file):
+@coalesce("unzip")
+def extract_epw(zip_file_path, selected_zip_file):
     """
-    解压缩ZIP文件，并加载选中的EPW文件。
+    从ZIP文件中解压选中的EPW文件（按ZIP内容摘要存放，同一站点在各会话与重跑之间路径不变，
+    已解压过时直接复用；多个会话同时解压同一文件时只解压一次）。
 
     Args:
         zip_file_path (str): ZIP文件的路径。
         selected_zip_file (str): 选中的ZIP文件名。
 
     Returns:
-        EPW: 加载的EPW对象。
+        str: 解压后的EPW文件路径。
     """
-    # 打开本地ZIP文件
-    with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
-        # 确保选中的 EPW 文件名相对于 ZIP 文件的名称
-        epw_file_name = selected_zip_file.replace('.zip', '.epw')
+    # 确保选中的 EPW 文件名相对于 ZIP 文件的名称
+    epw_file_name = selected_zip_file.replace('.zip', '.epw')
+    epw_path = os.path.join(get_download_dir("epw", file_digest(zip_file_path)[:16]), os.path.basename(epw_file_name))
+    if os.path.exists(epw_path):
+        return epw_path
 
-        # 读取选中的EPW文件数据
+    # 打开本地ZIP文件，读取选中的EPW文件数据
+    with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
         epw_data = zip_ref.read(epw_file_name)
 
-        # 保存解压后的EPW数据到临时文件
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".epw") as temp_file:
-            temp_file.write(epw_data)
-            temp_file_path = temp_file.name
-    # 加载解压后的EPW文件
-    return EPW(temp_file_path)
+    # 先写入暂存文件再原子替换，其他会话不会读到写了一半的文件
+    return write_atomic(epw_path, epw_data)
+
+@instrument()
+def unzip_and_load_epw(zip_file_path, selected_zip_file):
+    """
+    解压缩ZIP文件，并加载选中的EPW文件。
+
+    Args:
+        zip_file_path (str): ZIP文件的路径。
+        selected_zip_file (str): 选中的ZIP文件名。
+
+    Returns:
+        EPW: 加载的EPW对象。
+    """
+    # EPW 对象按需读取数据且可修改，每个会话各自创建，只共用解压得到的文件
+    return EPW(extract_epw(zip_file_path, selected_zip_file))
 
+@instrument()
 def load_uploaded_epw(uploaded_file):
     """
     加载用户上传的EPW文件。
@@ -54,10 +76,11 @@ def load_uploaded_epw(uploaded_file):
     # 读取上传的EPW文件数据
     epw_data = uploaded_file.read()
 
-    # 保存上传的EPW数据到临时文件
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".epw") as temp_file:
-        temp_file.write(epw_data)
-        temp_file_path = temp_file.name
+    # 按内容摘要保存上传的EPW数据（每次重跑路径不变，同时上传相同内容时只写一次）
+    digest = hashlib.sha1(epw_data).hexdigest()
+    temp_file_path = os.path.join(get_download_dir("uploads", digest[:16]), "upload.epw")
+    if not os.path.exists(temp_file_path):
+        single_flight("upload", digest, lambda: write_atomic(temp_file_path, epw_data))
 
     # 加载上传的EPW文件
     return EPW(temp_file_path)
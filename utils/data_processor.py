@@ -1,5 +1,6 @@
 # data_processor.py
 
+import warnings
 import pandas as pd
 import numpy as np
 from ladybug.analysisperiod import AnalysisPeriod
@@ -46,3 +47,253 @@ def calculate_daily_averages(data, datetimes):
     df = pd.DataFrame({"data": data})
     df["Day"] = pd.to_datetime(datetimes).dayofyear
     return df.groupby("Day")["data"].mean()
+
+def _aggregate_by_index(values, index, how, timestep, name):
+    """
+    按整数索引（月份或年积日）向量化聚合数据。
+
+    Args:
+        values (numpy.ndarray): 数据值数组。
+        index (numpy.ndarray): 与数据等长的整数索引数组。
+        how (str): "mean" 求均值；"sum" 求按小时积分的总量（除以时间步数）。
+        timestep (int): 每小时的时间步数。
+        name (str): 结果索引的名称。
+
+    Returns:
+        pandas.Series: 以出现过的索引值为下标的聚合结果。
+    """
+    values = np.asarray(values, dtype=np.float64)
+    index = np.asarray(index)
+    counts = np.bincount(index)
+    sums = np.bincount(index, weights=values)
+    present = np.nonzero(counts)[0]
+    if how == "sum":
+        result = sums[present] / timestep
+    else:
+        result = sums[present] / counts[present]
+    return pd.Series(result, index=pd.Index(present, name=name), name="data")
+
+def aggregate_by_month(values, months, how="mean", timestep=1):
+    """
+    按月向量化聚合数据，适用于逐时、子小时以及闰年数据。
+
+    Args:
+        values (numpy.ndarray): 数据值数组。
+        months (numpy.ndarray): 每个数据点所在的月份（1–12）。
+        how (str): "mean" 求月均值；"sum" 求月累计量（按小时积分）。
+        timestep (int): 每小时的时间步数。
+
+    Returns:
+        pandas.Series: 每月的聚合值。
+    """
+    return _aggregate_by_index(values, months, how, timestep, "Month")
+
+def aggregate_by_day(values, day_of_year, how="mean", timestep=1):
+    """
+    按日向量化聚合数据，适用于逐时、子小时以及闰年数据。
+
+    Args:
+        values (numpy.ndarray): 数据值数组。
+        day_of_year (numpy.ndarray): 每个数据点的年积日（1–366）。
+        how (str): "mean" 求日均值；"sum" 求日累计量（按小时积分）。
+        timestep (int): 每小时的时间步数。
+
+    Returns:
+        pandas.Series: 每日的聚合值。
+    """
+    return _aggregate_by_index(values, day_of_year, how, timestep, "Day")
+
+def day_hour_matrix(values, day_of_year, hour):
+    """
+    将数据重排为“日 × 时”矩阵（子小时数据按小时求均值），适用于闰年与不完整的时段。
+
+    Args:
+        values (numpy.ndarray): 数据值数组。
+        day_of_year (numpy.ndarray): 每个数据点的年积日（1–366）。
+        hour (numpy.ndarray): 每个数据点的时刻（0–23）。
+
+    Returns:
+        tuple: (出现过的年积日数组, 形状为 (天数, 24) 的矩阵)，没有数据的时刻为 NaN。
+    """
+    values = np.asarray(values, dtype=np.float64)
+    index = np.asarray(day_of_year) * 24 + np.asarray(hour)
+    counts = np.bincount(index, minlength=367 * 24).reshape(367, 24)
+    sums = np.bincount(index, weights=values, minlength=367 * 24).reshape(367, 24)
+    days = np.nonzero(counts.any(axis=1))[0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrix = sums[days] / counts[days]
+    return days, matrix
+
+def month_hour_profiles(values, month, day, hour, day_of_year, percentiles=(10, 50, 90)):
+    """
+    计算各月的典型日（“月 × 时”）统计：均值、分位数与上下包络。
+
+    先重排为“日 × 时”矩阵，再按月填入 (12, 31, 24) 的数组（缺少的日期为 NaN），
+    所有统计量沿“日”轴一次向量化计算。
+
+    Args:
+        values (numpy.ndarray): 数据值数组。
+        month (numpy.ndarray): 每个数据点的月份（1–12）。
+        day (numpy.ndarray): 每个数据点的日期（1–31）。
+        hour (numpy.ndarray): 每个数据点的时刻（0–23）。
+        day_of_year (numpy.ndarray): 每个数据点的年积日（1–366）。
+        percentiles (tuple): 需要计算的分位数（0–100）。
+
+    Returns:
+        dict: "mean"、"min"、"max" 为 (12, 24) 数组，"percentiles" 为分位数到 (12, 24) 数组的映射，
+        "days" 为 (12, 31, 24) 的逐日数组；没有数据的月份为 NaN。
+    """
+    days, matrix = day_hour_matrix(values, day_of_year, hour)
+    # 每个年积日对应的月、日（取该日第一个数据点）
+    first_row = np.full(367, -1, dtype=np.int64)
+    day_of_year = np.asarray(day_of_year)
+    first_row[day_of_year[::-1]] = np.arange(len(day_of_year))[::-1]
+    rows = first_row[days]
+
+    cube = np.full((12, 31, 24), np.nan)
+    cube[np.asarray(month)[rows] - 1, np.asarray(day)[rows] - 1] = matrix
+
+    # 整月无数据时 nan 统计会给出警告，结果保持为 NaN
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return {
+            "mean": np.nanmean(cube, axis=1),
+            "min": np.nanmin(cube, axis=1),
+            "max": np.nanmax(cube, axis=1),
+            "percentiles": dict(zip(percentiles, np.nanpercentile(cube, percentiles, axis=1))),
+            "days": cube,
+        }
+
+# EPW 各字段的缺测标记值与合理取值范围（参见 EnergyPlus Auxiliary Programs 文档）
+# 字段名: (缺测标记, 最小值, 最大值)
+EPW_FIELD_LIMITS = {
+    "dry_bulb_temperature": (99.9, -70, 70),
+    "dew_point_temperature": (99.9, -70, 70),
+    "relative_humidity": (999, 0, 110),
+    "atmospheric_station_pressure": (999999, 31000, 120000),
+    "extraterrestrial_horizontal_radiation": (9999, 0, 9998),
+    "extraterrestrial_direct_normal_radiation": (9999, 0, 9998),
+    "horizontal_infrared_radiation_intensity": (9999, 0, 9998),
+    "global_horizontal_radiation": (9999, 0, 9998),
+    "direct_normal_radiation": (9999, 0, 9998),
+    "diffuse_horizontal_radiation": (9999, 0, 9998),
+    "global_horizontal_illuminance": (999999, 0, 999900),
+    "direct_normal_illuminance": (999999, 0, 999900),
+    "diffuse_horizontal_illuminance": (999999, 0, 999900),
+    "zenith_luminance": (9999, 0, 9998),
+    "wind_direction": (999, 0, 360),
+    "wind_speed": (999, 0, 40),
+    "total_sky_cover": (99, 0, 10),
+    "opaque_sky_cover": (99, 0, 10),
+    "visibility": (9999, 0, 9998),
+    "ceiling_height": (99999, 0, 99998),
+    "precipitable_water": (999, 0, 998),
+    "aerosol_optical_depth": (999, 0, 998),
+    "snow_depth": (999, 0, 998),
+    "days_since_last_snowfall": (99, 0, 98),
+    "albedo": (999, 0, 998),
+    "liquid_precipitation_depth": (999, 0, 998),
+    "liquid_precipitation_quantity": (99, 0, 98),
+}
+
+# 线性插值填补的最长缺口（小时），更长的缺口用同月同时刻的均值填补
+MAX_INTERPOLATION_GAP_HOURS = 6
+
+def _interpolate(values, positions, valid, circular=False):
+    """在有效数据之间线性插值；风向等圆周量先展开再插值。"""
+    if circular:
+        unwrapped = np.rad2deg(np.unwrap(np.deg2rad(values[valid])))
+        return np.mod(np.interp(positions, valid, unwrapped), 360.0)
+    return np.interp(positions, valid, values[valid])
+
+def _fill_gaps(values, flagged, profile_key, max_gap_rows, circular=False):
+    """
+    填补单个字段中被标记的数据。
+
+    Args:
+        values (numpy.ndarray): 字段数值（原地修改）。
+        flagged (numpy.ndarray): 被标记为缺测或超限的布尔掩码。
+        profile_key (numpy.ndarray): 每行的（月份, 小时）编号，用于长缺口的同月同时刻均值。
+        max_gap_rows (int): 线性插值的最长缺口行数。
+        circular (bool): 是否为圆周量（风向）。
+
+    Returns:
+        tuple: (短缺口插值行数, 长缺口填补行数, 最长缺口行数)
+    """
+    padded = np.concatenate(([0], flagged.astype(np.int8), [0]))
+    edges = np.diff(padded)
+    lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    positions = np.flatnonzero(flagged)
+    run_lengths = np.repeat(lengths, lengths)
+    short = positions[run_lengths <= max_gap_rows]
+    long = positions[run_lengths > max_gap_rows]
+    valid = np.flatnonzero(~flagged)
+
+    values[short] = _interpolate(values, short, valid, circular)
+    if len(long):
+        if circular:
+            values[long] = _interpolate(values, long, valid, circular)
+        else:
+            counts = np.bincount(profile_key[valid], minlength=12 * 24)
+            sums = np.bincount(profile_key[valid], weights=values[valid], minlength=12 * 24)
+            keys = profile_key[long]
+            has_profile = counts[keys] > 0
+            values[long[has_profile]] = sums[keys[has_profile]] / counts[keys[has_profile]]
+            # 该月该时刻完全没有有效数据时退回线性插值
+            values[long[~has_profile]] = _interpolate(values, long[~has_profile], valid)
+    return len(short), len(long), int(lengths.max())
+
+def clean_epw_fields(fields, months, hours, timestep=1, max_gap_hours=MAX_INTERPOLATION_GAP_HOURS):
+    """
+    向量化的数据质量处理：一次性标记全部字段的缺测标记值与超限值，并填补缺口。
+
+    短缺口（不超过 max_gap_hours）用前后有效值线性插值，长缺口用同月同时刻的均值填补，
+    没有任何有效数据的字段整列置为 NaN。
+
+    Args:
+        fields (dict): 字段名到数值数组的映射（原地替换为填补后的数组）。
+        months (numpy.ndarray): 每行的月份（1–12）。
+        hours (numpy.ndarray): 每行的小时（0–23）。
+        timestep (int): 每小时的时间步数。
+        max_gap_hours (int): 线性插值的最长缺口（小时）。
+
+    Returns:
+        pandas.DataFrame: 每个字段一行的质量报告，列为缺测数、超限数、插值数、均值填补数、
+            最长缺口小时数以及是否完全缺失。
+    """
+    names = [name for name in EPW_FIELD_LIMITS if name in fields]
+    limits = np.array([EPW_FIELD_LIMITS[name] for name in names], dtype=np.float64)
+    matrix = np.stack([fields[name] for name in names])
+
+    # 一次广播比较完成全部字段的标记
+    missing = matrix >= limits[:, [0]]
+    out_of_range = ~missing & ((matrix < limits[:, [1]]) | (matrix > limits[:, [2]]))
+    flagged = missing | out_of_range
+
+    profile_key = (months - 1) * 24 + hours
+    report = np.zeros((len(names), 6))
+    report[:, 0] = missing.sum(axis=1)
+    report[:, 1] = out_of_range.sum(axis=1)
+    for i in np.flatnonzero(flagged.any(axis=1)):
+        values = matrix[i].copy()
+        if flagged[i].all():
+            values[:] = np.nan
+            report[i, 5] = 1
+        else:
+            filled_short, filled_long, longest = _fill_gaps(
+                values, flagged[i], profile_key, max_gap_hours * timestep, circular=names[i] == "wind_direction"
+            )
+            report[i, 2:5] = filled_short, filled_long, longest / timestep
+        fields[names[i]] = values
+
+    return pd.DataFrame(
+        {
+            "missing": report[:, 0].astype(np.int64),
+            "out_of_range": report[:, 1].astype(np.int64),
+            "interpolated": report[:, 2].astype(np.int64),
+            "profile_filled": report[:, 3].astype(np.int64),
+            "longest_gap_hours": report[:, 4],
+            "unavailable": report[:, 5].astype(bool),
+        },
+        index=pd.Index(names, name="field"),
+    )
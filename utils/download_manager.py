@@ -0,0 +1,255 @@
+# download_manager.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import requests
+from config import get_download_settings
+from utils.metrics import record_bytes, record_error
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，每次下载使用独立的临时文件
+    fcntl = None
+
+# Content-Range 响应头，例如 "bytes 1024-2047/4096"
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+class TransferProgress:
+    """一次进行中的下载的进度（由下载线程更新，各会话读取，不调用 Streamlit）。"""
+
+    __slots__ = ("done", "total")
+
+    def __init__(self):
+        self.done = 0
+        self.total = None
+
+_transfers = {}
+_transfers_lock = threading.Lock()
+
+def get_transfer_progress(url):
+    """
+    查询某个地址正在进行的下载进度。
+
+    Args:
+        url (str): 文件下载地址。
+
+    Returns:
+        tuple: (已下载字节数, 总字节数或 None)，没有进行中的下载时返回 None。
+    """
+    with _transfers_lock:
+        transfer = _transfers.get(url)
+    if transfer is None:
+        return None
+    return transfer.done, transfer.total
+
+def get_download_dir(*parts):
+    """
+    返回下载目录（或其子目录），不存在时创建。
+
+    Args:
+        *parts (str): 子目录名。
+
+    Returns:
+        str: 目录路径。
+    """
+    download_dir, _, _, _ = get_download_settings()
+    path = os.path.join(download_dir, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def staging_path(directory, name):
+    """
+    生成同目录下唯一的暂存文件路径，写完后再用 os.replace 原子地移动到最终位置，
+    并发的会话或进程不会读到写了一半的文件，也不会互相覆盖。
+
+    Args:
+        directory (str): 最终文件所在目录。
+        name (str): 最终文件名。
+
+    Returns:
+        str: 暂存文件路径。
+    """
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+
+def write_atomic(path, data):
+    """
+    原子地写入文件（先写暂存文件再替换），目标文件已存在时直接覆盖为相同内容。
+
+    Args:
+        path (str): 目标文件路径。
+        data (bytes): 文件内容。
+
+    Returns:
+        str: 目标文件路径。
+    """
+    directory, name = os.path.split(path)
+    temp_path = staging_path(directory, name)
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+def content_path(sha256, name):
+    """
+    按内容摘要生成下载文件的存放路径（内容相同则路径相同，可跨会话与重跑复用）。
+
+    Args:
+        sha256 (str): 文件内容的 SHA-256 十六进制摘要。
+        name (str): 文件名。
+
+    Returns:
+        str: 文件路径。
+    """
+    return os.path.join(get_download_dir("files", sha256[:16]), name)
+
+def _partial_path(url):
+    """同一地址的未完成下载保存在固定的 .part 文件中，中断后按已下载的字节续传。"""
+    return os.path.join(get_download_dir("partial"), hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+@contextmanager
+def _staging_path(url):
+    """
+    取得本次下载使用的 .part 文件：对固定的 .part 文件加进程间排他锁后续传；
+    锁被其他进程（例如预热脚本或接口服务）持有时，改用独立命名的临时文件从头下载，互不追加或删除对方的数据。
+
+    Yields:
+        str: .part 文件路径。
+    """
+    part_path = _partial_path(url)
+    lock_file = open(part_path + ".lock", "a") if fcntl is not None else None
+    try:
+        if lock_file is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                lock_file = None
+        if lock_file is not None:
+            yield part_path
+            return
+        unique_path = f"{part_path[:-len('.part')]}.{os.getpid()}.{uuid.uuid4().hex}.part"
+        try:
+            yield unique_path
+        finally:
+            # 独立的临时文件不会被续传，失败时直接删除（成功时已被移动到内容路径）
+            if os.path.exists(unique_path):
+                os.remove(unique_path)
+    finally:
+        if lock_file is not None:
+            # 关闭文件即释放 flock；进程异常退出时锁同样会被释放
+            lock_file.close()
+
+def _hash_file(path, chunk_size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _transfer(url, part_path, chunk_size, timeout, headers, transfer):
+    """
+    从 part_path 已有的字节处继续下载一次（服务器不支持 Range 时从头下载）。
+
+    Returns:
+        int: 文件总字节数（服务器未给出时为 None）。
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request_headers = dict(headers or {})
+    if offset:
+        request_headers["Range"] = f"bytes={offset}-"
+
+    with requests.get(url, stream=True, timeout=timeout, headers=request_headers) as r:
+        if r.status_code == 416:
+            # 已下载的部分不小于服务器上的文件（例如文件已更新），丢弃后从头下载
+            os.remove(part_path)
+            return _transfer(url, part_path, chunk_size, timeout, headers, transfer)
+        r.raise_for_status()
+
+        total = None
+        if r.status_code == 206:
+            match = _CONTENT_RANGE.match(r.headers.get("Content-Range", ""))
+            if match is None or int(match.group(1)) != offset:
+                raise IOError(f"续传响应的 Content-Range 与已下载的字节不符: {r.headers.get('Content-Range')}")
+            total = int(match.group(3)) if match.group(3) != "*" else None
+            mode = "ab"
+        else:
+            # 服务器忽略了 Range，返回的是完整文件
+            offset = 0
+            mode = "wb"
+            if "Content-Length" in r.headers:
+                total = int(r.headers["Content-Length"])
+
+        transfer.done, transfer.total = offset, total
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                transfer.done += len(chunk)
+                record_bytes("alist", "in", len(chunk))
+    return total
+
+def fetch_to_file(url, name=None, expected_size=None, expected_sha256=None, headers=None):
+    """
+    流式下载文件：按配置的块大小与超时读取，连接中断时用 Range 请求从已下载的字节处续传，
+    完成后校验大小与 SHA-256，再原子地移动到按内容摘要命名的路径。
+    下载期间的进度可通过 get_transfer_progress(url) 查询。
+
+    Args:
+        url (str): 文件下载地址。
+        name (str): 保存的文件名，默认取地址中的文件名。
+        expected_size (int): 期望的文件字节数（例如仓库列表中的 size），None 表示只与服务器给出的长度比较。
+        expected_sha256 (str): 期望的 SHA-256 摘要，None 表示不比较。
+        headers (dict): 额外的请求头。
+
+    Returns:
+        tuple: (本地文件路径, SHA-256 摘要)。
+    """
+    name = name or os.path.basename(url)
+
+    transfer = TransferProgress()
+    with _transfers_lock:
+        _transfers[url] = transfer
+    try:
+        with _staging_path(url) as part_path:
+            return _fetch(url, name, part_path, expected_size, expected_sha256, headers, transfer)
+    finally:
+        with _transfers_lock:
+            if _transfers.get(url) is transfer:
+                del _transfers[url]
+
+def _fetch(url, name, part_path, expected_size, expected_sha256, headers, transfer):
+    """fetch_to_file 的下载、续传与校验过程。"""
+    _, chunk_size, timeout, retries = get_download_settings()
+    for attempt in range(retries + 1):
+        try:
+            total = _transfer(url, part_path, chunk_size, timeout, headers, transfer)
+            size = os.path.getsize(part_path)
+            if total is None or size >= total:
+                break
+            # 连接提前关闭但没有报错（已收到的字节少于总长度），按中断处理并续传
+            record_error("download", "incomplete")
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            record_error("download", type(e).__name__)
+        if attempt == retries:
+            raise IOError(f"下载在 {retries + 1} 次尝试后仍未完成: {url}")
+        time.sleep(min(2 ** attempt * 0.5, 10))
+
+    for expected in (total, expected_size):
+        if expected is not None and size != expected:
+            os.remove(part_path)
+            record_error("download", "size_mismatch")
+            raise IOError(f"下载的文件大小 {size} 与期望的 {expected} 字节不符: {url}")
+
+    sha256 = _hash_file(part_path, chunk_size)
+    if expected_sha256 is not None and sha256 != expected_sha256:
+        os.remove(part_path)
+        record_error("download", "checksum_mismatch")
+        raise IOError(f"下载的文件校验失败（SHA-256 {sha256} ≠ {expected_sha256}）: {url}")
+
+    local_path = content_path(sha256, name)
+    os.replace(part_path, local_path)
+    return local_path, sha256
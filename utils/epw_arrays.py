@@ -0,0 +1,305 @@
+# epw_arrays.py
+
+import hashlib
+import os
+import threading
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from utils.data_processor import clean_epw_fields
+from utils.cache_backend import get_cache
+from utils.metrics import instrument, record_cache
+from utils.single_flight import single_flight
+
+# EPW 数据行中各字段所在的列号（参见 EnergyPlus Auxiliary Programs 文档）
+EPW_FIELD_COLUMNS = {
+    "dry_bulb_temperature": 6,
+    "dew_point_temperature": 7,
+    "relative_humidity": 8,
+    "atmospheric_station_pressure": 9,
+    "extraterrestrial_horizontal_radiation": 10,
+    "extraterrestrial_direct_normal_radiation": 11,
+    "horizontal_infrared_radiation_intensity": 12,
+    "global_horizontal_radiation": 13,
+    "direct_normal_radiation": 14,
+    "diffuse_horizontal_radiation": 15,
+    "global_horizontal_illuminance": 16,
+    "direct_normal_illuminance": 17,
+    "diffuse_horizontal_illuminance": 18,
+    "zenith_luminance": 19,
+    "wind_direction": 20,
+    "wind_speed": 21,
+    "total_sky_cover": 22,
+    "opaque_sky_cover": 23,
+    "visibility": 24,
+    "ceiling_height": 25,
+    "precipitable_water": 28,
+    "aerosol_optical_depth": 29,
+    "snow_depth": 30,
+    "days_since_last_snowfall": 31,
+    "albedo": 32,
+    "liquid_precipitation_depth": 33,
+    "liquid_precipitation_quantity": 34,
+}
+
+# ladybug 中非"时刻值"（时段累计值）的字段，其余字段与 ladybug 一致地将最后一行移到首位
+_INTERVAL_FIELDS = {
+    "atmospheric_station_pressure",
+    "extraterrestrial_horizontal_radiation",
+    "extraterrestrial_direct_normal_radiation",
+    "global_horizontal_radiation",
+    "direct_normal_radiation",
+    "diffuse_horizontal_radiation",
+    "global_horizontal_illuminance",
+    "direct_normal_illuminance",
+    "diffuse_horizontal_illuminance",
+    "zenith_luminance",
+}
+
+# ladybug 中按整数读取的字段，文件中若为小数则与 ladybug 一致地四舍五入
+_INTEGER_FIELDS = {
+    "relative_humidity",
+    "atmospheric_station_pressure",
+    "extraterrestrial_horizontal_radiation",
+    "extraterrestrial_direct_normal_radiation",
+    "horizontal_infrared_radiation_intensity",
+    "global_horizontal_radiation",
+    "direct_normal_radiation",
+    "diffuse_horizontal_radiation",
+    "global_horizontal_illuminance",
+    "direct_normal_illuminance",
+    "diffuse_horizontal_illuminance",
+    "zenith_luminance",
+    "wind_direction",
+    "total_sky_cover",
+    "opaque_sky_cover",
+    "ceiling_height",
+    "precipitable_water",
+    "snow_depth",
+    "days_since_last_snowfall",
+}
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+_CUMULATIVE_DAYS = np.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+_CUMULATIVE_DAYS_LEAP = np.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+
+class EPWArrays:
+    """
+    EPW 数据的 NumPy 数组表示，每个字段一条一维数组，并附带逐行的月、日、时索引。
+
+    与 ladybug 的 HourlyContinuousCollection 不同，这里不假设逐时数据：
+    子小时（timestep 2–60）与闰年（8784 小时）文件都按实际行数读取。
+    """
+
+    __slots__ = ("file_path", "timestep", "is_leap_year", "start_weekday",
+                 "month", "day", "hour", "minute", "day_of_year", "weekday", "month_offsets", "fields", "quality", "cache_key")
+
+    def __init__(self, file_path, timestep, start_weekday, month, day, hour, minute, fields, quality=None):
+        self.file_path = file_path
+        self.timestep = timestep
+        self.start_weekday = start_weekday
+        self.month = month
+        self.day = day
+        self.hour = hour
+        self.minute = minute
+        self.fields = fields
+        # 数据质量报告（clean_epw_fields 的结果），字段值已是填补后的数据
+        self.quality = quality
+        self.is_leap_year = bool(np.any((month == 2) & (day == 29)))
+        cumulative = _CUMULATIVE_DAYS_LEAP if self.is_leap_year else _CUMULATIVE_DAYS
+        self.day_of_year = cumulative[month - 1] + day
+        # 星期索引（0 为星期一），由 DATA PERIODS 的起始星期推算
+        self.weekday = (WEEKDAYS.index(start_weekday) + self.day_of_year - 1) % 7
+        # 每个月第一行的位置，month_offsets[m - 1]:month_offsets[m] 即为第 m 月的数据
+        self.month_offsets = np.searchsorted(month, np.arange(1, 14), side="left")
+        # 由 load_epw_arrays 设置的缓存键（文件路径、修改时间、大小），供下游按站点缓存计算结果
+        self.cache_key = None
+
+    def __len__(self):
+        return len(self.month)
+
+    @property
+    def total_hours(self):
+        """数据覆盖的总小时数（行数除以每小时的时间步数）。"""
+        return len(self) / self.timestep
+
+    def values(self, field):
+        """
+        获取某字段的数值数组。
+
+        Args:
+            field (str): 字段名，与 ladybug EPW 的属性名一致（例如 "dry_bulb_temperature"）。
+
+        Returns:
+            numpy.ndarray: 字段数值（float64）。
+        """
+        return self.fields[field]
+
+    def hourly_values(self, field):
+        """
+        获取某字段逐时（每小时一行）的数值数组。
+
+        子小时数据中，时段累计字段取每小时的均值；时刻值字段取与逐时文件含义一致的整点值
+        （即已按 ladybug 规则移位后每小时的首行），使逐时结果与按行计算的图表一致。
+
+        Args:
+            field (str): 字段名。
+
+        Returns:
+            numpy.ndarray: 长度为行数除以时间步数的数组。
+        """
+        values = self.fields[field]
+        if self.timestep == 1:
+            return values
+        rows = values.reshape(-1, self.timestep)
+        return rows.mean(axis=1) if field in _INTERVAL_FIELDS else rows[:, 0]
+
+    def is_available(self, field):
+        """
+        判断某字段是否有有效数据（EPW 中整列为缺测标记的字段会被置为 NaN）。
+
+        Args:
+            field (str): 字段名。
+
+        Returns:
+            bool: 字段存在且不是整列缺失时返回 True。
+        """
+        return field in self.fields and not (self.quality is not None and self.quality.at[field, "unavailable"])
+
+    def to_collection(self, field):
+        """
+        将某字段转换为 ladybug 的 HourlyContinuousCollection（用于风玫瑰等仍依赖 ladybug 的图表）。
+
+        Args:
+            field (str): 字段名。
+
+        Returns:
+            HourlyContinuousCollection: 带有与时间步、闰年匹配的分析周期的数据集合。
+        """
+        from ladybug.analysisperiod import AnalysisPeriod
+        from ladybug.datacollection import HourlyContinuousCollection
+        from ladybug.epw import EPWFields
+        from ladybug.header import Header
+
+        epw_field = EPWFields.field_by_number(EPW_FIELD_COLUMNS[field])
+        period = AnalysisPeriod(timestep=self.timestep, is_leap_year=self.is_leap_year)
+        header = Header(data_type=epw_field.name, unit=epw_field.unit, analysis_period=period)
+        return HourlyContinuousCollection(header, self.fields[field].tolist())
+
+def _parse_data_periods(header_lines):
+    """
+    从 EPW 头部的 DATA PERIODS 行解析时间步数与起始星期。
+
+    Args:
+        header_lines (list): EPW 文件的前 8 行。
+
+    Returns:
+        tuple: (每小时时间步数, 起始星期名称)
+    """
+    for line in header_lines:
+        if line.upper().startswith("DATA PERIODS"):
+            parts = [p.strip() for p in line.split(",")]
+            timestep = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 1
+            start_weekday = parts[4] if len(parts) > 4 and parts[4] in WEEKDAYS else "Sunday"
+            return max(timestep, 1), start_weekday
+    return 1, "Sunday"
+
+@instrument()
+def read_epw_arrays(file_path):
+    """
+    以向量化方式读取 EPW 文件的数据部分。
+
+    Args:
+        file_path (str): EPW 文件路径。
+
+    Returns:
+        EPWArrays: 读取得到的数组数据。
+    """
+    with open(file_path, encoding="utf-8", errors="ignore") as f:
+        header_lines = [f.readline() for _ in range(8)]
+        num_of_columns = len(f.readline().split(","))
+    timestep, start_weekday = _parse_data_periods(header_lines)
+
+    # 部分 EPW 文件的字段数少于 35，只读取实际存在的列
+    usecols = [c for c in [1, 2, 3, 4] + sorted(EPW_FIELD_COLUMNS.values()) if c < num_of_columns]
+    body = pd.read_csv(file_path, skiprows=8, header=None, usecols=usecols,
+                       encoding="utf-8", encoding_errors="ignore", skip_blank_lines=True)
+    fields = {}
+    for name, col in EPW_FIELD_COLUMNS.items():
+        if col in body:
+            values = body[col].to_numpy(dtype=np.float64)
+            if name in _INTEGER_FIELDS:
+                values = np.round(values)
+            # 时刻值的第 h 行记录的是 h 点整的状态，与 ladybug 相同地把最后一行（次年 0 点）移到首位
+            fields[name] = values if name in _INTERVAL_FIELDS else np.roll(values, 1)
+    month = body[1].to_numpy(dtype=np.int64)
+    hour = body[3].to_numpy(dtype=np.int64) - 1  # EPW 的小时为 1–24（时段结束时刻），转为 0–23
+    # 标记缺测标记值与超限值并填补缺口，避免 99.9/999/9999 等进入均值、色阶与总结
+    quality = clean_epw_fields(fields, month, hour, timestep)
+    return EPWArrays(
+        file_path=file_path,
+        timestep=timestep,
+        start_weekday=start_weekday,
+        month=month,
+        day=body[2].to_numpy(dtype=np.int64),
+        hour=hour,
+        minute=body[4].to_numpy(dtype=np.int64),
+        fields=fields,
+        quality=quality,
+    )
+
+_arrays_cache = LRUCache(maxsize=32)
+_arrays_lock = threading.Lock()
+
+def file_digest(file_path):
+    """
+    计算文件内容摘要（解压得到的临时 EPW 路径每次都不同，按内容识别站点数据）。
+
+    Args:
+        file_path (str): 文件路径。
+
+    Returns:
+        str: SHA-1 十六进制摘要。
+    """
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+@instrument()
+def load_epw_arrays(epw):
+    """
+    获取 EPW 的数组数据，按文件路径、修改时间和大小缓存；进程内未命中时按文件内容摘要
+    读取共享缓存（其他副本已解析过的结果），仍未命中再解析文件。
+
+    Args:
+        epw (EPW or str): ladybug 的 EPW 对象或 EPW 文件路径。
+
+    Returns:
+        EPWArrays: 数组数据。
+    """
+    file_path = epw if isinstance(epw, str) else epw.file_path
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    with _arrays_lock:
+        arrays = _arrays_cache.get(key)
+    record_cache("epw_arrays", arrays is not None)
+    if arrays is None:
+        # 多个会话同时读取同一文件时只解析一次
+        arrays = single_flight("epw_parse", key, lambda: _load_uncached(file_path, key))
+    return arrays
+
+def _load_uncached(file_path, key):
+    cache = get_cache()
+    digest = file_digest(file_path)
+    arrays = cache.get("epw_arrays", digest)
+    if arrays is None:
+        arrays = read_epw_arrays(file_path)
+        cache.set("epw_arrays", digest, arrays)
+    arrays.file_path = file_path
+    arrays.cache_key = key
+    with _arrays_lock:
+        _arrays_cache[key] = arrays
+    return arrays
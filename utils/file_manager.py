@@ -1,12 +1,24 @@
 # file_manager.py
 
 import os
+import hashlib
 import http.client
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from config import get_alist_settings, get_download_workers
+from utils.cache_backend import get_cache
+from utils.download_manager import content_path, fetch_to_file, get_transfer_progress, write_atomic
+from utils.metrics import instrument, record_bytes
+from utils.single_flight import coalesce
 
-ALIST_URL = "warehouse.archknowledge.com.cn"
-ALIST_AUTHORIZATION = "alist-79f0737a-97a0-4c5f-a51e-df4afecd5d44dB1P9QSM5FRCJbUc0HrywajGijam55RFS1hSvLCGLviwwGhsoqtcaGGcByeg7ELM"
+ALIST_URL, ALIST_AUTHORIZATION = get_alist_settings()
 
+_download_executor = None
+_download_executor_lock = threading.Lock()
+
+@instrument()
 def fetch_file_list_from_alist(path):
     """
     从 Alist API 获取文件列表。
@@ -26,13 +38,126 @@ def fetch_file_list_from_alist(path):
     }
     conn.request("POST", "/api/fs/list", payload, headers)
     res = conn.getresponse()
-    data = json.loads(res.read().decode("utf-8"))
+    body = res.read()
+    record_bytes("alist", "in", len(body))
+    data = json.loads(body.decode("utf-8"))
     
     if data['code'] == 200:
         return data['data']['content']
     else:
         return []
 
+def list_station_files(path="/"):
+    """
+    递归遍历 Alist 仓库，列出所有站点 ZIP 文件。
+
+    Args:
+        path (str): 起始目录路径，默认为仓库根目录。
+
+    Returns:
+        list: 站点 ZIP 文件的完整路径列表（例如 "/WMO_Region_2_Asia/CHN_China/SN_Shaanxi/CHN_SN_Xian.570360_CSWD.zip"）。
+    """
+    station_files = []
+    for item in fetch_file_list_from_alist(path):
+        item_path = f"{path.rstrip('/')}/{item['name']}"
+        if item['is_dir']:
+            station_files.extend(list_station_files(item_path))
+        elif item['name'].endswith(".zip"):
+            station_files.append(item_path)
+    return station_files
+
+def get_station_url(station_path):
+    """
+    根据站点 ZIP 文件路径生成下载地址。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+
+    Returns:
+        str: 下载地址。
+    """
+    return f"http://{ALIST_URL}/d{station_path}"
+
+def get_station_key(station_path):
+    """
+    根据站点 ZIP 文件路径生成站点标识（即地理编码）。
+
+    Args:
+        station_path (str): 站点 ZIP 文件在仓库中的路径。
+
+    Returns:
+        str: 站点标识，例如 "WMO_Region_2_Asia/CHN_China/SN_Shaanxi/CHN_SN_Xian.570360_CSWD"。
+    """
+    return station_path.lstrip('/').replace('.zip', '')
+
+@instrument()
+@coalesce("download", key=lambda url, **kwargs: url)
+def download_file(url, expected_size=None):
+    """
+    下载文件到下载目录（优先读取共享缓存，其他副本已下载过的文件不再请求仓库；
+    多个会话同时请求同一文件时只下载一次）。
+
+    文件按内容摘要存放，同一文件在各会话与重跑之间路径不变，不会被其他会话的下载覆盖。
+
+    Args:
+        url (str): 文件下载地址。
+        expected_size (int): 期望的文件字节数（例如仓库列表中的 size），用于校验。
+
+    Returns:
+        str: 下载后的本地文件路径。
+    """
+    name = os.path.basename(url)
+    # 以仓库内路径作为缓存键，各副本配置的仓库主机名不同时也能共享
+    cache_key = urlparse(url).path
+    cache = get_cache()
+    blob = cache.get("download", cache_key)
+    if blob is not None:
+        sha256 = hashlib.sha256(blob).hexdigest()
+        if sha256 == cache.get("download", (cache_key, "sha256")):
+            local_filename = content_path(sha256, name)
+            if not os.path.exists(local_filename):
+                write_atomic(local_filename, blob)
+            return local_filename
+        # 缓存内容与记录的摘要不符（或缺少摘要），丢弃后重新下载
+        cache.delete("download", cache_key)
+
+    local_filename, sha256 = fetch_to_file(url, name, expected_size=expected_size)
+    with open(local_filename, 'rb') as f:
+        cache.set("download", cache_key, f.read())
+    cache.set("download", (cache_key, "sha256"), sha256)
+    return local_filename
+
+def start_download(url, expected_size=None):
+    """
+    在后台线程中下载文件（参见 download_file），页面可在等待期间轮询 get_download_progress。
+
+    下载不在会话的脚本线程中运行，会话重跑或停止不会中断其他会话合并等待的同一下载。
+
+    Args:
+        url (str): 文件下载地址。
+        expected_size (int): 期望的文件字节数，用于校验。
+
+    Returns:
+        concurrent.futures.Future: 结果为下载后的本地文件路径。
+    """
+    global _download_executor
+    with _download_executor_lock:
+        if _download_executor is None:
+            _download_executor = ThreadPoolExecutor(max_workers=get_download_workers(), thread_name_prefix="download")
+    return _download_executor.submit(download_file, url, expected_size=expected_size)
+
+def get_download_progress(url):
+    """
+    查询某个地址正在进行的下载进度（各会话共享同一份进度）。
+
+    Args:
+        url (str): 文件下载地址。
+
+    Returns:
+        tuple: (已下载字节数, 总字节数或 None)，没有进行中的下载时返回 None。
+    """
+    return get_transfer_progress(url)
+
 def get_current_path():
     """
     获取当前文件所在路径。
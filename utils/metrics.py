@@ -0,0 +1,136 @@
+# metrics.py
+
+import functools
+import inspect
+import threading
+import time
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from config import get_metrics_port
+
+# 覆盖从毫秒级的聚合到数十秒的 LLM 调用
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CALL_LATENCY = Histogram(
+    "slt_call_duration_seconds", "热点函数与外部调用的耗时", ["function"], buckets=LATENCY_BUCKETS,
+)
+CALLS_IN_FLIGHT = Gauge(
+    "slt_calls_in_flight", "正在执行的调用数", ["function"],
+)
+CALL_ERRORS = Counter(
+    "slt_call_errors_total", "调用抛出异常的次数", ["function", "exception"],
+)
+BYTES_TRANSFERRED = Counter(
+    "slt_bytes_transferred_total", "与外部服务之间传输的字节数", ["source", "direction"],
+)
+CACHE_REQUESTS = Counter(
+    "slt_cache_requests_total", "缓存查询次数（命中率 = hit / (hit + miss)）", ["cache", "result"],
+)
+COALESCED_REQUESTS = Counter(
+    "slt_coalesced_requests_total", "合并到进行中的相同调用、未单独执行的请求数", ["operation"],
+)
+
+_server_lock = threading.Lock()
+_server_started = False
+
+def instrument(name=None):
+    """
+    装饰器：记录函数的耗时直方图、进行中的调用数与异常次数（同时支持协程函数）。
+
+    Args:
+        name (str): 指标中的函数名，默认使用被装饰函数的名称。
+
+    Returns:
+        callable: 装饰器。
+    """
+    def decorator(func):
+        label = name or func.__name__
+        latency = CALL_LATENCY.labels(label)
+        in_flight = CALLS_IN_FLIGHT.labels(label)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                in_flight.inc()
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    CALL_ERRORS.labels(label, type(e).__name__).inc()
+                    raise
+                finally:
+                    latency.observe(time.perf_counter() - start)
+                    in_flight.dec()
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                CALL_ERRORS.labels(label, type(e).__name__).inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+                in_flight.dec()
+        return wrapper
+    return decorator
+
+def record_bytes(source, direction, size):
+    """
+    记录传输字节数。
+
+    Args:
+        source (str): 外部服务，例如 "alist"、"llm"。
+        direction (str): "in"（接收）或 "out"（发送）。
+        size (int): 字节数。
+    """
+    BYTES_TRANSFERRED.labels(source, direction).inc(size)
+
+def record_error(function, kind):
+    """
+    记录一次未抛出异常的错误（例如外部服务返回了错误响应）。
+
+    Args:
+        function (str): 函数名。
+        kind (str): 错误类型。
+    """
+    CALL_ERRORS.labels(function, kind).inc()
+
+def record_cache(cache, hit):
+    """
+    记录一次缓存查询结果。
+
+    Args:
+        cache (str): 缓存名称，例如 "epw_arrays"、"shared:download"、"summary_store"。
+        hit (bool): 是否命中。
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def record_coalesced(operation):
+    """
+    记录一次被合并的请求（等待进行中的相同调用并复用其结果）。
+
+    Args:
+        operation (str): 操作名称，例如 "download"、"epw_parse"、"llm"。
+    """
+    COALESCED_REQUESTS.labels(operation).inc()
+
+def start_metrics_server():
+    """
+    在后台启动 Prometheus 抓取端点（每个进程一次，端口由 config 中的 METRICS_PORT 决定，0 表示不启动）。
+
+    端口已被占用（例如同一容器中的另一个进程已启动端点）时忽略。
+    """
+    global _server_started
+    with _server_lock:
+        if _server_started:
+            return
+        _server_started = True
+        port = get_metrics_port()
+        if port:
+            try:
+                start_http_server(port)
+            except OSError:
+                pass
@@ -3,16 +3,21 @@
 import http.client
 import json
 from config import get_api_credentials
+from utils.cache_backend import get_cache
+from utils.metrics import instrument, record_bytes, record_error
+from utils.single_flight import single_flight
 import streamlit as st
 
-def get_openai_response(prompt):
-    openai_api_scheme, openai_api_host, openai_api_key = get_api_credentials()
+# 语言模型没有返回结果时的提示（不写入缓存，后台报告任务据此判断失败）
+LLM_ERROR_MESSAGE = "服务器繁忙或出现错误，请重试/The server is busy or experiencing errors, please try again"
 
-    geoinfo = st.session_state.get('geoinfo', '未知区域')  # 获取 geoinfo 或者使用默认值
+@instrument()
+def get_openai_response(prompt, geoinfo=None):
+    openai_api_scheme, openai_api_host, openai_api_key = get_api_credentials()
 
-    conn = http.client.HTTPConnection(openai_api_host)
-    if openai_api_scheme == "https":
-        conn = http.client.HTTPSConnection(openai_api_host)
+    # 后台线程中没有会话状态，需要显式传入 geoinfo；未传入时读取当前会话的 geoinfo 或者使用默认值
+    if geoinfo is None:
+        geoinfo = st.session_state.get('geoinfo', '未知区域')
 
     system_content = "用中文回答问题。"
     if geoinfo:
@@ -26,6 +31,21 @@ def get_openai_response(prompt):
         ],
         "temperature": 0
     })
+
+    # 相同的提示词（temperature 为 0）直接复用共享缓存中的回答
+    cache = get_cache()
+    content = cache.get("llm", payload)
+    if content is not None:
+        return content
+
+    # 多个会话同时发出相同的请求时只调用一次接口，共享回答
+    return single_flight("llm", payload, lambda: _request_completion(openai_api_scheme, openai_api_host, openai_api_key, payload))
+
+def _request_completion(openai_api_scheme, openai_api_host, openai_api_key, payload):
+    conn = http.client.HTTPConnection(openai_api_host)
+    if openai_api_scheme == "https":
+        conn = http.client.HTTPSConnection(openai_api_host)
+
     headers = {
         'Authorization': f'Bearer {openai_api_key}',
         'User-Agent': 'Apifox/1.0.0 (https://apifox.com)',
@@ -33,12 +53,17 @@ def get_openai_response(prompt):
     }
     conn.request("POST", "/v1/chat/completions", payload, headers)
     res = conn.getresponse()
-    data = json.loads(res.read().decode("utf-8"))
+    body = res.read()
+    record_bytes("llm", "out", len(payload.encode("utf-8")))
+    record_bytes("llm", "in", len(body))
+    data = json.loads(body.decode("utf-8"))
 
     if "choices" not in data:
-        return "服务器繁忙或出现错误，请重试/The server is busy or experiencing errors, please try again"
+        record_error("get_openai_response", "no_choices")
+        return LLM_ERROR_MESSAGE
 
     content = data["choices"][0]["message"]["content"]
+    get_cache().set("llm", payload, content)
     return content
 
 def generate_passive_strategies_advice(chart_text):
@@ -78,6 +103,60 @@ def generate_temperature_analysis_advice(monthly_text, daily_text):
               
     return get_openai_response(prompt)
 
+def generate_design_conditions_advice(chart_text):
+    """
+    生成设计工况分析建议。
+
+    Args:
+        chart_text (str): 设计工况文本信息。
+
+    Returns:
+        str: 设计工况分析建议。
+    """
+    prompt = (f"在你进行内容输出时，应当让语言尽可能自然，不要机械式的介绍和分析，你现在是一个从事绿色建筑相关专业的暖通空调设计师，该城市按ASHRAE方法统计的室外设计工况如下：{chart_text}，请先根据你已知的信息，分享这座城市的信息，包括大洲、国家、行政区划和城市名（中文或翻译成中文），你在输出时请使用自然语言，不要出现地理编码信息，并从地理学的角度介绍这座城市的信息"
+              "请你以以上数据为基础介绍该城市夏季制冷与冬季供暖的室外设计条件，说明干球、湿球与露点温度分别对冷热负荷、冷却塔与新风除湿设计的意义，"
+              "并指出这些数据如何影响当地建筑的暖通空调系统选型。"
+              "你的输出格式应该为：{city_name}市位于{continent_name}州{country_name}国{region_name}省/其他行政区，其气候特点和地理特点为{information}，以下为分析结果：{result}"
+              )
+              
+    return get_openai_response(prompt)
+
+def generate_comparison_advice(comparison_text):
+    """
+    生成多站点气候对比分析建议。
+
+    Args:
+        comparison_text (str): 各站点对比文本信息。
+
+    Returns:
+        str: 多站点对比分析建议。
+    """
+    prompt = (f"在你进行内容输出时，应当让语言尽可能自然，不要机械式的介绍和分析，你现在是一个从事绿色建筑相关专业的气候数据分析师，以下是多个城市的气候数据对比：{comparison_text}，请根据站点名称识别这些城市所在的国家和地区，你在输出时请使用自然语言，不要出现站点编码信息"
+              "请你以以上数据为基础对比这些城市在温度、湿度、风况与被动策略适用性上的异同，"
+              "并指出同一类建筑在这些城市中进行设计时，围护结构、遮阳、通风与暖通空调策略应当如何区别对待。"
+              )
+              
+    return get_openai_response(prompt)
+
+def generate_degree_days_analysis_advice(monthly_text, daily_text):
+    """
+    生成度日数数据分析建议。
+
+    Args:
+        monthly_text (str): 全年度日数文本信息。
+        daily_text (str): 所选月份度日数文本信息。
+
+    Returns:
+        str: 度日数数据分析建议。
+    """
+    prompt = (f"在你进行内容输出时，应当让语言尽可能自然，不要机械式的介绍和分析，你现在是一个从事绿色建筑相关专业的暖通空调与气候数据分析师，当前月份的度日数数据和该城市全年的度日数数据如下：{daily_text}，{monthly_text}，请先根据你已知的信息，分享这座城市的信息，包括大洲、国家、行政区划和城市名（中文或翻译成中文），你在输出时请使用自然语言，不要出现地理编码信息，并从地理学的角度介绍这座城市的信息"
+              "请你以以上数据为基础详略得当的介绍该城市的供暖与制冷需求，判断其所属的建筑热工设计分区，将当前月份与全年相对比，"
+              "并指出这些数据如何影响当地建筑的围护结构保温隔热设计与暖通空调系统选型。"
+              "你的输出格式应该为：{city_name}市位于{continent_name}州{country_name}国{region_name}省/其他行政区，其气候特点和地理特点为{information}，以下为分析结果：{result}"
+              )
+              
+    return get_openai_response(prompt)
+
 def generate_humidity_analysis_advice(monthly_text, daily_text):
     """
     生成相对湿度数据分析建议。
@@ -178,10 +257,16 @@ def generate_illuminance_analysis_advice(monthly_text, daily_text, type):
               
     return get_openai_response(prompt)
 
-def generate_summary(summary):
+def generate_summary(summary, geoinfo=None):
     """
     生成完整的分析建议。
 
+    Args:
+        summary (str): 各模块总结文字。
+        geoinfo (str): 地理编码，为 None 时读取当前会话的 geoinfo（后台线程中需显式传入）。
+
+    Returns:
+        str: 绿建气候报告。
     """
     prompt = (
             f"你现在是一个从事绿色建筑相关专业的气候数据分析师，结合地理编码你已经知道了这个城市的国家、行政区和城市名称city_name等信息，请将这些信息转换成中文，目前我们经过计算得到的数据包括{summary}"
@@ -250,4 +335,4 @@ def generate_summary(summary):
 
         )
                     
-    return get_openai_response(prompt)
+    return get_openai_response(prompt, geoinfo)
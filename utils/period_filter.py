@@ -0,0 +1,142 @@
+# period_filter.py
+
+import numpy as np
+
+class PeriodSelection:
+    """
+    对某个站点数组数据的时段选择。
+
+    连续月份区间使用切片表示，取值得到的是原数组的 NumPy 视图；
+    带有日、时、星期条件的选择使用行号数组表示，取值为一次向量化的索引操作。
+    """
+
+    __slots__ = ("arrays", "selector")
+
+    def __init__(self, arrays, selector):
+        self.arrays = arrays
+        self.selector = selector
+
+    def __len__(self):
+        if isinstance(self.selector, slice):
+            return self.selector.stop - self.selector.start
+        return len(self.selector)
+
+    @property
+    def is_view(self):
+        """选择结果是否为原数组的视图（连续切片）。"""
+        return isinstance(self.selector, slice)
+
+    def apply(self, array):
+        """
+        将选择应用到与站点数据等长的任意数组。
+
+        Args:
+            array (numpy.ndarray): 与站点数据等长的数组。
+
+        Returns:
+            numpy.ndarray: 选择后的数组（切片选择时为视图）。
+        """
+        return array[self.selector]
+
+    def values(self, field):
+        """
+        获取选择时段内某字段的数值。
+
+        Args:
+            field (str): 字段名（例如 "dry_bulb_temperature"）。
+
+        Returns:
+            numpy.ndarray: 选择后的数值。
+        """
+        return self.arrays.values(field)[self.selector]
+
+    @property
+    def month(self):
+        return self.arrays.month[self.selector]
+
+    @property
+    def day(self):
+        return self.arrays.day[self.selector]
+
+    @property
+    def hour(self):
+        return self.arrays.hour[self.selector]
+
+    @property
+    def day_of_year(self):
+        return self.arrays.day_of_year[self.selector]
+
+    @property
+    def weekday(self):
+        return self.arrays.weekday[self.selector]
+
+def _lookup(values, size):
+    """构建"取值 -> 是否选中"的布尔查找表，values 为 None 时全部选中。"""
+    table = np.zeros(size, dtype=bool)
+    if values is None:
+        table[:] = True
+    else:
+        table[np.asarray(list(values), dtype=np.int64)] = True
+    return table
+
+def months_between(start_month, end_month):
+    """
+    获取起止月份之间的全部月份，起始月份大于终止月份时跨年（例如 11 月到次年 2 月）。
+
+    Args:
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+
+    Returns:
+        list: 月份列表。
+    """
+    if start_month <= end_month:
+        return list(range(start_month, end_month + 1))
+    return list(range(start_month, 13)) + list(range(1, end_month + 1))
+
+def build_period_mask(arrays, months=None, days=None, hours=None, weekdays=None):
+    """
+    根据月、日、时、星期条件构建布尔掩码。
+
+    Args:
+        arrays (EPWArrays): 站点数组数据。
+        months (iterable): 选中的月份（1–12），None 表示全部。
+        days (iterable): 选中的日期（1–31），None 表示全部。
+        hours (iterable): 选中的时刻（0–23），None 表示全部。
+        weekdays (iterable): 选中的星期（0 为星期一，6 为星期日），None 表示全部。
+
+    Returns:
+        numpy.ndarray: 与站点数据等长的布尔掩码。
+    """
+    mask = _lookup(months, 13)[arrays.month]
+    if days is not None:
+        mask &= _lookup(days, 32)[arrays.day]
+    if hours is not None:
+        mask &= _lookup(hours, 24)[arrays.hour]
+    if weekdays is not None:
+        mask &= _lookup(weekdays, 7)[arrays.weekday]
+    return mask
+
+def select_period(arrays, start_month=1, end_month=12, days=None, hours=None, weekdays=None):
+    """
+    选择站点数据的分析时段，替代逐个日期遍历的 AnalysisPeriod 筛选。
+
+    仅按连续月份选择时直接使用预计算的月份偏移得到切片（零拷贝视图）；
+    附加日、时、星期条件或跨年月份时使用布尔掩码。
+
+    Args:
+        arrays (EPWArrays): 站点数组数据。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        days (iterable): 选中的日期（1–31），None 表示全部。
+        hours (iterable): 选中的时刻（0–23），None 表示全部。
+        weekdays (iterable): 选中的星期（0 为星期一），None 表示全部。
+
+    Returns:
+        PeriodSelection: 时段选择。
+    """
+    if start_month <= end_month and days is None and hours is None and weekdays is None:
+        offsets = arrays.month_offsets
+        return PeriodSelection(arrays, slice(int(offsets[start_month - 1]), int(offsets[end_month])))
+    mask = build_period_mask(arrays, months_between(start_month, end_month), days, hours, weekdays)
+    return PeriodSelection(arrays, np.flatnonzero(mask))
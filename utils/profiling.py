@@ -0,0 +1,200 @@
+# profiling.py
+
+import cProfile
+import io
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+import streamlit as st
+from config import get_profile_mode, get_profile_log_level
+
+# 耗时分解写入本模块的日志；根日志默认为 WARNING 且没有处理器，这里单独挂一个标准错误处理器
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(get_profile_log_level())
+    logger.propagate = False
+
+# 各阶段对应的函数：(文件路径后缀, 函数名)，函数名为 None 时匹配该文件中的全部函数
+STAGES = [
+    ("Alist fetch", [("main.py", "fetch_file_list"), ("utils/file_manager.py", "fetch_file_list_from_alist")]),
+    # 下载在线程池中执行，脚本线程只在 wait_for_download 中等待，分析器统计的是这段等待
+    ("Download", [("main.py", "wait_for_download"), ("utils/file_manager.py", "download_file"),
+                  ("utils/download_manager.py", "fetch_to_file")]),
+    ("EPW parse", [("utils/data_loader.py", "unzip_and_load_epw"), ("utils/data_loader.py", "load_uploaded_epw"),
+                   ("ladybug/epw.py", "_import_data"), ("utils/epw_arrays.py", "read_epw_arrays")]),
+    ("Filtering", [("utils/period_filter.py", "select_period")]),
+    ("Colour mapping", [("utils/chart_generator.py", "color_levels")]),
+    ("Figure build", [("utils/chart_generator.py", None), ("plotly/graph_objs/_figure.py", None)]),
+    ("Serialization", [("streamlit/elements/plotly_chart.py", "plotly_chart"), ("streamlit/elements/deck_gl_json_chart.py", "pydeck_chart")]),
+]
+
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.005
+
+def _normalize(path):
+    return path.replace("\\", "/")
+
+def _stage_of(filename, function):
+    """返回函数所属的阶段名称，不属于任何阶段时返回 None。"""
+    filename = _normalize(filename)
+    for stage, matchers in STAGES:
+        for suffix, name in matchers:
+            if filename.endswith(suffix) and (name is None or name == function):
+                return stage
+    return None
+
+def get_profile_request():
+    """
+    判断本次重跑是否开启性能分析：查询参数 ?profile=1 / ?profile=sample，或环境变量 PROFILE_RERUNS。
+
+    Returns:
+        str: "cprofile"、"sample"，未开启时返回 None。
+    """
+    if hasattr(st, "query_params"):
+        value = st.query_params.get("profile")
+    else:
+        value = (st.experimental_get_query_params().get("profile") or [None])[0]
+    value = value or get_profile_mode()
+    if not value or value == "0":
+        return None
+    return "sample" if value == "sample" else "cprofile"
+
+def stage_breakdown_from_stats(stats):
+    """
+    由 cProfile 的统计结果计算各阶段耗时。
+
+    只累计从阶段外部进入该阶段函数的调用（按调用边的累计时间），阶段内部函数互相调用不重复计算。
+
+    Args:
+        stats (dict): cProfile.Profile 的 stats 字典（create_stats 之后）。
+
+    Returns:
+        dict: 阶段名称到耗时（秒）的映射。
+    """
+    breakdown = Counter()
+    for (filename, _, function), (_, _, _, _, callers) in stats.items():
+        stage = _stage_of(filename, function)
+        if stage is None:
+            continue
+        for (caller_file, _, caller_function), edge in callers.items():
+            if _stage_of(caller_file, caller_function) != stage:
+                breakdown[stage] += edge[3]
+    return dict(breakdown)
+
+class _Sampler:
+    """
+    采样分析器：后台线程按固定间隔读取目标线程的调用栈，
+    每个样本归入栈中最内层所属的阶段，并输出折叠栈（flamegraph/speedscope 格式）。
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stages = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rerun-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack, stage = [], None
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                if stage is None:
+                    stage = _stage_of(code.co_filename, code.co_name)
+                frame = frame.f_back
+            self.samples += 1
+            self.stacks[";".join(reversed(stack))] += 1
+            self.stages[stage or "Other"] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        """折叠栈文本，每行为 "栈;帧 样本数"。"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def format_breakdown(total, breakdown):
+    """
+    生成一行紧凑的耗时分解，例如 "total 1234 ms | Download 80 ms | EPW parse 300 ms | ..."。
+
+    Args:
+        total (float): 本次重跑总耗时（秒）。
+        breakdown (dict): 阶段名称到耗时（秒）的映射。
+
+    Returns:
+        str: 耗时分解文字。
+    """
+    parts = [f"total {total * 1000:.0f} ms"]
+    for stage, _ in STAGES + [("Other", None)]:
+        if stage in breakdown:
+            parts.append(f"{stage} {breakdown[stage] * 1000:.0f} ms")
+    return " | ".join(parts)
+
+@contextmanager
+def profiled_rerun():
+    """
+    对一次脚本重跑进行性能分析（未开启时不做任何事）。
+
+    结束后在日志中输出紧凑的阶段耗时分解，并在页面底部提供分析文件下载：
+    cProfile 模式为 .prof（可用 snakeviz、pstats 打开），采样模式为折叠栈 .folded。
+    """
+    mode = get_profile_request()
+    if mode is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    if mode == "sample":
+        profiler = _Sampler(threading.get_ident())
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    completed = False
+    try:
+        yield
+        completed = True
+    finally:
+        total = time.perf_counter() - start
+        if mode == "sample":
+            profiler.stop()
+            samples = max(profiler.samples, 1)
+            breakdown = {stage: count / samples * total for stage, count in profiler.stages.items()}
+            data, file_name = profiler.folded().encode("utf-8"), "rerun.folded"
+        else:
+            profiler.disable()
+            profiler.create_stats()
+            breakdown = stage_breakdown_from_stats(profiler.stats)
+            breakdown["Other"] = max(total - sum(breakdown.values()), 0.0)
+            data, file_name = marshal.dumps(profiler.stats), "rerun.prof"
+        summary = format_breakdown(total, breakdown)
+        logger.info("[profile:%s] %s", mode, summary)
+
+    # 脚本被中断（例如 st.stop 或重新运行）时只记录日志，不再输出页面元素
+    if completed:
+        with st.expander("性能分析/Rerun profile"):
+            st.code(summary.replace(" | ", "\n"))
+            st.download_button(
+                label="下载性能分析文件/Download profile",
+                data=io.BytesIO(data),
+                file_name=time.strftime("%Y%m%d-%H%M%S-") + file_name,
+                mime="application/octet-stream",
+            )
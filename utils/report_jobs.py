@@ -0,0 +1,156 @@
+# report_jobs.py
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import get_report_workers
+from utils import summary_store
+from utils.metrics import instrument, record_error
+from utils.openai_integration import LLM_ERROR_MESSAGE, generate_summary
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 等待语言模型期间进度条按经验耗时（秒）逐渐逼近上限，不代表真实进度
+TYPICAL_LLM_SECONDS = 30.0
+
+class ReportJob:
+    """
+    一份绿建气候报告的后台生成任务，按 (站点, 起始月份, 终止月份) 标识。
+
+    状态与进度由工作线程更新，页面每次重跑时读取；任务与会话无关，重跑或切换控件不会丢弃结果。
+    """
+
+    __slots__ = ("key", "status", "stage", "report", "error", "submitted_at", "started_at", "finished_at")
+
+    def __init__(self, key, status=QUEUED, report=None):
+        self.key = key
+        self.status = status
+        self.stage = "排队中/Queued" if status == QUEUED else ""
+        self.report = report
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = self.submitted_at if status == DONE else None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def progress(self):
+        """0–1 之间的进度（排队 0，等待语言模型期间按经验耗时估计，结束为 1）。"""
+        if self.finished:
+            return 1.0
+        if self.status == QUEUED or self.started_at is None:
+            return 0.0
+        elapsed = time.time() - self.started_at
+        return 0.1 + 0.85 * (1 - math.exp(-elapsed / TYPICAL_LLM_SECONDS))
+
+    @property
+    def elapsed(self):
+        """从提交到结束（或到现在）的秒数。"""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+_executor = None
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=get_report_workers(), thread_name_prefix="report")
+    return _executor
+
+def report_key(station_key, epw, start_month, end_month):
+    """
+    生成报告任务的标识；上传的文件没有站点标识，按文件内容摘要识别。
+
+    Args:
+        station_key (str): 仓库站点标识，为 None 时表示上传的文件。
+        epw (EPW): 加载的EPW对象。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+
+    Returns:
+        tuple: (站点标识, 起始月份, 终止月份)。
+    """
+    if station_key is None:
+        from utils.epw_arrays import file_digest
+        station_key = "upload:" + file_digest(epw.file_path)
+    return station_key, start_month, end_month
+
+def get_job(key):
+    """
+    查询某份报告的任务：优先返回进程内的任务（排队、运行中或失败），否则读取已持久化的报告。
+
+    Args:
+        key (tuple): (站点标识, 起始月份, 终止月份)。
+
+    Returns:
+        ReportJob: 任务，既没有任务也没有已生成的报告时返回 None。
+    """
+    with _jobs_lock:
+        job = _jobs.get(key)
+    if job is not None:
+        return job
+    report = summary_store.get_report(*key)
+    if report is None:
+        return None
+    return ReportJob(key, DONE, report)
+
+def submit_report(key, full_summary, geoinfo, regenerate=False):
+    """
+    提交报告生成任务；同一报告已在排队或运行时直接返回该任务（不重复调用语言模型）。
+
+    Args:
+        key (tuple): (站点标识, 起始月份, 终止月份)。
+        full_summary (str): 各模块总结文字（在会话线程中渲染好再提交）。
+        geoinfo (str): 地理编码（工作线程中没有会话状态，需要显式传入）。
+        regenerate (bool): 已有报告时是否重新生成。
+
+    Returns:
+        ReportJob: 新建或已存在的任务。
+    """
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and not job.finished:
+            return job
+        if not regenerate:
+            report = summary_store.get_report(*key)
+            if report is not None:
+                return ReportJob(key, DONE, report)
+        job = ReportJob(key)
+        _jobs[key] = job
+        _get_executor().submit(_run_job, job, full_summary, geoinfo)
+    return job
+
+@instrument("report_job")
+def _run_job(job, full_summary, geoinfo):
+    job.status = RUNNING
+    job.stage = "生成报告中/Generating report"
+    job.started_at = time.time()
+    try:
+        report = generate_summary(full_summary, geoinfo)
+        if report == LLM_ERROR_MESSAGE:
+            raise RuntimeError(report)
+        summary_store.put_report(*job.key, report)
+    except Exception as e:
+        record_error("report_job", type(e).__name__)
+        job.error = str(e)
+        job.status = FAILED
+        job.stage = "生成失败/Failed"
+    else:
+        job.report = report
+        job.status = DONE
+        job.stage = "已完成/Done"
+        # 报告已持久化，进程内只保留未完成与失败的任务
+        with _jobs_lock:
+            if _jobs.get(job.key) is job:
+                del _jobs[job.key]
+    finally:
+        job.finished_at = time.time()
@@ -0,0 +1,87 @@
+# single_flight.py
+
+import functools
+import threading
+from utils.metrics import record_coalesced
+
+class _Call:
+    """一次进行中的调用：先到的请求执行，后到的相同请求等待其完成并复用结果（或异常）。"""
+
+    __slots__ = ("done", "result", "error", "completed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.completed = False
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+def single_flight(operation, key, compute):
+    """
+    合并并发的相同调用：同一 (operation, key) 正在执行时，后到的请求等待其完成并共享结果，不再重复执行。
+
+    只合并同时进行的调用，调用结束后不保留结果（缓存仍由各调用方自己负责）。
+    只共享返回值与 Exception；先到的请求因 BaseException（例如 Streamlit 的重跑、停止）中断时，
+    该异常只在它自己的线程中抛出，等待者被唤醒后由其中一个重新执行。
+
+    Args:
+        operation (str): 操作名称（同时用作指标标签），例如 "download"、"epw_parse"、"llm"。
+        key (hashable): 请求标识。
+        compute (callable): 无参数的执行函数。
+
+    Returns:
+        object: compute 的返回值（合并的请求拿到的是同一个对象）。
+    """
+    flight_key = (operation, key)
+    coalesced = False
+    while True:
+        with _calls_lock:
+            call = _calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = _calls[flight_key] = _Call()
+
+        if leader:
+            break
+        if not coalesced:
+            record_coalesced(operation)
+            coalesced = True
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        if call.completed:
+            return call.result
+        # 先到的请求被中断，没有结果可共享，重新竞争执行
+
+    try:
+        call.result = compute()
+        call.completed = True
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            del _calls[flight_key]
+        call.done.set()
+
+def coalesce(operation, key=None):
+    """
+    装饰器：对函数调用做 single_flight 合并。
+
+    Args:
+        operation (str): 操作名称。
+        key (callable): 由调用参数生成请求标识的函数，默认使用全部位置参数与关键字参数。
+
+    Returns:
+        callable: 装饰器。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            flight_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return single_flight(operation, flight_key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
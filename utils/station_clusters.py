@@ -0,0 +1,132 @@
+# station_clusters.py
+
+import threading
+import numpy as np
+from cachetools import LRUCache
+
+# deck.gl 的 Web 墨卡托视图在 0 级缩放时整个世界宽 512 像素
+TILE_SIZE = 512
+
+# 每个瓦片划分为 CELLS_PER_TILE × CELLS_PER_TILE 个聚合网格（每格约 64 像素）
+CELLS_PER_TILE = 8
+
+# 允许的最大缩放级别（此时一个网格约 1 km，基本只含单个站点）
+MAX_ZOOM = 14
+
+_mercator_cache = LRUCache(maxsize=8)
+_tile_cache = LRUCache(maxsize=4096)
+_cache_lock = threading.Lock()
+
+def _mercator(latitudes, longitudes):
+    """经纬度转换为 Web 墨卡托的归一化坐标（x、y 均在 [0, 1) 内，y 向南增大）。"""
+    lat = np.clip(np.asarray(latitudes, dtype=np.float64), -85.05112878, 85.05112878)
+    lon = np.asarray(longitudes, dtype=np.float64)
+    x = (lon + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.deg2rad(lat) / 2)) / (2 * np.pi)
+    return np.mod(x, 1.0), np.clip(y, 0.0, np.nextafter(1.0, 0.0))
+
+def _index_mercator(index):
+    """站点索引的墨卡托坐标（按索引版本缓存）。"""
+    key = index.cache_key
+    with _cache_lock:
+        cached = _mercator_cache.get(key) if key is not None else None
+    if cached is None:
+        cached = _mercator(index.latitudes, index.longitudes)
+        if key is not None:
+            with _cache_lock:
+                _mercator_cache[key] = cached
+    return cached
+
+def aggregate_tile(index, zoom, tile_x, tile_y):
+    """
+    将一个瓦片内的站点按网格聚合（按索引版本、缩放级别与瓦片缓存）。
+
+    Args:
+        index (StationIndex): 站点空间索引。
+        zoom (int): 缩放级别。
+        tile_x (int): 瓦片列号（0 到 2^zoom - 1）。
+        tile_y (int): 瓦片行号（0 到 2^zoom - 1）。
+
+    Returns:
+        list: 聚合点字典列表，包含 latitude、longitude、count、name、path（仅单站点时有路径）。
+    """
+    key = (index.cache_key, zoom, tile_x, tile_y)
+    with _cache_lock:
+        cached = _tile_cache.get(key) if index.cache_key is not None else None
+    if cached is not None:
+        return cached
+
+    tiles = 2 ** zoom
+    x, y = _index_mercator(index)
+    local_x = x * tiles - tile_x
+    local_y = y * tiles - tile_y
+    inside = np.flatnonzero((local_x >= 0) & (local_x < 1) & (local_y >= 0) & (local_y < 1))
+
+    clusters = []
+    if len(inside):
+        cells = (np.floor(local_y[inside] * CELLS_PER_TILE) * CELLS_PER_TILE + np.floor(local_x[inside] * CELLS_PER_TILE)).astype(np.int64)
+        _, first, groups, counts = np.unique(cells, return_index=True, return_inverse=True, return_counts=True)
+        latitudes = np.bincount(groups, weights=index.latitudes[inside]) / counts
+        longitudes = np.bincount(groups, weights=index.longitudes[inside]) / counts
+        for i, count in enumerate(counts):
+            station = inside[first[i]]
+            single = count == 1
+            clusters.append({
+                "latitude": float(latitudes[i]),
+                "longitude": float(longitudes[i]),
+                "count": int(count),
+                "name": str(index.names[station]) if single else f"{count} 个站点/stations（{latitudes[i]:.2f}, {longitudes[i]:.2f}）",
+                "path": str(index.paths[station]) if single else "",
+            })
+
+    if index.cache_key is not None:
+        with _cache_lock:
+            _tile_cache[key] = clusters
+    return clusters
+
+def visible_tiles(latitude, longitude, zoom, width=1200, height=500, margin=1):
+    """
+    计算视图范围内（四周再各扩展 margin 个瓦片）的瓦片编号。
+
+    Args:
+        latitude (float): 视图中心纬度。
+        longitude (float): 视图中心经度。
+        zoom (int): 缩放级别。
+        width (int): 视图宽度（像素）。
+        height (int): 视图高度（像素）。
+        margin (int): 额外扩展的瓦片数，便于在浏览器中小范围平移。
+
+    Returns:
+        list: (tile_x, tile_y) 元组列表。
+    """
+    tiles = 2 ** zoom
+    x, y = _mercator([latitude], [longitude])
+    center_x, center_y = x[0] * tiles * TILE_SIZE, y[0] * tiles * TILE_SIZE
+    x_first = int(np.floor((center_x - width / 2) / TILE_SIZE)) - margin
+    x_last = int(np.floor((center_x + width / 2) / TILE_SIZE)) + margin
+    y_first = max(int(np.floor((center_y - height / 2) / TILE_SIZE)) - margin, 0)
+    y_last = min(int(np.floor((center_y + height / 2) / TILE_SIZE)) + margin, tiles - 1)
+    # 经度方向首尾相接，瓦片数不足时避免重复
+    columns = sorted({column % tiles for column in range(x_first, x_last + 1)})
+    return [(column, row) for row in range(y_first, y_last + 1) for column in columns]
+
+def visible_clusters(index, latitude, longitude, zoom, width=1200, height=500):
+    """
+    获取视图范围内的站点聚合点，只把可见瓦片的聚合结果发送到浏览器。
+
+    Args:
+        index (StationIndex): 站点空间索引。
+        latitude (float): 视图中心纬度。
+        longitude (float): 视图中心经度。
+        zoom (int): 缩放级别（0 到 MAX_ZOOM）。
+        width (int): 视图宽度（像素）。
+        height (int): 视图高度（像素）。
+
+    Returns:
+        list: 聚合点字典列表。
+    """
+    zoom = int(min(max(zoom, 0), MAX_ZOOM))
+    clusters = []
+    for tile_x, tile_y in visible_tiles(latitude, longitude, zoom, width, height):
+        clusters.extend(aggregate_tile(index, zoom, tile_x, tile_y))
+    return clusters
@@ -0,0 +1,180 @@
+# station_index.py
+
+import io
+import os
+import threading
+import zipfile
+import numpy as np
+from scipy.spatial import cKDTree
+from config import get_station_index_path
+
+EARTH_RADIUS_KM = 6371.0088
+
+def parse_location_line(line):
+    """
+    解析 EPW 头部的 LOCATION 行。
+
+    Args:
+        line (str): LOCATION 行，例如 "LOCATION,Xian,SN,CHN,CSWD,570360,34.30,108.93,8.0,398.0"。
+
+    Returns:
+        dict: 包含 city、country、wmo、latitude、longitude、elevation 的字典。
+    """
+    parts = [p.strip() for p in line.strip().split(",")]
+    return {
+        "city": parts[1],
+        "country": parts[3],
+        "wmo": parts[5],
+        "latitude": float(parts[6]),
+        "longitude": float(parts[7]),
+        "elevation": float(parts[9]) if len(parts) > 9 and parts[9] else 0.0,
+    }
+
+def read_zip_location(zip_file):
+    """
+    从站点 ZIP 中读取 EPW 的 LOCATION 行，只解压首行，不读取数据部分。
+
+    Args:
+        zip_file (str or bytes): ZIP 文件路径或内容。
+
+    Returns:
+        dict: parse_location_line 的结果。
+    """
+    source = io.BytesIO(zip_file) if isinstance(zip_file, bytes) else zip_file
+    with zipfile.ZipFile(source) as zip_ref:
+        epw_name = next(name for name in zip_ref.namelist() if name.lower().endswith(".epw"))
+        with zip_ref.open(epw_name) as f:
+            return parse_location_line(f.readline().decode("utf-8", errors="ignore"))
+
+def _to_unit_xyz(latitudes, longitudes):
+    """经纬度转换为单位球面上的三维坐标，使欧氏（弦长）距离与大圆距离单调对应。"""
+    lat = np.deg2rad(np.asarray(latitudes, dtype=np.float64))
+    lon = np.deg2rad(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+def _chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2.0, 1.0))
+
+def _km_to_chord(distance_km):
+    return 2.0 * np.sin(np.minimum(distance_km / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+class StationIndex:
+    """
+    站点经纬度的空间索引：在单位球面三维坐标上建立 KD 树，支持 k 近邻与半径查询。
+    """
+
+    __slots__ = ("paths", "names", "latitudes", "longitudes", "elevations", "tree", "cache_key")
+
+    def __init__(self, paths, names, latitudes, longitudes, elevations):
+        self.paths = np.asarray(paths, dtype=str)
+        self.names = np.asarray(names, dtype=str)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.elevations = np.asarray(elevations, dtype=np.float64)
+        self.tree = cKDTree(_to_unit_xyz(self.latitudes, self.longitudes))
+        # 由 load_station_index 设置为 (路径, 修改时间)，供按索引版本缓存的计算使用
+        self.cache_key = None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _results(self, indices, chords):
+        return [
+            {
+                "path": self.paths[i],
+                "name": self.names[i],
+                "latitude": self.latitudes[i],
+                "longitude": self.longitudes[i],
+                "elevation": self.elevations[i],
+                "distance_km": float(_chord_to_km(chord)),
+            }
+            for i, chord in zip(indices, chords)
+        ]
+
+    def nearest(self, latitude, longitude, k=5):
+        """
+        查询距离某点最近的 k 个站点。
+
+        Args:
+            latitude (float): 纬度。
+            longitude (float): 经度。
+            k (int): 返回的站点数。
+
+        Returns:
+            list: 按距离由近到远排列的站点字典列表（含 path、name、distance_km 等）。
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return []
+        chords, indices = self.tree.query(_to_unit_xyz([latitude], [longitude])[0], k=k)
+        return self._results(np.atleast_1d(indices), np.atleast_1d(chords))
+
+    def within(self, latitude, longitude, radius_km):
+        """
+        查询某点一定半径内的全部站点。
+
+        Args:
+            latitude (float): 纬度。
+            longitude (float): 经度。
+            radius_km (float): 查询半径（km）。
+
+        Returns:
+            list: 按距离由近到远排列的站点字典列表。
+        """
+        point = _to_unit_xyz([latitude], [longitude])[0]
+        indices = np.asarray(self.tree.query_ball_point(point, _km_to_chord(radius_km)), dtype=np.int64)
+        chords = np.linalg.norm(self.tree.data[indices] - point, axis=1)
+        order = np.argsort(chords)
+        return self._results(indices[order], chords[order])
+
+def save_station_index(index, path=None):
+    """
+    将站点目录写入磁盘（KD 树在加载时由坐标重建，数万个站点只需几毫秒）。
+
+    Args:
+        index (StationIndex): 站点索引。
+        path (str): 输出路径，默认使用 config 中的 STATION_INDEX_PATH。
+    """
+    path = path or get_station_index_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(
+        temp_path,
+        paths=index.paths,
+        names=index.names,
+        latitudes=index.latitudes,
+        longitudes=index.longitudes,
+        elevations=index.elevations,
+    )
+    os.replace(temp_path, path)
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+def load_station_index(path=None):
+    """
+    读取站点空间索引，按文件修改时间缓存，索引文件更新后自动重新加载。
+
+    Args:
+        path (str): 索引路径，默认使用 config 中的 STATION_INDEX_PATH。
+
+    Returns:
+        StationIndex: 站点索引，索引文件不存在时返回 None。
+    """
+    path = path or get_station_index_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _index_lock:
+        cached = _index_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with np.load(path) as data:
+        index = StationIndex(data["paths"], data["names"], data["latitudes"], data["longitudes"], data["elevations"])
+    index.cache_key = (path, mtime)
+    with _index_lock:
+        _index_cache[path] = (mtime, index)
+    return index
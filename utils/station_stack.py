@@ -0,0 +1,261 @@
+# station_stack.py
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from config import get_stack_cache_dir, get_stack_cache_max_bytes
+from utils.epw_arrays import load_epw_arrays, file_digest
+
+# 多站点对比使用的字段（堆叠数组最后一维的顺序）
+COMPARISON_FIELDS = [
+    "dry_bulb_temperature",
+    "dew_point_temperature",
+    "relative_humidity",
+    "wind_direction",
+    "wind_speed",
+    "total_sky_cover",
+    "global_horizontal_radiation",
+]
+
+HOURS_PER_YEAR = 8760
+# 堆叠数组的格式版本，逐时对齐方式变化时递增，使旧缓存文件不再命中
+_STACK_VERSION = "2"
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+class StationStack:
+    """
+    多个站点的堆叠数组，形状为（站点 × 小时 × 字段），统一对齐到非闰年逐时的 8760 小时。
+
+    data 可能是只读的内存映射数组，按字段取出的数组是跨步视图，不复制数据。
+    """
+
+    __slots__ = ("names", "fields", "data", "month", "day_of_year", "hour")
+
+    def __init__(self, names, fields, data):
+        self.names = list(names)
+        self.fields = list(fields)
+        self.data = data
+        self.month = np.repeat(np.arange(1, 13), _DAYS_IN_MONTH * 24)
+        self.day_of_year = np.arange(HOURS_PER_YEAR) // 24 + 1
+        self.hour = np.tile(np.arange(24), HOURS_PER_YEAR // 24)
+
+    def __len__(self):
+        return len(self.names)
+
+    def values(self, field):
+        """
+        获取全部站点某字段的数组。
+
+        Args:
+            field (str): 字段名。
+
+        Returns:
+            numpy.ndarray: 形状为（站点 × 小时）的数组视图。
+        """
+        return self.data[:, :, self.fields.index(field)]
+
+def _hourly_values(arrays, field):
+    """
+    将单个站点的字段对齐到非闰年逐时：子小时数据按 EPWArrays.hourly_values 归并为逐时，闰年去掉 2 月 29 日。
+
+    Args:
+        arrays (EPWArrays): 站点数组数据。
+        field (str): 字段名。
+
+    Returns:
+        numpy.ndarray: 长度为 8760 的数组。
+    """
+    values = arrays.hourly_values(field)
+    if arrays.is_leap_year:
+        month, day = arrays.month[::arrays.timestep], arrays.day[::arrays.timestep]
+        values = values[~((month == 2) & (day == 29))]
+    return values
+
+def _evict_stacks(cache_dir, max_bytes, keep):
+    """
+    按最近访问时间淘汰缓存目录中最旧的 .npy 文件，直到总大小降到预算的 90% 以下。
+
+    Args:
+        cache_dir (str): 缓存目录。
+        max_bytes (int): 字节预算。
+        keep (str): 不淘汰的文件路径（刚写入、即将映射的缓存）。
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if not entry.name.endswith(".npy") or entry.path == keep:
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+    target = max_bytes * 0.9
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            # 其他会话已映射的文件在 POSIX 上删除后仍可继续读取
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+def build_station_stack(epw_paths, names=None, fields=COMPARISON_FIELDS, cache_dir=None):
+    """
+    将多个 EPW 读入一个（站点 × 小时 × 字段）的堆叠数组。
+
+    结果写入缓存目录下的 .npy 文件并以内存映射方式打开，相同站点组合再次对比时直接映射已有文件，
+    不再解析 EPW；缓存目录超出 STACK_CACHE_MAX_BYTES 时淘汰最久未用的文件，不可写时退回内存数组。
+
+    Args:
+        epw_paths (list): EPW 文件路径列表。
+        names (list): 站点显示名称，默认使用文件名。
+        fields (list): 需要堆叠的字段。
+        cache_dir (str): 缓存目录，默认使用 config 中的 STACK_CACHE_DIR。
+
+    Returns:
+        StationStack: 堆叠数组。
+    """
+    names = names or [os.path.splitext(os.path.basename(path))[0] for path in epw_paths]
+    cache_dir = cache_dir or get_stack_cache_dir()
+    key = hashlib.sha1("|".join([_STACK_VERSION] + [file_digest(path) for path in epw_paths] + list(fields)).encode("utf-8")).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.npy")
+
+    if os.path.exists(cache_path):
+        try:
+            # 命中时更新修改时间，淘汰按最近访问的顺序进行
+            os.utime(cache_path)
+            return StationStack(names, fields, np.load(cache_path, mmap_mode="r"))
+        except OSError:
+            pass
+
+    shape = (len(epw_paths), HOURS_PER_YEAR, len(fields))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        data = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float64, shape=shape)
+    except OSError:
+        temp_path, data = None, np.empty(shape)
+
+    for i, path in enumerate(epw_paths):
+        arrays = load_epw_arrays(path)
+        for j, field in enumerate(fields):
+            data[i, :, j] = _hourly_values(arrays, field)
+
+    if temp_path is None:
+        return StationStack(names, fields, data)
+    data.flush()
+    del data
+    # 先写临时文件再改名，避免并发会话读到写了一半的缓存
+    os.replace(temp_path, cache_path)
+    _evict_stacks(cache_dir, get_stack_cache_max_bytes(), cache_path)
+    return StationStack(names, fields, np.load(cache_path, mmap_mode="r"))
+
+def _grouped_means(values, index, size):
+    """
+    对（站点 × 小时）数组按小时索引分组求均值，所有站点在一次 bincount 中完成。
+
+    Args:
+        values (numpy.ndarray): 形状为（站点 × 小时）的数组。
+        index (numpy.ndarray): 长度为小时数的分组索引（0 到 size - 1）。
+        size (int): 分组数。
+
+    Returns:
+        numpy.ndarray: 形状为（站点 × 分组）的均值。
+    """
+    stations = values.shape[0]
+    keys = (np.arange(stations)[:, None] * size + index[None, :]).ravel()
+    sums = np.bincount(keys, weights=np.ascontiguousarray(values).ravel(), minlength=stations * size)
+    counts = np.bincount(index, minlength=size)
+    return sums.reshape(stations, size) / np.maximum(counts, 1)
+
+def monthly_means(stack, field):
+    """
+    计算全部站点某字段的月均值。
+
+    Args:
+        stack (StationStack): 堆叠数组。
+        field (str): 字段名。
+
+    Returns:
+        pandas.DataFrame: 行为站点、列为月份（1–12）。
+    """
+    means = _grouped_means(stack.values(field), stack.month - 1, 12)
+    return pd.DataFrame(means, index=stack.names, columns=pd.Index(range(1, 13), name="Month"))
+
+def daily_means(stack, field, months=None):
+    """
+    计算全部站点某字段的日均值。
+
+    Args:
+        stack (StationStack): 堆叠数组。
+        field (str): 字段名。
+        months (list): 只保留这些月份的日期，None 表示全年。
+
+    Returns:
+        pandas.DataFrame: 行为站点、列为年积日。
+    """
+    means = _grouped_means(stack.values(field), stack.day_of_year - 1, 365)
+    days = np.arange(1, 366)
+    if months is not None:
+        day_months = stack.month[::24]
+        keep = np.isin(day_months, months)
+        means, days = means[:, keep], days[keep]
+    return pd.DataFrame(means, index=stack.names, columns=pd.Index(days, name="Day"))
+
+def passive_strategy_percentages(stack):
+    """
+    计算全部站点各被动策略的小时占比。
+
+    Args:
+        stack (StationStack): 堆叠数组。
+
+    Returns:
+        pandas.DataFrame: 行为站点、列为被动策略，单位为 %。
+    """
+    from charts.passive_strategies_chart import PASSIVE_STRATEGY_STATES, count_passive_strategies
+
+    counts = count_passive_strategies(
+        stack.values("dry_bulb_temperature"),
+        stack.values("relative_humidity") / 100.0,
+        stack.values("dew_point_temperature"),
+    )
+    return pd.DataFrame(counts / HOURS_PER_YEAR * 100, index=stack.names, columns=PASSIVE_STRATEGY_STATES)
+
+def wind_statistics(stack, direction_count=32, calm_threshold=0.5):
+    """
+    计算全部站点的风况统计：年均风速、最大月均风速、静风小时占比与盛行风向。
+
+    盛行风向的分箱方式与 ladybug 的 WindRose 一致，所有站点在一次 bincount 中统计。
+
+    Args:
+        stack (StationStack): 堆叠数组。
+        direction_count (int): 风向分箱数。
+        calm_threshold (float): 静风风速阈值（m/s）。
+
+    Returns:
+        pandas.DataFrame: 行为站点的风况统计表。
+    """
+    speeds = stack.values("wind_speed")
+    directions = stack.values("wind_direction")
+    stations = len(stack)
+
+    width = 360.0 / direction_count
+    windy = (speeds > 1e-10) & np.isfinite(directions)
+    bins = np.floor((np.mod(np.nan_to_num(directions), 360.0) + width / 2) / width).astype(np.int64) % direction_count
+    keys = np.arange(stations)[:, None] * direction_count + bins
+    counts = np.bincount(keys[windy], minlength=stations * direction_count).reshape(stations, direction_count)
+
+    return pd.DataFrame(
+        {
+            "mean_speed": speeds.mean(axis=1),
+            "max_monthly_mean_speed": _grouped_means(speeds, stack.month - 1, 12).max(axis=1),
+            "calm_percentage": (speeds <= calm_threshold).mean(axis=1) * 100,
+            "prevailing_direction": counts.argmax(axis=1) * width,
+        },
+        index=stack.names,
+    )
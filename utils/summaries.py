@@ -0,0 +1,407 @@
+# summaries.py
+
+from dataclasses import dataclass, fields
+
+# 各图表模块的名称（同时用作 utils/summary_store 中的模块名）
+TEMPERATURE = "temperature"
+HUMIDITY = "humidity"
+WIND = "wind"
+SKY_COVER = "sky_cover"
+RADIATION = "radiation"
+ILLUMINANCE = "illuminance"
+DEGREE_DAYS = "degree_days"
+DESIGN_CONDITIONS = "design_conditions"
+PASSIVE_STRATEGIES = "passive_strategies"
+
+# 整列缺测时提示中的字段名称（{variant} 为辐射/照度类型）
+_UNAVAILABLE_FIELDS = {
+    TEMPERATURE: "干球温度",
+    HUMIDITY: "相对湿度",
+    WIND: "风速",
+    SKY_COVER: "天空覆盖量",
+    RADIATION: "{variant}辐射",
+    ILLUMINANCE: "{variant}照度",
+    DEGREE_DAYS: "干球温度",
+    DESIGN_CONDITIONS: "干球温度、相对湿度或露点温度",
+    PASSIVE_STRATEGIES: "干球温度、相对湿度或露点温度",
+}
+
+WIND_DIRECTION_NAMES = ["北", "北偏东", "东北", "东偏北",
+                        "东", "东偏南", "东南", "南偏东",
+                        "南", "南偏西", "西南", "西偏南",
+                        "西", "西偏北", "西北", "北偏西"]
+
+def get_wind_direction_name(degrees):
+    """
+    将风向度数转换为可读的风向名称。
+
+    Args:
+        degrees (list): 风向度数列表（取第一个元素）。
+
+    Returns:
+        str: 风向名称。
+    """
+    degree_val = degrees[0]
+    index = round((((degree_val + 11.25) % 360) - 11.25) / 22.5)
+    return WIND_DIRECTION_NAMES[index % 16]
+
+@dataclass(frozen=True, slots=True)
+class ClimateSummary:
+    """
+    单个气象字段的统计结果（温度、湿度、天空覆盖量、辐射、照度）。
+
+    全年部分为逐月均值的统计，所选时段部分为逐日均值的统计；
+    温度额外记录各温度区间的月数与天数。文字只在显示或发送给 AI 时才生成。
+    """
+    module: str
+    variant: str
+    annual_mean: float
+    max_month: int
+    max_value: float
+    min_month: int
+    min_value: float
+    period_mean: float
+    period_max: float
+    period_min: float
+    month_bands: tuple = ()
+    day_bands: tuple = ()
+
+    @property
+    def difference(self):
+        """最高月与最低月均值之差。"""
+        return self.max_value - self.min_value
+
+    def monthly_text(self):
+        """全年统计的文字描述。"""
+        return _MONTHLY_TEMPLATES[self.module](self)
+
+    def daily_text(self):
+        """所选时段统计的文字描述。"""
+        return _DAILY_TEMPLATES[self.module](self)
+
+    def render(self):
+        return f"{self.monthly_text()}\n{self.daily_text()}"
+
+    def __str__(self):
+        return self.render()
+
+@dataclass(frozen=True, slots=True)
+class WindSummary(ClimateSummary):
+    """风速统计结果，额外记录所选时段与全年的盛行风向（度）。"""
+    prevailing_month: float = 0.0
+    prevailing_year: float = 0.0
+
+    def prevailing_month_text(self):
+        return "该城市的月盛行风向" + get_wind_direction_name([self.prevailing_month])
+
+    def prevailing_year_text(self):
+        return "该城市的年盛行风向" + get_wind_direction_name([self.prevailing_year])
+
+@dataclass(frozen=True, slots=True)
+class DegreeDaysSummary:
+    """度日数与度时数统计结果。"""
+    base_heating: float
+    base_cooling: float
+    hdd: float
+    cdd: float
+    hdh: float
+    cdh: float
+    max_hdd_month: int
+    max_hdd: float
+    max_cdd_month: int
+    max_cdd: float
+    period_hdd: float
+    period_cdd: float
+    heating_days: int
+    cooling_days: int
+
+    def monthly_text(self):
+        return (
+            f"以{self.base_heating:.1f}°C为供暖基准温度、{self.base_cooling:.1f}°C为制冷基准温度，"
+            f"全年供暖度日数(HDD)为{self.hdd:.0f}°C·d，制冷度日数(CDD)为{self.cdd:.0f}°C·d，"
+            f"全年供暖度时数为{self.hdh:.0f}°C·h，制冷度时数为{self.cdh:.0f}°C·h，"
+            f"供暖度日数最多的月份是{self.max_hdd_month}月，为{self.max_hdd:.0f}°C·d，"
+            f"制冷度日数最多的月份是{self.max_cdd_month}月，为{self.max_cdd:.0f}°C·d"
+        )
+
+    def daily_text(self):
+        return (
+            f"当前月份的供暖度日数为{self.period_hdd:.0f}°C·d，制冷度日数为{self.period_cdd:.0f}°C·d，"
+            f"日均温低于供暖基准温度的天数为{self.heating_days}天，日均温高于制冷基准温度的天数为{self.cooling_days}天"
+        )
+
+    def render(self):
+        return f"{self.monthly_text()}\n{self.daily_text()}"
+
+    def __str__(self):
+        return self.render()
+
+@dataclass(frozen=True, slots=True)
+class PassiveStrategiesSummary:
+    """各被动策略的小时占比（%），顺序与 PASSIVE_STRATEGY_STATES 一致。"""
+    percentages: tuple
+
+    def render(self):
+        from charts.passive_strategies_chart import PASSIVE_STRATEGY_STATES
+        return "".join(f"{state} 占比 {percentage:.2f}%\n" for state, percentage in zip(PASSIVE_STRATEGY_STATES, self.percentages))
+
+    def __str__(self):
+        return self.render()
+
+@dataclass(frozen=True, slots=True)
+class DesignConditionsSummary:
+    """设计工况（°C），按（DESIGN_VARIABLES × DESIGN_LEVELS）排列。"""
+    values: tuple
+
+    def render(self):
+        from charts.design_conditions_chart import DESIGN_LEVELS, DESIGN_VARIABLES
+        return "".join(
+            f"{label}：" + "，".join(f"{level}为{value:.1f}°C" for (level, _), value in zip(DESIGN_LEVELS, row)) + "\n"
+            for (_, label), row in zip(DESIGN_VARIABLES, self.values)
+        )
+
+    def __str__(self):
+        return self.render()
+
+@dataclass(frozen=True, slots=True)
+class ComparisonSummary:
+    """多站点对比结果，按列存储（每个字段为与 names 对齐的元组）。"""
+    names: tuple = ()
+    annual_mean: tuple = ()
+    hottest_month: tuple = ()
+    hottest_value: tuple = ()
+    coldest_month: tuple = ()
+    coldest_value: tuple = ()
+    period_mean: tuple = ()
+    humidity_mean: tuple = ()
+    wind_mean: tuple = ()
+    prevailing_direction: tuple = ()
+    calm_percentage: tuple = ()
+    top_strategy: tuple = ()
+    top_strategy_percentage: tuple = ()
+
+    def render(self):
+        return "".join(
+            f"{self.names[i]}：年平均温度{self.annual_mean[i]:.2f}°C，"
+            f"最热月{self.hottest_month[i]}月{self.hottest_value[i]:.2f}°C，"
+            f"最冷月{self.coldest_month[i]}月{self.coldest_value[i]:.2f}°C，"
+            f"当前月份日均温{self.period_mean[i]:.2f}°C，"
+            f"年平均相对湿度{self.humidity_mean[i]:.2f}%，"
+            f"年平均风速{self.wind_mean[i]:.2f} m/s，盛行风向{self.prevailing_direction[i]:.1f}°，"
+            f"静风占比{self.calm_percentage[i]:.2f}%，"
+            f"占比最高的被动策略为{self.top_strategy[i]}（{self.top_strategy_percentage[i]:.2f}%）\n"
+            for i in range(len(self.names))
+        )
+
+    def __str__(self):
+        return self.render()
+
+@dataclass(frozen=True, slots=True)
+class UnavailableSummary:
+    """整列缺测、无法统计时的占位结果。"""
+    module: str
+    variant: str = ""
+
+    def render(self):
+        return "该站点缺少" + _UNAVAILABLE_FIELDS[self.module].format(variant=self.variant) + "数据"
+
+    def monthly_text(self):
+        return self.render()
+
+    def daily_text(self):
+        return ""
+
+    def __str__(self):
+        return self.render()
+
+def _temperature_monthly(s):
+    extreme_cold, cold, cool, mild, warm, hot, very_hot, extreme_hot = s.month_bands
+    return (
+        f"从全年来看，总的平均温度是{s.annual_mean:.2f}°C，"
+        f"最高温度出现在{s.max_month}月，为{s.max_value:.2f}°C，"
+        f"最低温度出现在{s.min_month}月，为{s.min_value:.2f}°C，"
+        f"最冷月与最暖月之间的温差为{s.difference:.2f}°C，"
+        f"极寒温度的月份数量为{extreme_cold}个月，寒冷温度的月份数量为{cold}个月"
+        f"凉爽温度的月份数量为{cool}个月，温和温度的月份数量为{mild}个月，"
+        f"温暖温度的月份数量为{warm}个月，炎热温度的月份数量为{hot}个月，十分炎热温度的月份数量为{very_hot}个月"
+        f"极热温度的月份数量为{extreme_hot}个月"
+    )
+
+def _temperature_daily(s):
+    extreme_cold, very_cold, cold, cool, mild, moderate, warm, hot, extreme_hot = s.day_bands
+    return (
+        f"当前月份的平均温度是{s.period_mean:.2f}°C，"
+        f"最高温度是{s.period_max:.2f}°C，最低温度是{s.period_min:.2f}°C，"
+        f"极寒温度的天气有{extreme_cold}天，十分寒冷温度的天气有{very_cold}天，寒冷温度的天气有{cold}天，"
+        f"冷温度的天气有{cool}天，凉爽温度的天气有{mild}天，"
+        f"温和温度的天气有{moderate}天，温暖温度的天气有{warm}天，"
+        f"炎热温度的天气有{hot}天，极热温度的天气有{extreme_hot}天"
+    )
+
+def _humidity_monthly(s):
+    return (
+        f"从全年来看，总的平均相对湿度是{s.annual_mean:.2f}%，"
+        f"最高相对湿度出现在{s.max_month}月，为{s.max_value:.2f}%，"
+        f"最低相对湿度出现在{s.min_month}月，为{s.min_value:.2f}%，"
+        f"最高湿度月与最低湿度月之间的相对湿度差为{s.difference:.2f}%"
+    )
+
+def _humidity_daily(s):
+    return (
+        f"当前月份的平均相对湿度是{s.period_mean:.2f}%，"
+        f"最高相对湿度是{s.period_max:.2f}%，最低相对湿度是{s.period_min:.2f}%"
+    )
+
+def _wind_monthly(s):
+    return (
+        f"从全年来看，总的平均风速是{s.annual_mean:.2f} m/s，"
+        f"最高风速出现在{s.max_month}月，为{s.max_value:.2f} m/s，"
+        f"最低风速出现在{s.min_month}月，为{s.min_value:.2f} m/s，"
+        f"最高风速月与最低风速月之间的风速差值为{s.difference:.2f} m/s"
+    )
+
+def _wind_daily(s):
+    return (
+        f"当前月份的平均风速是{s.period_mean:.2f} m/s，"
+        f"最高风速是{s.period_max:.2f} m/s，最低风速是{s.period_min:.2f} m/s"
+    )
+
+def _sky_cover_monthly(s):
+    return (
+        f"从全年来看，总的平均天空覆盖量是{s.annual_mean:.2f}，"
+        f"最高天空覆盖量出现在{s.max_month}月，为{s.max_value:.2f}，"
+        f"最低天空覆盖量出现在{s.min_month}月，为{s.min_value:.2f}，"
+        f"最高覆盖量月与最低覆盖量月之间的覆盖量差为{s.difference:.2f}"
+    )
+
+def _sky_cover_daily(s):
+    return (
+        f"当前月份的平均天空覆盖量是{s.period_mean:.2f}，"
+        f"最高天空覆盖量是{s.period_max:.2f}，最低天空覆盖量是{s.period_min:.2f}"
+    )
+
+def _radiation_monthly(s):
+    return (
+        f"从全年来看，总的平均{s.variant}辐射是{s.annual_mean:.2f} W/m²，"
+        f"最高{s.variant}辐射出现在{s.max_month}月，为{s.max_value:.2f} W/m²，"
+        f"最低{s.variant}辐射出现在{s.min_month}月，为{s.min_value:.2f} W/m²，"
+        f"最高辐射月与最低辐射月之间的{s.variant}辐射差为{s.difference:.2f} W/m²"
+    )
+
+def _radiation_daily(s):
+    return (
+        f"当前月份的平均{s.variant}辐射是{s.period_mean:.2f} W/m²，"
+        f"最高{s.variant}辐射是{s.period_max:.2f} W/m²，最低{s.variant}辐射是{s.period_min:.2f} W/m²"
+    )
+
+def _illuminance_monthly(s):
+    return (
+        f"从全年来看，总的平均{s.variant}照度是{s.annual_mean:.2f}lux，"
+        f"最高{s.variant}照度出现在{s.max_month}月，为{s.max_value:.2f}lux，"
+        f"最低{s.variant}照度出现在{s.min_month}月，为{s.min_value:.2f}lux，"
+        f"最高照度月与最低照度月之间的{s.variant}照度差为{s.difference:.2f}lux"
+    )
+
+def _illuminance_daily(s):
+    return (
+        f"当前月份的平均{s.variant}照度是{s.period_mean:.2f}lux，"
+        f"最高{s.variant}照度是{s.period_max:.2f}lux，最低{s.variant}照度是{s.period_min:.2f}lux"
+    )
+
+_MONTHLY_TEMPLATES = {
+    TEMPERATURE: _temperature_monthly,
+    HUMIDITY: _humidity_monthly,
+    WIND: _wind_monthly,
+    SKY_COVER: _sky_cover_monthly,
+    RADIATION: _radiation_monthly,
+    ILLUMINANCE: _illuminance_monthly,
+}
+
+_DAILY_TEMPLATES = {
+    TEMPERATURE: _temperature_daily,
+    HUMIDITY: _humidity_daily,
+    WIND: _wind_daily,
+    SKY_COVER: _sky_cover_daily,
+    RADIATION: _radiation_daily,
+    ILLUMINANCE: _illuminance_daily,
+}
+
+def summarize_series(module, monthly_averages, daily_averages, variant="", **extra):
+    """
+    由逐月均值（全年）与逐日均值（所选时段）生成统计结果。
+
+    Args:
+        module (str): 图表模块名称。
+        monthly_averages (pandas.Series): 以月份为索引的逐月均值。
+        daily_averages (pandas.Series): 所选时段的逐日均值。
+        variant (str): 模块内的变体（例如辐射类型），默认为空。
+        **extra: 其他字段（例如温度区间计数、盛行风向）。
+
+    Returns:
+        ClimateSummary: 统计结果，风速模块返回 WindSummary。
+    """
+    record_type = WindSummary if module == WIND else ClimateSummary
+    return record_type(
+        module=module,
+        variant=variant,
+        annual_mean=float(monthly_averages.mean()),
+        max_month=int(monthly_averages.idxmax()),
+        max_value=float(monthly_averages.max()),
+        min_month=int(monthly_averages.idxmin()),
+        min_value=float(monthly_averages.min()),
+        period_mean=float(daily_averages.mean()),
+        period_max=float(daily_averages.max()),
+        period_min=float(daily_averages.min()),
+        **extra,
+    )
+
+# 可序列化的记录类型（按类名查找）
+_RECORD_TYPES = {
+    cls.__name__: cls
+    for cls in (ClimateSummary, WindSummary, DegreeDaysSummary, PassiveStrategiesSummary,
+                DesignConditionsSummary, ComparisonSummary, UnavailableSummary)
+}
+
+def _to_tuple(value):
+    """JSON 数组还原为（嵌套）元组。"""
+    return tuple(_to_tuple(v) for v in value) if isinstance(value, list) else value
+
+def summary_to_payload(summary):
+    """
+    将统计结果转换为紧凑的 JSON 兼容结构：{"type": 类名, "values": 按字段顺序排列的值}。
+
+    Args:
+        summary: 统计结果记录。
+
+    Returns:
+        dict: 可直接 json.dumps 的结构。
+    """
+    return {"type": type(summary).__name__, "values": [getattr(summary, f.name) for f in fields(summary)]}
+
+def summary_from_payload(payload):
+    """
+    由 summary_to_payload 的结果还原统计结果。
+
+    Args:
+        payload (dict): 序列化结构。
+
+    Returns:
+        统计结果记录。
+    """
+    return _RECORD_TYPES[payload["type"]](*(_to_tuple(v) for v in payload["values"]))
+
+def summaries_to_frame(summaries, index=None):
+    """
+    将同类统计结果批量整理为表格，便于跨站点或跨时段对比（元组字段保持为单元格中的元组）。
+
+    Args:
+        summaries (list): 统计结果记录列表。
+        index (list): 行索引（例如站点名称），默认为序号。
+
+    Returns:
+        pandas.DataFrame: 每行一条记录，每列一个字段。
+    """
+    import pandas as pd
+
+    rows = [{f.name: getattr(summary, f.name) for f in fields(summary)} for summary in summaries]
+    return pd.DataFrame(rows, index=index)
@@ -0,0 +1,264 @@
+# summary_store.py
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from config import get_summary_store_path
+from utils.cache_backend import get_cache
+from utils.metrics import record_cache
+from utils.summaries import (TEMPERATURE, HUMIDITY, WIND, SKY_COVER, RADIATION, ILLUMINANCE, PASSIVE_STRATEGIES,
+                             summary_from_payload, summary_to_payload)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    station TEXT NOT NULL,
+    module TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    start_month INTEGER NOT NULL,
+    end_month INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (station, module, variant, start_month, end_month)
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    station TEXT NOT NULL,
+    field TEXT NOT NULL,
+    period TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (station, field, period)
+);
+CREATE TABLE IF NOT EXISTS reports (
+    station TEXT NOT NULL,
+    start_month INTEGER NOT NULL,
+    end_month INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (station, start_month, end_month)
+);
+"""
+
+# 统计结果的存储版本：结果记录的字段、数据清洗或计算方式变化时递增，旧版本的行视为未命中并重新计算
+SUMMARY_VERSION = 2
+
+_initialized_paths = set()
+
+@contextmanager
+def _connect():
+    """
+    打开结果存储的 SQLite 连接（每次调用新建连接，便于多线程/多进程并发使用），退出时提交并关闭。
+
+    Yields:
+        sqlite3.Connection: 数据库连接。
+    """
+    path = get_summary_store_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _initialized_paths:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _initialized_paths.add(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def get_summary(station, module, start_month, end_month, variant=""):
+    """
+    读取预计算的统计结果。
+
+    Args:
+        station (str): 站点标识（仓库中的地理编码路径）。
+        module (str): 图表模块名称。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        variant (str): 模块内的变体（例如辐射类型），默认为空。
+
+    Returns:
+        object: 统计结果记录（见 utils/summaries），未命中（或为旧版本的行）时返回 None。
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT payload FROM summaries WHERE station=? AND module=? AND variant=? AND start_month=? AND end_month=?",
+            (station, module, variant, start_month, end_month),
+        ).fetchone()
+    # 旧版本的行（渲染后的文字或早期数据清洗前的结果）不再使用，由调用方重新计算后覆盖
+    stored = json.loads(row[0]) if row else None
+    current = isinstance(stored, dict) and stored.get("version") == SUMMARY_VERSION
+    record_cache("summary_store", current)
+    if current:
+        return summary_from_payload(stored["record"])
+    # 本地存储未命中时读取共享缓存（其他副本计算过的结果），命中后写入本地存储
+    payload = get_cache().get("summary", (SUMMARY_VERSION, station, module, variant, start_month, end_month))
+    if payload is None:
+        return None
+    _put_summary_row(station, module, start_month, end_month, payload, variant)
+    return summary_from_payload(payload)
+
+def put_summary(station, module, start_month, end_month, summary, variant=""):
+    """
+    写入（或覆盖）一条统计结果（以紧凑的 JSON 结构保存，不保存渲染后的文字）。
+
+    Args:
+        station (str): 站点标识。
+        module (str): 图表模块名称。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        summary (object): 统计结果记录（见 utils/summaries）。
+        variant (str): 模块内的变体，默认为空。
+    """
+    payload = summary_to_payload(summary)
+    _put_summary_row(station, module, start_month, end_month, payload, variant)
+    get_cache().set("summary", (SUMMARY_VERSION, station, module, variant, start_month, end_month), payload)
+
+def _put_summary_row(station, module, start_month, end_month, payload, variant):
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (station, module, variant, start_month, end_month,
+             json.dumps({"version": SUMMARY_VERSION, "record": payload}, ensure_ascii=False), time.time()),
+        )
+
+def get_or_compute_summary(station, module, start_month, end_month, compute, variant=""):
+    """
+    优先读取预计算结果，未命中时调用 compute 计算并写回存储。
+
+    Args:
+        station (str): 站点标识，为 None 时（例如用户上传的文件）直接计算，不读写存储。
+        module (str): 图表模块名称。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        compute (callable): 无参数的计算函数，返回统计结果记录。
+        variant (str): 模块内的变体，默认为空。
+
+    Returns:
+        object: 统计结果记录。
+    """
+    if station is None:
+        return compute()
+    summary = get_summary(station, module, start_month, end_month, variant)
+    if summary is None:
+        summary = compute()
+        put_summary(station, module, start_month, end_month, summary, variant)
+    return summary
+
+def get_aggregates(station, field, period):
+    """
+    读取预计算的聚合序列。
+
+    Args:
+        station (str): 站点标识。
+        field (str): EPW 字段名（例如 "dry_bulb_temperature"）。
+        period (str): 聚合粒度，"monthly" 或 "daily"。
+
+    Returns:
+        list: 聚合值列表，未命中时返回 None。
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT payload FROM aggregates WHERE station=? AND field=? AND period=?",
+            (station, field, period),
+        ).fetchone()
+    if row:
+        return json.loads(row[0])
+    values = get_cache().get("aggregates", (station, field, period))
+    if values is not None:
+        _put_aggregates_row(station, field, period, values)
+    return values
+
+def put_aggregates(station, field, period, values):
+    """
+    写入（或覆盖）聚合序列。
+
+    Args:
+        station (str): 站点标识。
+        field (str): EPW 字段名。
+        period (str): 聚合粒度，"monthly" 或 "daily"。
+        values (list): 聚合值列表。
+    """
+    values = [float(v) for v in values]
+    _put_aggregates_row(station, field, period, values)
+    get_cache().set("aggregates", (station, field, period), values)
+
+def _put_aggregates_row(station, field, period, values):
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?, ?, ?)",
+            (station, field, period, json.dumps(values), time.time()),
+        )
+
+def get_report(station, start_month, end_month):
+    """
+    读取已生成的绿建气候报告。
+
+    Args:
+        station (str): 站点标识（上传的文件为 "upload:" 加内容摘要）。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+
+    Returns:
+        str: 报告文字，未命中时返回 None。
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT report FROM reports WHERE station=? AND start_month=? AND end_month=?",
+            (station, start_month, end_month),
+        ).fetchone()
+    record_cache("report_store", row is not None)
+    if row:
+        return row[0]
+    report = get_cache().get("report", (station, start_month, end_month))
+    if report is not None:
+        _put_report_row(station, start_month, end_month, report)
+    return report
+
+def put_report(station, start_month, end_month, report):
+    """
+    写入（或覆盖）一份绿建气候报告。
+
+    Args:
+        station (str): 站点标识。
+        start_month (int): 起始月份。
+        end_month (int): 终止月份。
+        report (str): 报告文字。
+    """
+    _put_report_row(station, start_month, end_month, report)
+    get_cache().set("report", (station, start_month, end_month), report)
+
+def _put_report_row(station, start_month, end_month, report):
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+            (station, start_month, end_month, report, time.time()),
+        )
+
+def has_station(station):
+    """
+    判断某站点是否已有预计算结果。
+
+    Args:
+        station (str): 站点标识。
+
+    Returns:
+        bool: 存储中存在该站点的任意总结时返回 True。
+    """
+    with _connect() as conn:
+        row = conn.execute("SELECT 1 FROM summaries WHERE station=? LIMIT 1", (station,)).fetchone()
+    return row is not None
+
+def delete_station(station):
+    """
+    删除某站点的全部预计算结果。
+
+    Args:
+        station (str): 站点标识。
+    """
+    with _connect() as conn:
+        conn.execute("DELETE FROM summaries WHERE station=?", (station,))
+        conn.execute("DELETE FROM aggregates WHERE station=?", (station,))
+        conn.execute("DELETE FROM reports WHERE station=?", (station,))
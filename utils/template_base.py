@@ -1,37 +1,64 @@
 # template_base.py
 
-def map_value(value, old_min, old_max, new_min, new_max):
+from dataclasses import dataclass
+from functools import lru_cache
+
+# 内置色卡：色卡编号 -> (起始颜色, 终止颜色)，9 为用户自定义颜色
+COLOR_SCHEMES = {
+    1: ((0, 0, 0), (240, 240, 240)),
+    2: ((65, 65, 255), (255, 65, 65)),  # 冷色系
+    3: ((238, 105, 131), (255, 245, 228)),  # 红色到白色
+    4: ((151, 92, 141), (255, 173, 188)),  # 粉色到紫色
+    5: ((34, 87, 126), (149, 209, 204)),  # 蓝色到绿色
+    6: ((185, 255, 252), (117, 121, 231)),  # 黄色到橙色
+    7: ((26, 18, 11), (229, 229, 203)),  # 绿色到蓝色
+    8: ((109, 159, 217), (238, 222, 236)),  # 淡蓝色到蓝色
+}
+
+CUSTOM_SCHEME = 9
+
+@dataclass(frozen=True, slots=True)
+class ColorContext:
     """
-    将值从一个范围映射到另一个范围。
+    单次请求的配色（不可变，可在多个会话或线程间安全共享）。
 
-    Args:
-        value (float): 要映射的值。
-        old_min (float): 旧范围的最小值。
-        old_max (float): 旧范围的最大值。
-        new_min (float): 新范围的最小值。
-        new_max (float): 新范围的最大值。
+    色卡编号不在范围内（或自定义色卡未提供颜色）时 start/end 为 None，色阶为黑色。
+    """
+    scheme: int
+    start: tuple = None
+    end: tuple = None
 
-    Returns:
-        float: 映射后的值。
+@lru_cache(maxsize=256)
+def make_color_context(color_scheme, color1=None, color2=None):
     """
-    if old_max == old_min:
-        return (new_max + new_min) / 2  # 防止除以零
-    return ((value - old_min) / (old_max - old_min)) * (new_max - new_min) + new_min
+    创建（并缓存）配色对象，同一色卡与自定义颜色只创建一次。
 
-# template_base.py
+    Args:
+        color_scheme (int): 色卡编号。
+        color1 (str): 自定义色卡的第一个颜色（十六进制表示），仅色卡 9 使用。
+        color2 (str): 自定义色卡的第二个颜色（十六进制表示），仅色卡 9 使用。
 
-user_defined_colors = None
+    Returns:
+        ColorContext: 配色对象。
+    """
+    if color_scheme == CUSTOM_SCHEME and color1 is not None and color2 is not None:
+        return ColorContext(color_scheme, hex_to_rgb(color1), hex_to_rgb(color2))
+    start, end = COLOR_SCHEMES.get(color_scheme, (None, None))
+    return ColorContext(color_scheme, start, end)
 
-def set_user_defined_colors(color1, color2):
+def as_color_context(color_scheme):
     """
-    设置用户定义颜色。
+    将色卡编号转换为配色对象（已是配色对象时原样返回）。
 
     Args:
-        color1 (str): 用户选择的第一个颜色（十六进制表示）。
-        color2 (str): 用户选择的第二个颜色（十六进制表示）。
+        color_scheme (ColorContext | int): 配色对象或色卡编号。
+
+    Returns:
+        ColorContext: 配色对象。
     """
-    global user_defined_colors
-    user_defined_colors = (hex_to_rgb(color1), hex_to_rgb(color2))
+    if isinstance(color_scheme, ColorContext):
+        return color_scheme
+    return make_color_context(color_scheme)
 
 def hex_to_rgb(hex):
     """
@@ -46,68 +73,17 @@ def hex_to_rgb(hex):
     hex = hex.lstrip('#')
     return tuple(int(hex[i:i+2], 16) for i in (0, 2, 4))
 
-# 其他现有代码...
-def map_to_color(value, min_value, max_value, color_scheme):
+def color_scale(color_scheme):
     """
-    将值映射到颜色。
+    生成热力图等连续色阶使用的 plotly colorscale（配色的起止颜色）。
 
     Args:
-        value (float): 要映射的值。
-        min_value (float): 值的最小值。
-        max_value (float): 值的最大值。
-        color_scheme (int): 色卡编号。
+        color_scheme (ColorContext | int): 配色对象或色卡编号。
 
     Returns:
-        str: 映射后的颜色（RGB格式）。
+        list: [[0, 起始颜色], [1, 终止颜色]]。
     """
-    global user_defined_colors
-
-    if color_scheme == 1:
-        r = int(map_value(value, min_value, max_value, 0, 240))
-        g = int(map_value(value, min_value, max_value, 0, 240))
-        b = int(map_value(value, min_value, max_value, 0, 240))
-    elif color_scheme == 2:
-        # 冷色系颜色映射
-        r = int(map_value(value, min_value, max_value, 65, 255))
-        g = int(map_value(value, min_value, max_value, 65, 65))
-        b = int(map_value(value, min_value, max_value, 255, 65))
-    elif color_scheme == 3:
-        # 红色到白色颜色映射
-        r = int(map_value(value, min_value, max_value, 238, 255))
-        g = int(map_value(value, min_value, max_value, 105, 245))
-        b = int(map_value(value, min_value, max_value, 131, 228))
-    elif color_scheme == 4:
-        # 粉色到紫色颜色映射
-        r = int(map_value(value, min_value, max_value, 151, 255))
-        g = int(map_value(value, min_value, max_value, 92, 173))
-        b = int(map_value(value, min_value, max_value, 141, 188))
-    elif color_scheme == 5:
-        # 蓝色到绿色颜色映射
-        r = int(map_value(value, min_value, max_value, 34, 149))
-        g = int(map_value(value, min_value, max_value, 87, 209))
-        b = int(map_value(value, min_value, max_value, 126, 204))
-    elif color_scheme == 6:
-        # 黄色到橙色颜色映射
-        r = int(map_value(value, min_value, max_value, 185, 117))
-        g = int(map_value(value, min_value, max_value, 255, 121))
-        b = int(map_value(value, min_value, max_value, 252, 231))
-    elif color_scheme == 7:
-        # 绿色到蓝色颜色映射
-        r = int(map_value(value, min_value, max_value, 26, 229))
-        g = int(map_value(value, min_value, max_value, 18, 229))
-        b = int(map_value(value, min_value, max_value, 11, 203))
-    elif color_scheme == 8:
-        # 淡蓝色到蓝色颜色映射
-        r = int(map_value(value, min_value, max_value, 109, 238))
-        g = int(map_value(value, min_value, max_value, 159, 222))
-        b = int(map_value(value, min_value, max_value, 217, 236))
-    elif color_scheme == 9 and user_defined_colors is not None:
-        # 用户自定义颜色映射
-        r = int(map_value(value, min_value, max_value, user_defined_colors[0][0], user_defined_colors[1][0]))
-        g = int(map_value(value, min_value, max_value, user_defined_colors[0][1], user_defined_colors[1][1]))
-        b = int(map_value(value, min_value, max_value, user_defined_colors[0][2], user_defined_colors[1][2]))
-    else:
-        r, g, b = 0, 0, 0  # 默认黑色，如果色卡编号不在范围内
-
-    return f'rgb({r}, {g}, {b})'
-
+    color = as_color_context(color_scheme)
+    if color.start is None:
+        return [[0, 'rgb(0, 0, 0)'], [1, 'rgb(0, 0, 0)']]
+    return [[0, 'rgb({}, {}, {})'.format(*color.start)], [1, 'rgb({}, {}, {})'.format(*color.end)]]
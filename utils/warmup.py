@@ -0,0 +1,144 @@
+# warmup.py
+
+import ast
+import importlib
+import os
+import threading
+import time
+from config import get_warmup_settings
+
+# 首次渲染图表前需要的重型第三方库与公共模块（按依赖顺序，先导入底层库）
+HEAVY_MODULES = [
+    "pandas",
+    "plotly.graph_objects",
+    "ladybug.epw",
+    "ladybug_charts",
+    "scipy.spatial",
+    "pydeck",
+    "requests",
+    "utils.data_loader",
+    "utils.epw_arrays",
+    "utils.chart_generator",
+]
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def lazy_imports(script=MAIN_SCRIPT):
+    """
+    列出脚本在函数或分支内按需导入的模块（即各页面的图表模块），去重后返回。
+
+    预加载列表由 main.py 自动得出，新增页面不必再手动登记。
+
+    Args:
+        script (str): 脚本路径，默认为 main.py。
+
+    Returns:
+        list: 模块名列表。
+    """
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    top_level = {id(node) for node in tree.body}
+    modules = []
+    for node in ast.walk(tree):
+        if id(node) in top_level:
+            continue
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module]
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+def heavy_modules():
+    """
+    返回启动时预加载的模块：重型库与公共模块在前，main.py 中按需导入的模块在后。
+
+    Returns:
+        list: 模块名列表。
+    """
+    modules = list(HEAVY_MODULES)
+    try:
+        modules += [name for name in lazy_imports() if name not in modules]
+    except (OSError, SyntaxError):
+        pass
+    return modules
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_warmup_report = {}
+
+def preload_modules(modules=None):
+    """
+    依次导入模块并记录耗时（已导入的模块耗时接近 0）。
+
+    Args:
+        modules (list): 模块名列表，默认为 heavy_modules()。
+
+    Returns:
+        dict: 模块名到导入耗时（秒）的映射，导入失败的模块记为错误信息。
+    """
+    timings = {}
+    for name in modules or heavy_modules():
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            timings[name] = time.perf_counter() - start
+        except Exception as e:
+            timings[name] = f"{type(e).__name__}: {e}"
+    return timings
+
+def warm_stations(station_paths):
+    """
+    预先下载、解压并解析热门站点，填充站点路径缓存与数组缓存。
+
+    Args:
+        station_paths (list): 站点 ZIP 文件在仓库中的路径列表。
+
+    Returns:
+        dict: 站点路径到耗时（秒）的映射，失败的站点记为错误信息。
+    """
+    from charts.comparison_chart import load_station_epw_path
+    from utils.epw_arrays import load_epw_arrays
+
+    timings = {}
+    for station_path in station_paths:
+        start = time.perf_counter()
+        try:
+            load_epw_arrays(load_station_epw_path(station_path))
+            timings[station_path] = time.perf_counter() - start
+        except Exception as e:
+            timings[station_path] = f"{type(e).__name__}: {e}"
+    return timings
+
+def _run_warmup(preload, station_paths):
+    start = time.perf_counter()
+    if preload:
+        _warmup_report["modules"] = preload_modules()
+    if station_paths:
+        _warmup_report["stations"] = warm_stations(station_paths)
+    _warmup_report["seconds"] = time.perf_counter() - start
+
+def start_warmup():
+    """
+    在后台线程中预加载重型模块与热门站点（每个进程只启动一次，重复调用直接返回）。
+
+    由 config 中的 PRELOAD_MODULES 与 WARM_STATIONS 控制；不阻塞当前页面的渲染。
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return
+        preload, station_paths = get_warmup_settings()
+        _warmup_thread = threading.Thread(target=_run_warmup, args=(preload, station_paths), name="warmup", daemon=True)
+        _warmup_thread.start()
+
+def get_warmup_report():
+    """
+    返回预热结果（模块与站点的耗时），预热尚未完成时内容不完整。
+
+    Returns:
+        dict: 包含 "modules"、"stations"、"seconds" 的字典。
+    """
+    return dict(_warmup_report)